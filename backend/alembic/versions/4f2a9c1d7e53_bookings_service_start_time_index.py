@@ -0,0 +1,26 @@
+"""bookings service/start_time composite index
+
+Revision ID: 4f2a9c1d7e53
+Revises: cb4bbe4e0608
+Create Date: 2026-10-19 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f2a9c1d7e53'
+down_revision: Union[str, None] = 'cb4bbe4e0608'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_bookings_service_id_start_time_id', 'bookings', ['service_id', 'start_time', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bookings_service_id_start_time_id', table_name='bookings')
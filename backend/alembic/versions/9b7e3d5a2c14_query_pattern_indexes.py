@@ -0,0 +1,49 @@
+"""composite and partial indexes for the hot query patterns
+
+Revision ID: 9b7e3d5a2c14
+Revises: 4f2a9c1d7e53
+Create Date: 2026-10-19 14:03:27.551930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b7e3d5a2c14'
+down_revision: Union[str, None] = '4f2a9c1d7e53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_providers_user_id'), 'providers', ['user_id'], unique=False)
+    op.create_index('ix_services_provider_id_id', 'services', ['provider_id', 'id'], unique=False)
+    op.create_index('ix_provider_working_hours_provider_id_weekday', 'provider_working_hours', ['provider_id', 'weekday'], unique=False)
+    op.create_index('ix_provider_professions_provider_id_id', 'provider_professions', ['provider_id', 'id'], unique=False)
+    op.create_index(op.f('ix_bill_credits_provider_id'), 'bill_credits', ['provider_id'], unique=False)
+    op.create_index('ix_bills_provider_id_month', 'bills', ['provider_id', 'month'], unique=False)
+    op.create_index('ix_bookings_customer_id_start_time_id', 'bookings', ['customer_id', 'start_time', 'id'], unique=False)
+    # Partial: confirmed bookings only (a plain index on databases without
+    # partial index support)
+    op.create_index(
+        'ix_bookings_confirmed_service_id_start_time_end_time',
+        'bookings',
+        ['service_id', 'start_time', 'end_time'],
+        unique=False,
+        postgresql_where=sa.text("status = 'confirmed'"),
+        sqlite_where=sa.text("status = 'confirmed'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bookings_confirmed_service_id_start_time_end_time', table_name='bookings')
+    op.drop_index('ix_bookings_customer_id_start_time_id', table_name='bookings')
+    op.drop_index('ix_bills_provider_id_month', table_name='bills')
+    op.drop_index(op.f('ix_bill_credits_provider_id'), table_name='bill_credits')
+    op.drop_index('ix_provider_professions_provider_id_id', table_name='provider_professions')
+    op.drop_index('ix_provider_working_hours_provider_id_weekday', table_name='provider_working_hours')
+    op.drop_index('ix_services_provider_id_id', table_name='services')
+    op.drop_index(op.f('ix_providers_user_id'), table_name='providers')
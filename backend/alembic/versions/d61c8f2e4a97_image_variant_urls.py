@@ -0,0 +1,36 @@
+"""resized image variant urls for avatars and catalog images
+
+Revision ID: d61c8f2e4a97
+Revises: 9b7e3d5a2c14
+Create Date: 2026-10-19 17:41:08.204617
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd61c8f2e4a97'
+down_revision: Union[str, None] = '9b7e3d5a2c14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('avatar_thumb_url', sa.String(), nullable=True))
+    op.add_column('users', sa.Column('avatar_medium_url', sa.String(), nullable=True))
+    op.add_column('providers', sa.Column('avatar_thumb_url', sa.String(), nullable=True))
+    op.add_column('providers', sa.Column('avatar_medium_url', sa.String(), nullable=True))
+    op.add_column('provider_catalog_images', sa.Column('thumb_url', sa.String(), nullable=True))
+    op.add_column('provider_catalog_images', sa.Column('medium_url', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('provider_catalog_images', 'medium_url')
+    op.drop_column('provider_catalog_images', 'thumb_url')
+    op.drop_column('providers', 'avatar_medium_url')
+    op.drop_column('providers', 'avatar_thumb_url')
+    op.drop_column('users', 'avatar_medium_url')
+    op.drop_column('users', 'avatar_thumb_url')
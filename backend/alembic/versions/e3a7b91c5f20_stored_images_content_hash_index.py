@@ -0,0 +1,43 @@
+"""stored_images content-hash index for upload dedupe
+
+Revision ID: e3a7b91c5f20
+Revises: d61c8f2e4a97
+Create Date: 2026-10-19 19:12:45.380214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a7b91c5f20'
+down_revision: Union[str, None] = 'd61c8f2e4a97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('stored_images',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('backend', sa.String(), nullable=False),
+    sa.Column('folder', sa.String(), nullable=False),
+    sa.Column('image_url', sa.String(), nullable=False),
+    sa.Column('thumb_url', sa.String(), nullable=True),
+    sa.Column('medium_url', sa.String(), nullable=True),
+    sa.Column('size_bytes', sa.Integer(), nullable=False),
+    sa.Column('reuse_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('last_used_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_stored_images_id'), 'stored_images', ['id'], unique=False)
+    op.create_index('ix_stored_images_content_hash_backend_folder', 'stored_images', ['content_hash', 'backend', 'folder'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stored_images_content_hash_backend_folder', table_name='stored_images')
+    op.drop_index(op.f('ix_stored_images_id'), table_name='stored_images')
+    op.drop_table('stored_images')
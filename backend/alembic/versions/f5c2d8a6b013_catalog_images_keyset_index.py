@@ -0,0 +1,26 @@
+"""provider_catalog_images (provider_id, created_at, id) index for catalog pages
+
+Revision ID: f5c2d8a6b013
+Revises: e3a7b91c5f20
+Create Date: 2026-10-19 20:26:51.907342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5c2d8a6b013'
+down_revision: Union[str, None] = 'e3a7b91c5f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_provider_catalog_images_provider_id_created_at_id', 'provider_catalog_images', ['provider_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_provider_catalog_images_provider_id_created_at_id', table_name='provider_catalog_images')
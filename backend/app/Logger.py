@@ -1,24 +1,230 @@
+"""Logging setup: structured JSON lines written off the request path.
+
+Every record goes through a QueueHandler on the root logger; a single
+QueueListener thread formats it and writes it to stdout, so a slow or
+blocked stdout never stalls a request thread. If the queue is full
+(LOG_QUEUE_SIZE) records are dropped and counted rather than waited on.
+
+Records carry the id of the request that produced them. RequestIdMiddleware
+takes it from an incoming X-Request-ID header (or generates one), echoes it
+on the response and stores it in a context variable, which also reaches
+threadpool workers running sync routes.
+
+LOG_FORMAT=text gives the old human-readable format; LOG_LEVELS sets
+per-logger levels, e.g. ``bookitgy.sql=DEBUG,apscheduler=WARNING``.
+
+Usage stays the same::
+
+    from app.Logger import logger
+    notify_logger = logger.getChild("notifications")
+    notify_logger.warning("Push failed: %s", exc, extra={"provider_id": 3})
+
+Fields passed with ``extra`` become top-level JSON keys.
+"""
+
+import atexit
+import copy
+import json
 import logging
+import queue
+import re
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
 from app.config import get_settings
 
 
 settings = get_settings()
 
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+# Attributes every LogRecord has; anything else came in through `extra`
+_RECORD_ATTRS = set(
+    logging.LogRecord("", 0, "", 0, "", None, None).__dict__
+) | {"message", "asctime", "request_id"}
+
+
+# ---------------------------------------------------------------------------
+# Handlers and formatters
+# ---------------------------------------------------------------------------
+
+class RequestIdFilter(logging.Filter):
+    """Stamp records with the current request id (runs in the caller's thread)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self) -> None:
+        super().__init__("%(asctime)s [%(levelname)s] %(name)s%(rid)s - %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        request_id = getattr(record, "request_id", None)
+        record.rid = f" [{request_id}]" if request_id else ""
+        return super().format(record)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock prepare() folds the traceback into the message; keep it
+        # separate (rendered here, while exc_info is still valid) so the JSON
+        # formatter can put it in its own field.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+# ---------------------------------------------------------------------------
+# Setup
+# ---------------------------------------------------------------------------
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[DroppingQueueHandler] = None
+
 
 def _configure_root_logger() -> logging.Logger:
+    global _listener, _queue_handler
+
     level_name = settings.LOG_LEVEL
     level = getattr(logging, level_name, logging.INFO)
 
-    logging.basicConfig(
-        level=level,
-        format="%(asctime)s [%(levelname)s] %(name)s - %(message)s",
-    )
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "text":
+        stream_handler.setFormatter(TextFormatter())
+    else:
+        stream_handler.setFormatter(JsonFormatter())
+
+    _queue_handler = DroppingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+    _queue_handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+
+    for name, override in settings.LOG_LEVELS.items():
+        logging.getLogger(name).setLevel(getattr(logging, override, level))
+
+    _listener = QueueListener(_queue_handler.queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
 
     logger = logging.getLogger("bookitgy")
     logger.debug("Logger initialized with level %s", level_name)
     return logger
 
 
+def stop_logging() -> None:
+    """Flush queued records and stop the writer thread (idempotent)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def dropped_log_records() -> int:
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+# ---------------------------------------------------------------------------
+# Request id middleware
+# ---------------------------------------------------------------------------
+
+class RequestIdMiddleware:
+    """Assign each HTTP request an id for log correlation (pure ASGI)."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == b"x-request-id":
+                candidate = value.decode("latin-1")
+                # Only accept ids that are safe to echo and log
+                if _REQUEST_ID.match(candidate):
+                    request_id = candidate
+                break
+        if request_id is None:
+            request_id = uuid.uuid4().hex
+
+        token = request_id_var.set(request_id)
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", request_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
+
+
 logger = _configure_root_logger()
 
-__all__ = ["logger"]
+__all__ = [
+    "RequestIdMiddleware",
+    "dropped_log_records",
+    "logger",
+    "request_id_var",
+    "stop_logging",
+]
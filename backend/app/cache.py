@@ -0,0 +1,385 @@
+"""In-process caches for hot, rarely-changing read paths.
+
+The public provider directory (``/providers`` and the per-provider
+profile/services/catalog reads) is read far more often than providers edit
+their profiles, so we keep rendered snapshots in memory and drop them from
+the write paths in ``crud`` and the routes.
+
+Each worker process has its own cache. Invalidation is therefore only
+immediate inside the process that handled the write; the TTL bounds how long
+other workers can serve a stale entry.
+"""
+
+import gzip
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.config import get_settings
+from app.tracing import span
+
+settings = get_settings()
+
+
+class BoundedTTLCache:
+    """Thread-safe LRU cache with a per-entry TTL and hit/miss counters.
+
+    Keys are tuples whose first element is a namespace (e.g. ``"services"``)
+    and, for per-provider entries, whose second element is the provider id.
+    That convention is what ``invalidate_provider`` relies on.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        ttl_seconds: float,
+        enabled: bool = True,
+    ) -> None:
+        self.name = name
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss/expiry."""
+        if not self.enabled:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if not self.enabled:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, calling loader() on a miss.
+
+        The loader runs outside the lock so a slow DB query never blocks
+        readers of other keys. Two concurrent misses on the same key may both
+        load; the last one wins, which is fine for idempotent reads.
+        """
+        with span(f"cache {self.name}") as cache_span:
+            value = self.get(key)
+            if cache_span is not None:
+                cache_span.set_attribute("cache.hit", value is not None)
+            if value is not None:
+                return value
+
+            value = loader()
+            self.set(key, value)
+            return value
+
+    async def get_or_load_async(
+        self, key: Hashable, loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """get_or_load for async loaders (see app/crud_async.py)."""
+        with span(f"cache {self.name}") as cache_span:
+            value = self.get(key)
+            if cache_span is not None:
+                cache_span.set_attribute("cache.hit", value is not None)
+            if value is not None:
+                return value
+
+            value = await loader()
+            self.set(key, value)
+            return value
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+    def invalidate_namespace(self, namespace: str) -> int:
+        with self._lock:
+            doomed = [k for k in self._entries if _namespace(k) == namespace]
+            for k in doomed:
+                del self._entries[k]
+            self.invalidations += len(doomed)
+            return len(doomed)
+
+    def invalidate_matching(self, predicate: Callable[[Hashable], bool]) -> int:
+        with self._lock:
+            doomed = [k for k in self._entries if predicate(k)]
+            for k in doomed:
+                del self._entries[k]
+            self.invalidations += len(doomed)
+            return len(doomed)
+
+    def invalidate_provider(self, provider_id: int) -> int:
+        """Drop every per-provider entry for provider_id."""
+        return self.invalidate_matching(
+            lambda k: isinstance(k, tuple) and len(k) > 1 and k[1] == provider_id
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+def _namespace(key: Hashable) -> Hashable:
+    return key[0] if isinstance(key, tuple) and key else key
+
+
+# ---------------------------------------------------------------------------
+# Provider directory cache
+# ---------------------------------------------------------------------------
+
+directory_cache = BoundedTTLCache(
+    name="provider_directory",
+    max_entries=settings.DIRECTORY_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.DIRECTORY_CACHE_TTL_SECONDS,
+    enabled=settings.DIRECTORY_CACHE_ENABLED,
+)
+
+
+def invalidate_provider_directory(provider_id: Optional[int] = None) -> None:
+    """
+    Drop cached directory data after a provider-facing write.
+
+    The /providers list embeds every provider's name, location, professions
+    and service names, so any provider write also drops all list entries.
+    Passing no provider_id clears the whole directory cache.
+
+    Pre-rendered responses are built from the same rows, so they are dropped
+    along with the directory entries.
+
+    With read replicas, a read right after the write may still see the old
+    rows and cache them again, so the same entries are dropped a second
+    time once replicas should have caught up.
+    """
+    _drop_provider_entries(provider_id)
+
+    if settings.DATABASE_READ_URLS:
+        _delayed_drops.schedule(provider_id)
+
+
+def _drop_provider_entries(provider_id: Optional[int]) -> None:
+    for cache in (directory_cache, response_cache):
+        if provider_id is None:
+            cache.clear()
+            continue
+
+        cache.invalidate_provider(provider_id)
+        cache.invalidate_namespace("providers")
+
+
+class _DelayedDrops:
+    """
+    Second drops for invalidate_provider_directory, run by one daemon thread.
+
+    A burst of writes to the same provider coalesces into a single pending
+    drop (due delay seconds after the last write), so pending work is bounded
+    by the number of providers rather than the number of writes.
+    """
+
+    def __init__(self, delay_seconds: float) -> None:
+        self.delay_seconds = delay_seconds
+        self._cond = threading.Condition()
+        self._due: Dict[Optional[int], float] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, provider_id: Optional[int]) -> None:
+        with self._cond:
+            self._due[provider_id] = time.monotonic() + self.delay_seconds
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="cache-delayed-drops", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._due:
+                    self._cond.wait()
+                now = time.monotonic()
+                ready = [pid for pid, due in self._due.items() if due <= now]
+                if not ready:
+                    self._cond.wait(min(self._due.values()) - now)
+                    continue
+                for pid in ready:
+                    del self._due[pid]
+
+            for pid in ready:
+                _drop_provider_entries(pid)
+
+
+_delayed_drops = _DelayedDrops(settings.READ_YOUR_WRITES_SECONDS)
+
+
+# ---------------------------------------------------------------------------
+# Pre-rendered JSON responses
+# ---------------------------------------------------------------------------
+
+class RenderedJSON:
+    """An encoded JSON body plus an optional gzip-compressed copy."""
+
+    __slots__ = ("body", "gzipped")
+
+    def __init__(self, body: bytes, gzipped: Optional[bytes] = None) -> None:
+        self.body = body
+        self.gzipped = gzipped
+
+
+response_cache = BoundedTTLCache(
+    name="rendered_responses",
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+    enabled=settings.RESPONSE_CACHE_ENABLED,
+)
+
+
+def render_json(content: Any) -> RenderedJSON:
+    """Encode content exactly like FastAPI's JSONResponse, gzipping if worth it."""
+    body = json.dumps(
+        jsonable_encoder(content),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+    gzipped = None
+    if settings.RESPONSE_CACHE_GZIP and len(body) >= settings.RESPONSE_CACHE_GZIP_MIN_BYTES:
+        gzipped = gzip.compress(body, compresslevel=6)
+
+    return RenderedJSON(body, gzipped)
+
+
+def cached_json_response(
+    request: Request,
+    key: Hashable,
+    loader: Callable[[], Any],
+) -> Response:
+    """
+    Serve a JSON payload from the rendered-response cache.
+
+    On a miss, loader() builds the payload, which is encoded once and kept as
+    bytes. Hits skip dict building, jsonable_encoder and json.dumps entirely.
+    The gzip copy is sent only to clients that advertise gzip support.
+    """
+    rendered = response_cache.get_or_load(key, lambda: render_json(loader()))
+    return _rendered_response(request, rendered)
+
+
+async def cached_json_response_async(
+    request: Request,
+    key: Hashable,
+    loader: Callable[[], Awaitable[Any]],
+) -> Response:
+    """cached_json_response for async loaders."""
+
+    async def load() -> RenderedJSON:
+        return render_json(await loader())
+
+    rendered = await response_cache.get_or_load_async(key, load)
+    return _rendered_response(request, rendered)
+
+
+def _rendered_response(request: Request, rendered: RenderedJSON) -> Response:
+    accepts_gzip = "gzip" in request.headers.get("accept-encoding", "").lower()
+    if rendered.gzipped is not None and accepts_gzip:
+        return Response(
+            content=rendered.gzipped,
+            media_type="application/json",
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+        )
+
+    return Response(
+        content=rendered.body,
+        media_type="application/json",
+        headers={"Vary": "Accept-Encoding"},
+    )
+
+
+# ---------------------------------------------------------------------------
+# Authenticated users
+# ---------------------------------------------------------------------------
+# Keys are ("user", user_id, token_iat); values are column snapshots of the
+# User row (see security.get_current_user_from_header).
+
+user_cache = BoundedTTLCache(
+    name="auth_users",
+    max_entries=settings.USER_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+    enabled=settings.USER_CACHE_ENABLED,
+)
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drop every cached token entry for user_id."""
+    user_cache.invalidate_matching(lambda k: k[1] == user_id)
+
+
+__all__ = [
+    "BoundedTTLCache",
+    "RenderedJSON",
+    "cached_json_response",
+    "cached_json_response_async",
+    "directory_cache",
+    "invalidate_provider_directory",
+    "invalidate_user",
+    "render_json",
+    "response_cache",
+    "user_cache",
+]
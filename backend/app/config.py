@@ -1,6 +1,6 @@
 import os
 from functools import lru_cache
-from typing import List
+from typing import Dict, List
 from dotenv import load_dotenv, find_dotenv
 from pathlib import Path
 
@@ -29,6 +29,16 @@ class Settings:
         # Logging
         # -----------------------------
         self.LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+        # "json" (one object per line) or "text" for local reading
+        self.LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json").lower()
+        # Per-logger overrides, e.g. "bookitgy.sql=DEBUG,apscheduler=WARNING"
+        self.LOG_LEVELS: dict = {}
+        for item in os.getenv("LOG_LEVELS", "").split(","):
+            name, _, level = item.partition("=")
+            if name.strip() and level.strip():
+                self.LOG_LEVELS[name.strip()] = level.strip().upper()
+        # Records waiting for the log writer thread; beyond this they're dropped
+        self.LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
 
         # -----------------------------
         # Database – NO SQLite default
@@ -42,6 +52,128 @@ class Settings:
             )
         self.DATABASE_URL: str = db_url
 
+        # Connection pool (ignored for SQLite). Size the pool so that
+        # workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) stays under Postgres
+        # max_connections.
+        self.DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+        self.DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+        self.DB_POOL_TIMEOUT_SECONDS: float = float(
+            os.getenv("DB_POOL_TIMEOUT_SECONDS", "30")
+        )
+        # Recycle connections before the server/proxy drops idle ones
+        self.DB_POOL_RECYCLE_SECONDS: int = int(
+            os.getenv("DB_POOL_RECYCLE_SECONDS", "1800")
+        )
+        self.DB_POOL_PRE_PING: bool = (
+            os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+        )
+        # Log a warning when a request waits longer than this for a connection
+        self.DB_POOL_WAIT_WARN_MS: float = float(
+            os.getenv("DB_POOL_WAIT_WARN_MS", "100")
+        )
+
+        # Async engine for the hot public read routes (asyncpg on Postgres,
+        # aiosqlite in dev). Derived from DATABASE_URL unless overridden.
+        # ASYNC_DB_READS=false serves those routes from the sync handlers.
+        self.ASYNC_DB_READS: bool = (
+            os.getenv("ASYNC_DB_READS", "true").lower() == "true"
+        )
+        self.ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL", "")
+        self.ASYNC_DB_POOL_SIZE: int = int(
+            os.getenv("ASYNC_DB_POOL_SIZE", str(self.DB_POOL_SIZE))
+        )
+        self.ASYNC_DB_MAX_OVERFLOW: int = int(
+            os.getenv("ASYNC_DB_MAX_OVERFLOW", str(self.DB_MAX_OVERFLOW))
+        )
+
+        # Optional read replicas (comma-separated URLs) for read-only
+        # endpoints. Empty means everything goes to DATABASE_URL. A replica
+        # that fails to connect is skipped for DB_REPLICA_RETRY_SECONDS.
+        self.DATABASE_READ_URLS: List[str] = [
+            url.strip()
+            for url in os.getenv("DATABASE_READ_URLS", "").split(",")
+            if url.strip()
+        ]
+        self.DB_REPLICA_RETRY_SECONDS: float = float(
+            os.getenv("DB_REPLICA_RETRY_SECONDS", "30")
+        )
+        # After creating a booking, a user's reads stay on the primary this
+        # long so they see it despite replica lag.
+        self.READ_YOUR_WRITES_SECONDS: float = float(
+            os.getenv("READ_YOUR_WRITES_SECONDS", "15")
+        )
+
+        # Per-request SQL stats: statement count and DB time are always
+        # collected; outside prod they are also sent as X-DB-Query-Count /
+        # X-DB-Time-Ms response headers. Statements slower than
+        # SLOW_QUERY_MS are logged with their parameters redacted.
+        self.SQL_STATS_HEADERS: bool = (
+            os.getenv("SQL_STATS_HEADERS", str(self.ENV != "prod")).lower() == "true"
+        )
+        self.SQL_STATS_LOG: bool = (
+            os.getenv("SQL_STATS_LOG", "false").lower() == "true"
+        )
+        self.SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+        # -----------------------------
+        # Metrics (Prometheus, pull-based)
+        # -----------------------------
+        self.METRICS_ENABLED: bool = (
+            os.getenv("METRICS_ENABLED", "true").lower() == "true"
+        )
+        # When set, /metrics requires "Authorization: Bearer <token>"
+        self.METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+
+        # -----------------------------
+        # Tracing (OpenTelemetry)
+        # -----------------------------
+        # Spans for requests, SQL statements, cache lookups and outbound
+        # calls. TRACING_EXPORTER: "file" (JSON lines in TRACING_FILE, see
+        # scripts/trace_waterfall.py), "otlp" (HTTP collector at
+        # TRACING_OTLP_ENDPOINT) or "console".
+        self.TRACING_ENABLED: bool = (
+            os.getenv("TRACING_ENABLED", "false").lower() == "true"
+        )
+        self.TRACING_EXPORTER: str = os.getenv("TRACING_EXPORTER", "file").lower()
+        self.TRACING_FILE: str = os.getenv("TRACING_FILE", "./traces/spans.jsonl")
+        # The file is rotated at this size, keeping TRACING_FILE_BACKUPS old
+        # files (0 disables rotation)
+        self.TRACING_FILE_MAX_BYTES: int = int(
+            os.getenv("TRACING_FILE_MAX_BYTES", str(50 * 1024 * 1024))
+        )
+        self.TRACING_FILE_BACKUPS: int = int(os.getenv("TRACING_FILE_BACKUPS", "2"))
+        self.TRACING_OTLP_ENDPOINT: str = os.getenv(
+            "TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"
+        )
+        # Fraction of new traces recorded; incoming sampled traceparent
+        # headers are always honoured.
+        self.TRACING_SAMPLE_RATE: float = float(
+            os.getenv("TRACING_SAMPLE_RATE", "0.1")
+        )
+        self.TRACING_SERVICE_NAME: str = os.getenv(
+            "TRACING_SERVICE_NAME", "bookitgy-api"
+        )
+
+        # -----------------------------
+        # On-demand request profiling
+        # -----------------------------
+        # Off by default (the middleware isn't even installed). When on, a
+        # request is profiled if an admin sends "X-Profile: 1" or it falls in
+        # the PROFILING_SAMPLE_RATE fraction of requests.
+        self.PROFILING_ENABLED: bool = (
+            os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+        )
+        self.PROFILING_SAMPLE_RATE: float = float(
+            os.getenv("PROFILING_SAMPLE_RATE", "0")
+        )
+        self.PROFILING_INTERVAL_MS: float = float(
+            os.getenv("PROFILING_INTERVAL_MS", "5")
+        )
+        self.PROFILING_DIR: str = os.getenv("PROFILING_DIR", "./profiles")
+        self.PROFILING_MAX_REPORTS: int = int(
+            os.getenv("PROFILING_MAX_REPORTS", "50")
+        )
+
         # -----------------------------
         # 🔐 AUTH / JWT — STRONG SECRET REQUIRED
         # -----------------------------
@@ -62,6 +194,81 @@ class Settings:
             os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440")
         )
 
+        # Authenticated users are cached per (user id, token iat) so most
+        # requests skip the user lookup. Any committed change to a User row
+        # drops its entries; the TTL only bounds cross-worker staleness.
+        self.USER_CACHE_ENABLED: bool = (
+            os.getenv("USER_CACHE_ENABLED", "true").lower() == "true"
+        )
+        self.USER_CACHE_MAX_ENTRIES: int = int(
+            os.getenv("USER_CACHE_MAX_ENTRIES", "4096")
+        )
+        self.USER_CACHE_TTL_SECONDS: int = int(
+            os.getenv("USER_CACHE_TTL_SECONDS", "60")
+        )
+
+        # -----------------------------
+        # Password hashing
+        # -----------------------------
+        # pbkdf2_sha256 cost. Changing it re-hashes each user's password on
+        # their next successful login.
+        self.PASSWORD_HASH_ROUNDS: int = int(
+            os.getenv("PASSWORD_HASH_ROUNDS", "29000")
+        )
+        # "process" (default), "thread" or "inline" (no pool, e.g. scripts)
+        self.PASSWORD_HASH_EXECUTOR: str = os.getenv(
+            "PASSWORD_HASH_EXECUTOR", "process"
+        ).lower()
+        self.PASSWORD_HASH_WORKERS: int = int(
+            os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))
+        )
+        # Hash jobs allowed to be queued or running at once; beyond that,
+        # callers get a 503 straight away.
+        self.PASSWORD_HASH_MAX_PENDING: int = int(
+            os.getenv("PASSWORD_HASH_MAX_PENDING", str(self.PASSWORD_HASH_WORKERS * 4))
+        )
+
+        # -----------------------------
+        # Rate limiting
+        # -----------------------------
+        # Token buckets per route group and scope, as "capacity/seconds"
+        # (empty or "0" disables that limit). "ip" buckets are keyed by client
+        # address, "account" buckets by the email being logged into/reset
+        # together with the client address, and the looser "account_global"
+        # buckets by the email alone, which bounds guessing spread over many
+        # addresses.
+        self.RATE_LIMIT_ENABLED: bool = (
+            os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+        )
+        # "memory" or "package.module:ClassName" for a shared backend
+        self.RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory")
+        self.RATE_LIMIT_MAX_KEYS: int = int(
+            os.getenv("RATE_LIMIT_MAX_KEYS", "100000")
+        )
+        # Only trust X-Forwarded-For when running behind a proxy that sets it
+        self.RATE_LIMIT_TRUST_PROXY: bool = (
+            os.getenv("RATE_LIMIT_TRUST_PROXY", "false").lower() == "true"
+        )
+        # Number of trusted proxies in front of the API. Each appends the
+        # address it saw, so the client is this many entries from the right
+        # of X-Forwarded-For; anything further left is client-supplied.
+        self.RATE_LIMIT_TRUSTED_PROXY_HOPS: int = int(
+            os.getenv("RATE_LIMIT_TRUSTED_PROXY_HOPS", "1")
+        )
+        self.RATE_LIMITS: Dict[str, str] = {
+            "auth:ip": os.getenv("RATE_LIMIT_AUTH_IP", "20/60"),
+            "auth:account": os.getenv("RATE_LIMIT_AUTH_ACCOUNT", "10/300"),
+            "auth:account_global": os.getenv("RATE_LIMIT_AUTH_ACCOUNT_GLOBAL", "100/3600"),
+            "password_reset:ip": os.getenv("RATE_LIMIT_PASSWORD_RESET_IP", "5/300"),
+            "password_reset:account": os.getenv(
+                "RATE_LIMIT_PASSWORD_RESET_ACCOUNT", "3/900"
+            ),
+            "password_reset:account_global": os.getenv(
+                "RATE_LIMIT_PASSWORD_RESET_ACCOUNT_GLOBAL", "10/3600"
+            ),
+            "public:ip": os.getenv("RATE_LIMIT_PUBLIC_IP", "300/60"),
+        }
+
         # -----------------------------
         # 🌐 CORS — EXPLICIT ORIGINS ONLY
         # -----------------------------
@@ -115,6 +322,120 @@ class Settings:
             "CLOUDINARY_UPLOAD_FOLDER", "bookitgy/avatars"
         )
 
+        # -----------------------------
+        # Booking creation
+        # -----------------------------
+        # Bookings for the same service are serialized by a row lock on the
+        # service (FOR NO KEY UPDATE, so rows referencing the service can
+        # still be inserted meanwhile). A request waits at most BOOKING_LOCK_TIMEOUT_MS for the
+        # lock and is retried up to BOOKING_MAX_RETRIES times on lock
+        # timeouts, deadlocks or serialization failures before getting a 503.
+        self.BOOKING_LOCK_TIMEOUT_MS: int = int(
+            os.getenv("BOOKING_LOCK_TIMEOUT_MS", "3000")
+        )
+        self.BOOKING_MAX_RETRIES: int = int(os.getenv("BOOKING_MAX_RETRIES", "3"))
+
+        # -----------------------------
+        # Image storage
+        # -----------------------------
+        # Where uploaded image variants are stored: "cloudinary" (default),
+        # "local" (files under MEDIA_ROOT, served by the API at
+        # MEDIA_URL_PATH), "memory" (per process, for benchmarks) or a
+        # "package.module:ClassName" implementing ImageStorage.
+        self.IMAGE_STORAGE_BACKEND: str = os.getenv("IMAGE_STORAGE_BACKEND", "cloudinary")
+        self.MEDIA_ROOT: str = os.getenv("MEDIA_ROOT", "./media")
+        self.MEDIA_URL_PATH: str = "/" + os.getenv("MEDIA_URL_PATH", "/media").strip("/")
+        # Prefix for stored URLs, e.g. "https://api.bookitgy.com"; empty
+        # gives root-relative URLs, which the app resolves against the API
+        self.MEDIA_BASE_URL: str = os.getenv("MEDIA_BASE_URL", "").rstrip("/")
+        # Stored files never change (every upload gets a new name)
+        self.MEDIA_CACHE_MAX_AGE: int = int(
+            os.getenv("MEDIA_CACHE_MAX_AGE", str(365 * 24 * 3600))
+        )
+
+        # -----------------------------
+        # Upload workers
+        # -----------------------------
+        # Image decoding and Cloudinary uploads run in this bounded thread
+        # pool, never on the event loop. Beyond UPLOAD_MAX_PENDING queued or
+        # running jobs, uploads get a 503; a job taking longer than
+        # UPLOAD_TIMEOUT_SECONDS fails the request with a 504.
+        self.UPLOAD_WORKERS: int = int(os.getenv("UPLOAD_WORKERS", "4"))
+        self.UPLOAD_MAX_PENDING: int = int(
+            os.getenv("UPLOAD_MAX_PENDING", str(self.UPLOAD_WORKERS * 4))
+        )
+        self.UPLOAD_TIMEOUT_SECONDS: float = float(
+            os.getenv("UPLOAD_TIMEOUT_SECONDS", "30")
+        )
+
+        # -----------------------------
+        # Image variants
+        # -----------------------------
+        # Uploaded avatars/catalog images are re-encoded (EXIF stripped) into
+        # thumb/medium/full variants in a worker pool: "process" (default),
+        # "thread" or "inline". IMAGE_VARIANT_FORMAT is "webp" or "jpeg".
+        self.IMAGE_VARIANT_FORMAT: str = os.getenv("IMAGE_VARIANT_FORMAT", "webp").lower()
+        self.IMAGE_PROCESS_EXECUTOR: str = os.getenv(
+            "IMAGE_PROCESS_EXECUTOR", "process"
+        ).lower()
+        self.IMAGE_PROCESS_WORKERS: int = int(
+            os.getenv("IMAGE_PROCESS_WORKERS", str(min(2, os.cpu_count() or 1)))
+        )
+
+        # -----------------------------
+        # Bulk catalog upload
+        # -----------------------------
+        # POST /providers/me/catalog/bulk takes up to CATALOG_BULK_MAX_FILES
+        # images (CATALOG_BULK_MAX_BYTES in total) and processes
+        # CATALOG_BULK_CONCURRENCY of them at a time. Each image in flight
+        # holds one image-pool and three upload-pool slots, so keep
+        # concurrency * 3 well under UPLOAD_MAX_PENDING.
+        self.CATALOG_BULK_MAX_FILES: int = int(os.getenv("CATALOG_BULK_MAX_FILES", "25"))
+        self.CATALOG_BULK_MAX_BYTES: int = int(
+            os.getenv("CATALOG_BULK_MAX_BYTES", str(60 * 1024 * 1024))
+        )
+        self.CATALOG_BULK_CONCURRENCY: int = int(
+            os.getenv("CATALOG_BULK_CONCURRENCY", "3")
+        )
+
+        # -----------------------------
+        # Provider directory cache
+        # -----------------------------
+        # In-process cache for /providers and the public per-provider
+        # profile/services/catalog reads. The TTL bounds staleness across
+        # workers; writes in this process invalidate immediately.
+        self.DIRECTORY_CACHE_ENABLED: bool = (
+            os.getenv("DIRECTORY_CACHE_ENABLED", "true").lower() == "true"
+        )
+        self.DIRECTORY_CACHE_MAX_ENTRIES: int = int(
+            os.getenv("DIRECTORY_CACHE_MAX_ENTRIES", "1024")
+        )
+        self.DIRECTORY_CACHE_TTL_SECONDS: int = int(
+            os.getenv("DIRECTORY_CACHE_TTL_SECONDS", "300")
+        )
+
+        # -----------------------------
+        # Pre-rendered JSON response cache
+        # -----------------------------
+        # Encoded (and optionally pre-gzipped) bodies for the hottest public
+        # payloads. Invalidated on the same writes as the directory cache.
+        self.RESPONSE_CACHE_ENABLED: bool = (
+            os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+        )
+        self.RESPONSE_CACHE_MAX_ENTRIES: int = int(
+            os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256")
+        )
+        self.RESPONSE_CACHE_TTL_SECONDS: int = int(
+            os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300")
+        )
+        self.RESPONSE_CACHE_GZIP: bool = (
+            os.getenv("RESPONSE_CACHE_GZIP", "true").lower() == "true"
+        )
+        # Bodies smaller than this aren't worth compressing
+        self.RESPONSE_CACHE_GZIP_MIN_BYTES: int = int(
+            os.getenv("RESPONSE_CACHE_GZIP_MIN_BYTES", "1024")
+        )
+
 
 @lru_cache()
 def get_settings() -> Settings:
@@ -1,21 +1,31 @@
 import os
+import random
+import time
 from datetime import datetime, timedelta, date
 from dateutil import tz
 from decimal import Decimal, ROUND_HALF_UP
+from collections import defaultdict
 from typing import Optional, List
-from sqlalchemy import func
-from sqlalchemy.orm import Session
-from passlib.context import CryptContext
+from sqlalchemy import func, and_, or_, select, text
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.orm import Session, aliased
+from starlette.concurrency import run_in_threadpool
 from twilio.rest import Client
 import requests
 import hashlib
+import base64
 from sqlalchemy import func
-from . import models, schemas
+from . import models, schemas, passwords
+from .config import get_settings
+from .cache import directory_cache, response_cache, invalidate_provider_directory
+from .metrics import booking_create_retries_total, observe_outbound
+from .Logger import logger
 from typing import Optional
 from dotenv import load_dotenv, find_dotenv
 
 load_dotenv(find_dotenv(), override=False)
 
+notify_logger = logger.getChild("notifications")
 
 
 # ---------------------------------------------------------------------------
@@ -24,7 +34,7 @@ load_dotenv(find_dotenv(), override=False)
 
 LOCAL_TZ = tz.gettz("America/Guyana")
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+# Hashing itself runs in a bounded worker pool, see app/passwords.py
 
 
 EXPO_PUSH_URL = "https://exp.host/--/api/v2/push/send"
@@ -52,18 +62,20 @@ def send_push(to_token: Optional[str], title: str, body: str) -> None:
     }
 
     try:
-        requests.post(EXPO_PUSH_URL, json=payload, timeout=5)
+        with observe_outbound("expo"):
+            resp = requests.post(EXPO_PUSH_URL, json=payload, timeout=5)
+            resp.raise_for_status()
     except Exception as e:
-        print(f"Push error: {e}")
+        notify_logger.warning("Push notification failed: %s", e)
 
 def hash_password(password: str) -> str:
     """Return a secure hash for the given plaintext password."""
-    return pwd_context.hash(password)
+    return passwords.hash_password(password)
 
 
 def verify_password(plain: str, hashed: str) -> bool:
     """Verify that a plaintext password matches a stored hash."""
-    return pwd_context.verify(plain, hashed)
+    return passwords.verify_password(plain, hashed)
 
 
 def now_local_naive():
@@ -74,6 +86,16 @@ def now_local_naive():
     return datetime.now(LOCAL_TZ).replace(tzinfo=None)
 
 
+def to_local_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Convert a tz-aware datetime to naive Guyana local time, like the DB
+    columns. Naive values are assumed to be local already.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(LOCAL_TZ).replace(tzinfo=None)
+
+
 
 # ---------------------------------------------------------------------------
 # provider dashboard
@@ -92,6 +114,7 @@ def create_provider_for_user(db: Session, user: models.User):
     db.add(provider)
     db.commit()
     db.refresh(provider)
+    invalidate_provider_directory(provider.id)
     return provider
 
 def get_provider_for_user(db: Session, user_id: int):
@@ -125,27 +148,44 @@ def list_providers(db: Session, profession: Optional[str] = None):
         )
 
     rows = q.all()
+    provider_ids = {provider.id for provider, _ in rows}
+
+    # Professions and service names for all providers in one query each,
+    # like crud_async.list_providers, instead of two queries per provider
+    professions_by_provider = defaultdict(list)
+    services_by_provider = defaultdict(list)
+    if provider_ids:
+        profession_rows = (
+            db.query(models.ProviderProfession.provider_id, models.ProviderProfession.name)
+            .filter(models.ProviderProfession.provider_id.in_(provider_ids))
+            .order_by(models.ProviderProfession.id.asc())
+        )
+        for provider_id, name in profession_rows:
+            professions_by_provider[provider_id].append(name)
 
-    results = []
-    for provider, user in rows:
-        professions = get_professions_for_provider(db, provider.id)
-        services = [svc.name for svc in list_services_for_provider(db, provider.id)]
-
-        results.append(
-            {
-                "provider_id": provider.id,
-                "name": user.full_name or "",
-                "location": user.location or "",
-                "lat": user.lat,
-                "long": user.long,
-                "bio": provider.bio or "",
-                "professions": professions,
-                "services": services,
-                "avatar_url": provider.avatar_url,
-            }
+        service_rows = (
+            db.query(models.Service.provider_id, models.Service.name)
+            .filter(models.Service.provider_id.in_(provider_ids))
+            .order_by(models.Service.id.asc())
         )
+        for provider_id, name in service_rows:
+            services_by_provider[provider_id].append(name)
 
-    return results
+    return [
+        {
+            "provider_id": provider.id,
+            "name": user.full_name or "",
+            "location": user.location or "",
+            "lat": user.lat,
+            "long": user.long,
+            "bio": provider.bio or "",
+            "professions": professions_by_provider[provider.id],
+            "services": services_by_provider[provider.id],
+            "avatar_url": provider.avatar_url,
+            "avatar_thumb_url": provider.avatar_thumb_url,
+        }
+        for provider, user in rows
+    ]
 
 
 def list_services_for_provider(db: Session, provider_id: int):
@@ -156,6 +196,72 @@ def list_services_for_provider(db: Session, provider_id: int):
         .all()
     )
 
+
+def get_provider(db: Session, provider_id: int) -> Optional[models.Provider]:
+    return db.query(models.Provider).filter(models.Provider.id == provider_id).first()
+
+
+# ---------------------------------------------------------------------------
+# Public provider directory (cached)
+# ---------------------------------------------------------------------------
+# These wrap the directory reads above with the in-process directory cache.
+# They return plain dicts rather than ORM rows so cached values never hold on
+# to a closed session. Every write path that changes what they return must
+# call invalidate_provider_directory().
+
+def _columns_as_dict(obj) -> dict:
+    """Snapshot an ORM row's column values so it can outlive its session."""
+    return {col.name: getattr(obj, col.name) for col in obj.__table__.columns}
+
+
+def list_providers_cached(db: Session, profession: Optional[str] = None):
+    key = ("providers", (profession or "").strip().lower())
+    return directory_cache.get_or_load(
+        key, lambda: list_providers(db, profession=profession)
+    )
+
+
+def get_provider_cached(db: Session, provider_id: int) -> Optional[dict]:
+    def load():
+        provider = get_provider(db, provider_id)
+        return _columns_as_dict(provider) if provider else None
+
+    return directory_cache.get_or_load(("provider", provider_id), load)
+
+
+def list_services_for_provider_cached(db: Session, provider_id: int) -> List[dict]:
+    return directory_cache.get_or_load(
+        ("services", provider_id),
+        lambda: [
+            _columns_as_dict(svc)
+            for svc in list_services_for_provider(db, provider_id)
+        ],
+    )
+
+
+def list_catalog_images_for_provider_cached(
+    db: Session,
+    provider_id: int,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    view: str = "full",
+):
+    """
+    Cached list_catalog_images_for_provider for the first page only.
+
+    Cursors come from the client, so caching deeper pages would let anyone
+    evict hot entries by cycling them; those pages are read straight through.
+    """
+    if cursor is not None:
+        return list_catalog_images_for_provider(
+            db, provider_id, limit=limit, cursor=cursor, view=view
+        )
+    return directory_cache.get_or_load(
+        ("catalog", provider_id, view, limit),
+        lambda: list_catalog_images_for_provider(db, provider_id, limit=limit, view=view),
+    )
+
+
 def create_service_for_provider(db: Session, provider_id: int, service_in: schemas.ServiceCreate):
     svc = models.Service(
         provider_id=provider_id,
@@ -167,6 +273,7 @@ def create_service_for_provider(db: Session, provider_id: int, service_in: schem
     db.add(svc)
     db.commit()
     db.refresh(svc)
+    invalidate_provider_directory(provider_id)
     return svc
 
 def get_service_for_provider(
@@ -189,8 +296,32 @@ def delete_service_for_provider(
         return False
     db.delete(svc)
     db.commit()
+    invalidate_provider_directory(provider_id)
     return True
 
+
+def update_service(
+    db: Session,
+    provider_id: int,
+    service_id: int,
+    service_update: schemas.ServiceUpdate,
+) -> Optional[models.Service]:
+    """
+    Partially update one of this provider's services.
+    Only fields that are actually provided (exclude_unset=True) are changed.
+    """
+    svc = get_service_for_provider(db, service_id, provider_id)
+    if not svc:
+        return None
+
+    for field, value in service_update.dict(exclude_unset=True).items():
+        setattr(svc, field, value)
+
+    db.commit()
+    db.refresh(svc)
+    invalidate_provider_directory(provider_id)
+    return svc
+
 def get_or_create_provider_for_user(db: Session, user_id: int) -> models.Provider:
     provider = (
         db.query(models.Provider)
@@ -230,6 +361,7 @@ def update_provider_location(db: Session, provider_id: int, lat: float, long: fl
 
     db.commit()
     db.refresh(provider)
+    invalidate_provider_directory(provider_id)
     return provider
 
 
@@ -252,34 +384,32 @@ def generate_account_number_for_email(email: str) -> str:
 
 twilio_client = None
 if os.getenv("TWILIO_ACCOUNT_SID"):
-    print("[WhatsApp debug] TWILIO_ACCOUNT_SID is set")
     twilio_client = Client(
         os.getenv("TWILIO_ACCOUNT_SID"),
         os.getenv("TWILIO_AUTH_TOKEN"),
     )
-else:
-    print("[WhatsApp debug] TWILIO_ACCOUNT_SID is NOT set")
 
 FROM_NUMBER = os.getenv("TWILIO_WHATSAPP_FROM")
-print(f"[WhatsApp debug] FROM_NUMBER = {FROM_NUMBER!r}")
+notify_logger.info(
+    "WhatsApp sending %s (twilio client: %s, from number: %s)",
+    "enabled" if twilio_client and FROM_NUMBER else "disabled, messages are only logged",
+    "configured" if twilio_client else "missing",
+    "set" if FROM_NUMBER else "missing",
+)
 
 
 def send_whatsapp(to: str, body: str) -> None:
     """Send a WhatsApp message, or log a preview if Twilio isn't configured."""
-    print(
-        "[WhatsApp debug] send_whatsapp called with: "
-        f"client={bool(twilio_client)}, FROM={FROM_NUMBER!r}, to={to!r}"
-    )
-
     if not twilio_client or not to or not FROM_NUMBER:
-        print(f"[WhatsApp Preview] To {to}: {body}")
+        notify_logger.info("WhatsApp preview to %s: %s", to, body)
         return
 
     try:
-        msg = twilio_client.messages.create(from_=FROM_NUMBER, body=body, to=to)
-        print(f"[WhatsApp debug] Twilio message SID: {msg.sid}")
+        with observe_outbound("twilio"):
+            msg = twilio_client.messages.create(from_=FROM_NUMBER, body=body, to=to)
+        notify_logger.debug("WhatsApp message sent", extra={"twilio_sid": msg.sid})
     except Exception as e:
-        print(f"WhatsApp error: {e}")
+        notify_logger.warning("WhatsApp send failed: %s", e)
 
 
 def notify_booking_created(
@@ -343,9 +473,18 @@ def notify_booking_created(
 # User CRUD + authentication
 # ---------------------------------------------------------------------------
 
-def create_user(db: Session, user: schemas.UserCreate) -> models.User:
-    """Create a new user with hashed password."""
-    hashed = hash_password(user.password)
+def create_user(
+    db: Session,
+    user: schemas.UserCreate,
+    hashed_password: Optional[str] = None,
+) -> models.User:
+    """
+    Create a new user with hashed password.
+
+    Async routes pass hashed_password, computed with
+    passwords.hash_password_async; otherwise it is hashed here.
+    """
+    hashed = hashed_password or hash_password(user.password)
     db_user = models.User(
         **user.dict(exclude={"password"}),
         hashed_password=hashed,
@@ -356,26 +495,41 @@ def create_user(db: Session, user: schemas.UserCreate) -> models.User:
     return db_user
 
 
+def get_user(db: Session, user_id: int) -> Optional[models.User]:
+    """Return user by primary key, or None if not found."""
+    return db.get(models.User, user_id)
+
+
 def get_user_by_email(db: Session, email: str):
     """Return user by email, or None if not found."""
     return db.query(models.User).filter(models.User.email == email).first()
 
 
-def authenticate_user(db: Session, email: str, password: str):
+async def authenticate_user_async(db: Session, email: str, password: str):
     """
-    Authenticate a user by email + password.
+    Authenticate a user by email + password, for async routes.
+
+    The hash check is awaited on the hashing pool and the DB work runs in
+    the threadpool.
 
     Returns:
         - user object if credentials are valid
         - None if invalid
     """
-    user = get_user_by_email(db, email)
+    user = await run_in_threadpool(get_user_by_email, db, email)
     if not user:
         return None
 
-    if not verify_password(password, user.hashed_password):
+    ok, new_hash = await passwords.verify_and_update_password_async(
+        password, user.hashed_password
+    )
+    if not ok:
         return None
 
+    # Stored hash used a different cost – upgrade it now we know the password
+    if new_hash:
+        await run_in_threadpool(set_user_password_hash, db, user, new_hash)
+
     return user
 
 def update_user(
@@ -406,15 +560,31 @@ def update_user(
         if field in ALLOWED_USER_FIELDS:
             setattr(user, field, value)
 
+    # A client-supplied avatar URL has no resized variants
+    if "avatar_url" in update_data:
+        user.avatar_thumb_url = None
+        user.avatar_medium_url = None
+
 
     db.commit()
     db.refresh(user)
+
+    # Provider names/locations are shown in the public directory
+    if user.is_provider:
+        provider = get_provider_by_user_id(db, user.id)
+        if provider:
+            invalidate_provider_directory(provider.id)
+
     return user
 
 def set_user_password(db: Session, user: models.User, new_password: str) -> models.User:
     """Update a user's password with a freshly hashed value."""
+    return set_user_password_hash(db, user, hash_password(new_password))
 
-    user.hashed_password = hash_password(new_password)
+
+def set_user_password_hash(db: Session, user: models.User, hashed: str) -> models.User:
+    """Store an already computed password hash for user."""
+    user.hashed_password = hashed
     db.commit()
     db.refresh(user)
     return user
@@ -472,8 +642,110 @@ def get_provider_credit_balance(db: Session, provider_id: int) -> float:
 
 
 # ---------------------------------------------------------------------------
-# Booking with promotion + lock check
+# Booking creation under contention
 # ---------------------------------------------------------------------------
+# The overlap check and the INSERT must be atomic per service, or two
+# customers booking the same slot can both pass the check. Each booking
+# transaction therefore locks its service row first (SELECT ... FOR NO KEY
+# UPDATE); bookings for other services, and all reads, are unaffected. The
+# lock wait is bounded by lock_timeout, and lock timeouts, deadlocks and
+# serialization failures (e.g. under SERIALIZABLE) are retried a bounded
+# number of times.
+
+class BookingBusy(RuntimeError):
+    """The slot stayed locked through every retry; the client should retry."""
+
+
+# SQLSTATEs worth retrying: serialization_failure, deadlock_detected,
+# lock_not_available (lock_timeout)
+_RETRYABLE_SQLSTATES = {"40001": "serialization", "40P01": "deadlock", "55P03": "lock_timeout"}
+
+
+def _retry_reason(exc: DBAPIError) -> Optional[str]:
+    orig = exc.orig
+    sqlstate = getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+    if sqlstate in _RETRYABLE_SQLSTATES:
+        return _RETRYABLE_SQLSTATES[sqlstate]
+    # SQLite reports a busy write lock as "database is locked"
+    if "database is locked" in str(orig):
+        return "lock_timeout"
+    return None
+
+
+def _lock_service_for_booking(db: Session, service_id: int) -> None:
+    """Hold the per-service booking lock until this transaction ends."""
+    if db.get_bind().dialect.name == "sqlite":
+        # No row locks: take SQLite's (database-wide) write lock up front,
+        # which its busy timeout bounds
+        db.execute(text("UPDATE services SET id = id WHERE id = :id"), {"id": service_id})
+        return
+
+    timeout_ms = max(0, int(get_settings().BOOKING_LOCK_TIMEOUT_MS))
+    db.execute(text(f"SET LOCAL lock_timeout = '{timeout_ms}ms'"))
+    # FOR NO KEY UPDATE: conflicts with other booking locks, but not with the
+    # KEY SHARE locks taken by inserts whose foreign keys reference the service
+    db.execute(
+        select(models.Service.id)
+        .where(models.Service.id == service_id)
+        .with_for_update(key_share=True)
+    )
+
+
+def _insert_booking_locked(
+    db: Session,
+    customer_id: int,
+    service: models.Service,
+    start_time: datetime,
+    end_time: datetime,
+) -> models.Booking:
+    """Lock the service, re-check the slot and insert, retrying on contention."""
+    max_retries = max(0, get_settings().BOOKING_MAX_RETRIES)
+
+    for attempt in range(max_retries + 1):
+        try:
+            _lock_service_for_booking(db, service.id)
+
+            # Check overlapping *future/ongoing* confirmed bookings for this
+            # same service; under the lock no other booking can slip in
+            now = now_local_naive()
+            overlap = (
+                db.query(models.Booking.id)
+                .filter(models.Booking.service_id == service.id)
+                .filter(models.Booking.status == "confirmed")
+                .filter(models.Booking.end_time > now)  # ignore bookings that already ended
+                .filter(
+                    models.Booking.start_time < end_time,
+                    models.Booking.end_time > start_time,
+                )
+                .first()
+            )
+            if overlap:
+                db.rollback()
+                raise ValueError("Selected slot is no longer available")
+
+            new_booking = models.Booking(
+                customer_id=customer_id,
+                service_id=service.id,
+                start_time=start_time,
+                end_time=end_time,
+                status="confirmed",
+            )
+            db.add(new_booking)
+            db.commit()
+            return new_booking
+        except DBAPIError as exc:
+            db.rollback()
+            reason = _retry_reason(exc)
+            if reason is None:
+                raise
+            booking_create_retries_total.labels(reason).inc()
+            if attempt == max_retries:
+                raise BookingBusy(
+                    "This time slot is busy, please try again in a moment"
+                ) from exc
+            # Jittered backoff so retried requests don't collide again
+            time.sleep(random.uniform(0.01, 0.05) * (2 ** attempt))
+
 
 def create_booking(
     db: Session,
@@ -485,9 +757,13 @@ def create_booking(
 
     Flow:
     1. Validate service / provider.
-    2. Validate that the selected slot is not already booked.
+    2. Validate that the selected slot is not already booked (under the
+       per-service booking lock, see _insert_booking_locked).
     3. Create booking (confirmed).
     4. Dispatch notifications (single helper).
+
+    Raises ValueError for an invalid request or a taken slot and
+    BookingBusy when the service stayed locked through every retry.
     """
 
     # Load service
@@ -529,34 +805,9 @@ def create_booking(
         minutes=service.duration_minutes
     )
 
-    # Check overlapping *future/ongoing* confirmed bookings for this same service
-    overlap = (
-        db.query(models.Booking)
-        .filter(models.Booking.service_id == booking.service_id)
-        .filter(models.Booking.status == "confirmed")
-        .filter(models.Booking.end_time > now)  # ignore bookings that already ended
-        .filter(
-            models.Booking.start_time < end_time,
-            models.Booking.end_time > booking.start_time,
-        )
-        .first()
-    )
-
-    if overlap:
-        # This slot is taken
-        raise ValueError("Selected slot is no longer available")
-
-    # Create booking
-    new_booking = models.Booking(
-        customer_id=customer_id,
-        service_id=service.id,
-        start_time=booking.start_time,
-        end_time=end_time,
-        status="confirmed",
+    new_booking = _insert_booking_locked(
+        db, customer_id, service, booking.start_time, end_time
     )
-
-    db.add(new_booking)
-    db.commit()
     db.refresh(new_booking)
 
     # Load customer
@@ -809,38 +1060,27 @@ def get_provider_fees_due(db: Session, provider_id: int) -> float:
 
 
 
-def get_provider_current_month_due_from_upcoming_bookings(
-    db: Session, provider_id: int
-) -> float:
-    """
-    Compute the provider's current-month amount due based on upcoming bookings.
-
-    This is intentionally aligned with the provider-facing billing screen logic:
-    - Uses /providers/me/bookings semantics (upcoming bookings from now onward),
-    - Filters those bookings to the current calendar month,
-    - Applies the platform service charge percentage,
-    - Applies available bill credits, but never returns a negative value.
-    """
+def _current_month_upcoming_totals(db: Session, provider_ids) -> dict:
+    """{provider_id: Decimal} of upcoming current-month booking prices."""
     now = datetime.utcnow()
     today = now.date()
 
     # Mirror list_bookings_for_provider: upcoming bookings from now onward
     rows = (
         db.query(
+            models.Service.provider_id,
             models.Booking.start_time,
             models.Service.price_gyd.label("service_price_gyd"),
         )
         .join(models.Service, models.Booking.service_id == models.Service.id)
-        .join(models.Provider, models.Service.provider_id == models.Provider.id)
         .filter(
-            models.Provider.id == provider_id,
+            models.Service.provider_id.in_(provider_ids),
             models.Booking.start_time >= now,
         )
-        .order_by(models.Booking.start_time.asc())
         .all()
     )
 
-    services_total = Decimal("0")
+    totals = defaultdict(Decimal)
     for r in rows:
         start = r.start_time
         if not start:
@@ -849,13 +1089,12 @@ def get_provider_current_month_due_from_upcoming_bookings(
         if start.year != today.year or start.month != today.month:
             continue
         price = r.service_price_gyd or 0
-        services_total += Decimal(str(price))
+        totals[r.provider_id] += Decimal(str(price))
+    return totals
 
-    if services_total <= 0:
-        return 0.0
 
+def _current_month_due(services_total: Decimal, service_charge_pct, credits) -> float:
     # Same platform fee percentage used for billing
-    service_charge_pct = get_platform_service_charge_percentage(db)
     fee_rate = Decimal(str(max(service_charge_pct, 0))) / Decimal("100")
     platform_fee = services_total * fee_rate
 
@@ -864,7 +1103,7 @@ def get_provider_current_month_due_from_upcoming_bookings(
     if platform_fee <= 0:
         return 0.0
 
-    credits = Decimal(str(get_provider_credit_balance(db, provider_id) or 0))
+    credits = Decimal(str(credits or 0))
     applied_credits = min(credits, platform_fee)
     total_due = platform_fee - applied_credits
 
@@ -874,34 +1113,101 @@ def get_provider_current_month_due_from_upcoming_bookings(
     return float(total_due)
 
 
+def get_provider_current_month_due_from_upcoming_bookings(
+    db: Session, provider_id: int
+) -> float:
+    """
+    Compute the provider's current-month amount due based on upcoming bookings.
 
+    This is intentionally aligned with the provider-facing billing screen logic:
+    - Uses /providers/me/bookings semantics (upcoming bookings from now onward),
+    - Filters those bookings to the current calendar month,
+    - Applies the platform service charge percentage,
+    - Applies available bill credits, but never returns a negative value.
+    """
+    services_total = _current_month_upcoming_totals(db, [provider_id]).get(provider_id)
+    if not services_total or services_total <= 0:
+        return 0.0
 
-def _provider_billing_row(db: Session, provider: models.Provider, user: models.User):
-    latest_bill = (
-        db.query(models.Bill)
-        .filter(models.Bill.provider_id == provider.id)
-        .order_by(models.Bill.due_date.desc())
-        .first()
+    return _current_month_due(
+        services_total,
+        get_platform_service_charge_percentage(db),
+        get_provider_credit_balance(db, provider_id),
     )
 
-    if latest_bill:
-        amount_due = get_provider_current_month_due_from_upcoming_bookings(db, provider.id)
-        is_paid = bool(latest_bill.is_paid)
-    else:
-        amount_due = 0.0
-        is_paid = True
 
-    return {
-        "provider_id": provider.id,
-        "name": user.full_name or "",
-        "account_number": provider.account_number or "",
-        "phone": user.phone or "",
-        "amount_due_gyd": float(amount_due or 0.0),
-        "is_paid": is_paid,
-        "is_locked": bool(getattr(provider, "is_locked", False)),
-        "last_due_date": latest_bill.due_date if latest_bill else None,
+def _provider_billing_rows(db: Session, rows) -> List[dict]:
+    """
+    Billing rows for (provider, user) pairs.
+
+    Latest bills, upcoming booking totals and credit balances are each loaded
+    with one query for all providers instead of several per provider.
+    """
+    provider_ids = [provider.id for provider, _ in rows]
+    if not provider_ids:
+        return []
+
+    latest_due = (
+        db.query(
+            models.Bill.provider_id,
+            func.max(models.Bill.due_date).label("due_date"),
+        )
+        .filter(models.Bill.provider_id.in_(provider_ids))
+        .group_by(models.Bill.provider_id)
+        .subquery()
+    )
+    latest_bills = {
+        bill.provider_id: bill
+        for bill in db.query(models.Bill).join(
+            latest_due,
+            and_(
+                models.Bill.provider_id == latest_due.c.provider_id,
+                models.Bill.due_date == latest_due.c.due_date,
+            ),
+        )
     }
 
+    # Only billed providers have an amount due
+    totals = (
+        _current_month_upcoming_totals(db, list(latest_bills)) if latest_bills else {}
+    )
+    due_ids = [provider_id for provider_id, total in totals.items() if total > 0]
+    amounts_due = {}
+    if due_ids:
+        service_charge_pct = get_platform_service_charge_percentage(db)
+        credits = dict(
+            db.query(
+                models.BillCredit.provider_id,
+                func.coalesce(func.sum(models.BillCredit.amount_gyd), 0),
+            )
+            .filter(models.BillCredit.provider_id.in_(due_ids))
+            .group_by(models.BillCredit.provider_id)
+            .all()
+        )
+        amounts_due = {
+            provider_id: _current_month_due(
+                totals[provider_id], service_charge_pct, credits.get(provider_id)
+            )
+            for provider_id in due_ids
+        }
+
+    result = []
+    for provider, user in rows:
+        latest_bill = latest_bills.get(provider.id)
+        result.append(
+            {
+                "provider_id": provider.id,
+                "name": user.full_name or "",
+                "account_number": provider.account_number or "",
+                "phone": user.phone or "",
+                "amount_due_gyd": float(amounts_due.get(provider.id) or 0.0),
+                "is_paid": bool(latest_bill.is_paid) if latest_bill else True,
+                "is_locked": bool(getattr(provider, "is_locked", False)),
+                "last_due_date": latest_bill.due_date if latest_bill else None,
+            }
+        )
+    return result
+
 
 def list_provider_billing_rows(db: Session):
     rows = (
@@ -910,7 +1216,7 @@ def list_provider_billing_rows(db: Session):
         .all()
     )
 
-    return [_provider_billing_row(db, provider, user) for provider, user in rows]
+    return _provider_billing_rows(db, rows)
 
 
 def get_provider_billing_row(db: Session, provider_id: int):
@@ -924,8 +1230,7 @@ def get_provider_billing_row(db: Session, provider_id: int):
     if not row:
         return None
 
-    provider, user = row
-    return _provider_billing_row(db, provider, user)
+    return _provider_billing_rows(db, [row])[0]
 
 
 def set_provider_bills_paid_state(db: Session, provider_id: int, is_paid: bool) -> int:
@@ -947,14 +1252,120 @@ def set_provider_lock_state(db: Session, provider_id: int, is_locked: bool) -> i
     )
 
     db.commit()
+    invalidate_provider_directory(provider_id)
     return updated
 
 
-def list_bookings_for_provider(db: Session, provider_id: int):
-    """Return upcoming bookings for this provider (from now onwards)."""
-    now = datetime.utcnow()
+# ---------------------------------------------------------------------------
+# Booking list pagination
+# ---------------------------------------------------------------------------
+# Booking lists are paged with an opaque keyset cursor on (start_time, id):
+# the cursor is the position of the last row of the previous page, so each
+# page is a single index range scan no matter how deep into history it is.
 
-    rows = (
+BOOKING_LIST_WHEN_VALUES = ("upcoming", "past")
+BOOKING_STATUSES = ("confirmed", "pending", "cancelled", "completed")
+
+
+def _encode_keyset_cursor(position: datetime, row_id: int) -> str:
+    raw = f"{position.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_keyset_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        position_raw, id_raw = raw.split("|", 1)
+        return datetime.fromisoformat(position_raw), int(id_raw)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def encode_booking_cursor(start_time: datetime, booking_id: int) -> str:
+    return _encode_keyset_cursor(start_time, booking_id)
+
+
+def decode_booking_cursor(cursor: str):
+    """Return (start_time, booking_id) for a cursor, or raise ValueError."""
+    return _decode_keyset_cursor(cursor)
+
+
+def _apply_booking_keyset(q, cursor: Optional[str], descending: bool):
+    """Order q by (start_time, id) and skip everything up to cursor."""
+    if descending:
+        q = q.order_by(models.Booking.start_time.desc(), models.Booking.id.desc())
+    else:
+        q = q.order_by(models.Booking.start_time.asc(), models.Booking.id.asc())
+
+    if not cursor:
+        return q
+
+    after_start, after_id = decode_booking_cursor(cursor)
+    if descending:
+        return q.filter(
+            or_(
+                models.Booking.start_time < after_start,
+                and_(
+                    models.Booking.start_time == after_start,
+                    models.Booking.id < after_id,
+                ),
+            )
+        )
+
+    return q.filter(
+        or_(
+            models.Booking.start_time > after_start,
+            and_(
+                models.Booking.start_time == after_start,
+                models.Booking.id > after_id,
+            ),
+        )
+    )
+
+
+def _filter_booking_window(
+    q,
+    start_from: Optional[datetime] = None,
+    start_to: Optional[datetime] = None,
+    status: Optional[str] = None,
+):
+    """Restrict q to bookings starting in [start_from, start_to) with status."""
+    if status is not None and status not in BOOKING_STATUSES:
+        raise ValueError(
+            "status must be one of: " + ", ".join(BOOKING_STATUSES)
+        )
+    if start_from is not None and start_to is not None and start_to <= start_from:
+        raise ValueError("'to' must be after 'from'")
+
+    if start_from is not None:
+        q = q.filter(models.Booking.start_time >= start_from)
+    if start_to is not None:
+        q = q.filter(models.Booking.start_time < start_to)
+    if status is not None:
+        q = q.filter(models.Booking.status == status)
+    return q
+
+
+def list_bookings_for_provider(
+    db: Session,
+    provider_id: int,
+    start_from: Optional[datetime] = None,
+    start_to: Optional[datetime] = None,
+    status: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+):
+    """
+    Return bookings for this provider, soonest first.
+
+    Without start_from this is the upcoming list (from now onwards).
+    start_from/start_to select a start_time range instead, status filters
+    by booking status, and limit/cursor page through the results.
+    """
+    if start_from is None:
+        start_from = datetime.utcnow()
+
+    q = (
         db.query(
             models.Booking.id,
             models.Booking.start_time,
@@ -966,15 +1377,16 @@ def list_bookings_for_provider(db: Session, provider_id: int):
             
         )
         .join(models.Service, models.Booking.service_id == models.Service.id)
-        .join(models.Provider, models.Service.provider_id == models.Provider.id)
         .join(models.User, models.Booking.customer_id == models.User.id)
-        .filter(
-            models.Provider.id == provider_id,
-            models.Booking.start_time >= now,
-        )
-        .order_by(models.Booking.start_time.asc())
-        .all()
+        .filter(models.Service.provider_id == provider_id)
     )
+    q = _filter_booking_window(q, start_from, start_to, status)
+    q = _apply_booking_keyset(q, cursor, descending=False)
+
+    if limit:
+        q = q.limit(limit)
+
+    rows = q.all()
 
     return [
         {
@@ -989,76 +1401,82 @@ def list_bookings_for_provider(db: Session, provider_id: int):
         for r in rows
     ]
 
-def list_bookings_for_customer(db: Session, customer_id: int):
+def list_bookings_for_customer(
+    db: Session,
+    customer_id: int,
+    when: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+):
     """
-    Return all bookings for this customer, newest first.
+    Return bookings for this customer with service + provider details.
+
+    - when=None: all bookings, newest first (original behaviour).
+    - when="upcoming": bookings that haven't ended yet, soonest first.
+    - when="past": bookings that have ended, newest first.
+
+    limit/cursor page through the results (see encode_booking_cursor).
+    Everything comes from one joined query regardless of how many bookings
+    the customer has.
     """
-    user = (
-        db.query(models.User)
-        .filter(models.User.id == customer_id)
-        .first()
-    )
+    if when is not None and when not in BOOKING_LIST_WHEN_VALUES:
+        raise ValueError("when must be 'upcoming' or 'past'")
 
-    if not user:
-        return []
+    Customer = aliased(models.User)
+    ProviderUser = aliased(models.User)
 
-    rows = (
-        db.query(models.Booking, models.Service)
+    q = (
+        db.query(
+            models.Booking.id,
+            models.Booking.start_time,
+            models.Booking.end_time,
+            models.Booking.status,
+            models.Service.name.label("service_name"),
+            models.Service.duration_minutes.label("service_duration_minutes"),
+            models.Service.price_gyd.label("service_price_gyd"),
+            Customer.full_name.label("customer_name"),
+            Customer.phone.label("customer_phone"),
+            ProviderUser.full_name.label("provider_name"),
+            ProviderUser.location.label("provider_location"),
+            ProviderUser.lat.label("provider_lat"),
+            ProviderUser.long.label("provider_long"),
+        )
         .join(models.Service, models.Booking.service_id == models.Service.id)
+        .join(Customer, models.Booking.customer_id == Customer.id)
+        .outerjoin(models.Provider, models.Service.provider_id == models.Provider.id)
+        .outerjoin(ProviderUser, models.Provider.user_id == ProviderUser.id)
         .filter(models.Booking.customer_id == customer_id)
-        .order_by(models.Booking.start_time.desc())
-        .all()
     )
 
-    results: list[schemas.BookingWithDetails] = []
+    now = now_local_naive()
+    if when == "upcoming":
+        q = q.filter(models.Booking.end_time > now)
+    elif when == "past":
+        q = q.filter(models.Booking.end_time <= now)
 
-    for booking, service in rows:
-        provider_name = ""
-        provider_location = ""
-        provider_lat = None
-        provider_long = None
+    q = _apply_booking_keyset(q, cursor, descending=(when != "upcoming"))
 
-        if service:
-            provider = (
-                db.query(models.Provider)
-                .filter(models.Provider.id == service.provider_id)
-                .first()
-            )
-            if provider:
-                provider_user = (
-                    db.query(models.User)
-                    .filter(models.User.id == provider.user_id)
-                    .first()
-                )
-                if provider_user:
-                    provider_name = provider_user.full_name or ""
-                    provider_location = provider_user.location or ""
-                    provider_lat = provider_user.lat
-                    provider_long = provider_user.long
+    if limit:
+        q = q.limit(limit)
 
-        results.append(
-            schemas.BookingWithDetails(
-                id=booking.id,
-                start_time=booking.start_time,
-                end_time=booking.end_time,
-                status=booking.status,
-                service_name=service.name if service else "",
-                service_duration_minutes=service.duration_minutes if service else 0,
-                service_price_gyd=(
-                    float(service.price_gyd or 0.0)
-                    if service and service.price_gyd is not None
-                    else 0.0
-                ),
-                customer_name=user.full_name or "",
-                customer_phone=user.phone or "",
-                provider_name=provider_name,
-                provider_location=provider_location,
-                provider_lat=provider_lat,
-                provider_long=provider_long,
-            )
+    return [
+        schemas.BookingWithDetails(
+            id=r.id,
+            start_time=r.start_time,
+            end_time=r.end_time,
+            status=r.status,
+            service_name=r.service_name or "",
+            service_duration_minutes=r.service_duration_minutes or 0,
+            service_price_gyd=float(r.service_price_gyd or 0.0),
+            customer_name=r.customer_name or "",
+            customer_phone=r.customer_phone or "",
+            provider_name=r.provider_name or "",
+            provider_location=r.provider_location or "",
+            provider_lat=r.provider_lat,
+            provider_long=r.provider_long,
         )
-
-    return results
+        for r in q.all()
+    ]
 
 
 
@@ -1211,6 +1629,7 @@ def set_working_hours_for_provider(db: Session, provider_id: int, hours_list):
         wh.end_time = end_time
 
     db.commit()
+    response_cache.invalidate_provider(provider_id)
 
     # return updated rows
     rows = (
@@ -1259,6 +1678,7 @@ def set_professions_for_provider(
         db.add(models.ProviderProfession(provider_id=provider_id, name=name))
 
     db.commit()
+    invalidate_provider_directory(provider_id)
 
     rows = (
         db.query(models.ProviderProfession)
@@ -1268,13 +1688,80 @@ def set_professions_for_provider(
     )
     return [r.name for r in rows]
 
-def list_catalog_images_for_provider(db: Session, provider_id: int):
-    return (
-        db.query(models.ProviderCatalogImage)
-        .filter(models.ProviderCatalogImage.provider_id == provider_id)
-        .order_by(models.ProviderCatalogImage.created_at.desc())
-        .all()
+# Catalog pages use the same opaque keyset cursor as booking lists, on
+# (created_at, id) newest first, served by the (provider_id, created_at, id)
+# index. view="thumbs" selects only id and thumbnail URL for grids.
+
+CATALOG_VIEWS = ("full", "thumbs")
+
+
+def catalog_page_stmt(
+    provider_id: int,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    view: str = "full",
+):
+    """SELECT for one catalog page (shared by the sync and async reads)."""
+    if view not in CATALOG_VIEWS:
+        raise ValueError("view must be 'full' or 'thumbs'")
+
+    image = models.ProviderCatalogImage
+    if view == "thumbs":
+        stmt = select(
+            image.id,
+            # Images uploaded before variants existed have no thumbnail
+            func.coalesce(image.thumb_url, image.image_url).label("thumb_url"),
+            image.created_at,
+        )
+    else:
+        stmt = select(image)
+
+    stmt = stmt.where(image.provider_id == provider_id).order_by(
+        image.created_at.desc(), image.id.desc()
     )
+    if cursor:
+        after_created, after_id = _decode_keyset_cursor(cursor)
+        stmt = stmt.where(
+            or_(
+                image.created_at < after_created,
+                and_(image.created_at == after_created, image.id < after_id),
+            )
+        )
+    if limit:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def catalog_page_from_rows(rows, limit: Optional[int], view: str = "full"):
+    """(items as dicts, cursor for the next page or None) from page rows."""
+    if view == "thumbs":
+        items = [{"id": row.id, "thumb_url": row.thumb_url} for row in rows]
+    else:
+        items = [_columns_as_dict(row) for row in rows]
+
+    next_cursor = None
+    if limit and len(rows) == limit and rows[-1].created_at is not None:
+        next_cursor = _encode_keyset_cursor(rows[-1].created_at, rows[-1].id)
+    return items, next_cursor
+
+
+def list_catalog_images_for_provider(
+    db: Session,
+    provider_id: int,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    view: str = "full",
+):
+    """
+    One page of a provider's catalog, newest first: (items, next_cursor).
+
+    Without limit every image is returned. Raises ValueError for a bad
+    cursor or view.
+    """
+    stmt = catalog_page_stmt(provider_id, limit=limit, cursor=cursor, view=view)
+    result = db.execute(stmt)
+    rows = result.scalars().all() if view == "full" else result.all()
+    return catalog_page_from_rows(rows, limit, view)
 
 
 def add_catalog_image_for_provider(
@@ -1282,18 +1769,58 @@ def add_catalog_image_for_provider(
     provider_id: int,
     image_url: str,
     caption: Optional[str] = None,
+    thumb_url: Optional[str] = None,
+    medium_url: Optional[str] = None,
 ):
     item = models.ProviderCatalogImage(
         provider_id=provider_id,
         image_url=image_url,
+        thumb_url=thumb_url,
+        medium_url=medium_url,
         caption=caption or None,
     )
     db.add(item)
     db.commit()
     db.refresh(item)
+    invalidate_provider_directory(provider_id)
     return item
 
 
+def add_catalog_images_for_provider(
+    db: Session,
+    provider_id: int,
+    images: List[dict],
+) -> List[models.ProviderCatalogImage]:
+    """
+    Insert several catalog images in one transaction.
+
+    images: dicts with image_url and optional thumb_url, medium_url, caption.
+    """
+    items = [
+        models.ProviderCatalogImage(
+            provider_id=provider_id,
+            image_url=image["image_url"],
+            thumb_url=image.get("thumb_url"),
+            medium_url=image.get("medium_url"),
+            caption=image.get("caption") or None,
+        )
+        for image in images
+    ]
+    db.add_all(items)
+    db.flush()
+    ids = [item.id for item in items]
+    db.commit()
+    invalidate_provider_directory(provider_id)
+
+    # One SELECT for all rows instead of a refresh per row
+    return (
+        db.query(models.ProviderCatalogImage)
+        .filter(models.ProviderCatalogImage.id.in_(ids))
+        .order_by(models.ProviderCatalogImage.id)
+        .all()
+    )
+
+
 def delete_catalog_image_for_provider(
     db: Session,
     provider_id: int,
@@ -1312,9 +1839,89 @@ def delete_catalog_image_for_provider(
 
     db.delete(item)
     db.commit()
+    invalidate_provider_directory(provider_id)
     return True
 
 
+def get_stored_image(db: Session, content_hash: str, backend: str, folder: str):
+    """Stored variants for an earlier upload of the same bytes, if any."""
+    return (
+        db.query(models.StoredImage)
+        .filter(
+            models.StoredImage.content_hash == content_hash,
+            models.StoredImage.backend == backend,
+            models.StoredImage.folder == folder,
+        )
+        .first()
+    )
+
+
+def mark_stored_image_reused(db: Session, stored: models.StoredImage) -> None:
+    # Atomic increment: concurrent re-uploads must not lose counts
+    db.query(models.StoredImage).filter(models.StoredImage.id == stored.id).update(
+        {
+            models.StoredImage.reuse_count: models.StoredImage.reuse_count + 1,
+            models.StoredImage.last_used_at: datetime.utcnow(),
+        },
+        synchronize_session=False,
+    )
+    db.commit()
+
+
+def record_stored_image(
+    db: Session,
+    content_hash: str,
+    backend: str,
+    folder: str,
+    size_bytes: int,
+    image_url: str,
+    thumb_url: Optional[str] = None,
+    medium_url: Optional[str] = None,
+):
+    """
+    Index freshly uploaded variants by content hash.
+
+    If a concurrent upload of the same file got there first, its row wins
+    and is returned; this upload's copies are simply left unreferenced.
+    """
+    stored = models.StoredImage(
+        content_hash=content_hash,
+        backend=backend,
+        folder=folder,
+        size_bytes=size_bytes,
+        image_url=image_url,
+        thumb_url=thumb_url,
+        medium_url=medium_url,
+    )
+    db.add(stored)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return get_stored_image(db, content_hash, backend, folder)
+    db.refresh(stored)
+    return stored
+
+
+def get_image_dedupe_stats(db: Session) -> dict:
+    """Upload dedupe totals since the index was created (all workers)."""
+    images, reuses, bytes_saved = db.query(
+        func.count(models.StoredImage.id),
+        func.coalesce(func.sum(models.StoredImage.reuse_count), 0),
+        func.coalesce(
+            func.sum(models.StoredImage.reuse_count * models.StoredImage.size_bytes), 0
+        ),
+    ).one()
+    uploads = images + reuses
+    return {
+        "stored_images": images,
+        "uploads": uploads,
+        "dedupe_hits": reuses,
+        "hit_ratio": (reuses / uploads) if uploads else 0.0,
+        "bytes_saved": bytes_saved,
+    }
+
+
 
 def get_provider_availability(
     db: Session,
@@ -1343,9 +1950,68 @@ def get_provider_availability(
     if not service:
         raise ValueError("Service not found for this provider")
 
-    # Load working hours (creates defaults if missing)
-    working_hours = get_or_create_working_hours_for_provider(db, provider_id)
+    # Plain read (no default rows created) so this can run on a read replica;
+    # a provider without working hours is closed every day either way.
+    working_hours = (
+        db.query(models.ProviderWorkingHours)
+        .filter(models.ProviderWorkingHours.provider_id == provider_id)
+        .all()
+    )
+
+    return _compute_availability(db, provider_id, service, working_hours, days)
+
+
+def _compute_availability(
+    db: Session,
+    provider_id: int,
+    service: models.Service,
+    working_hours,
+    days: int,
+):
+    """
+    Slot computation behind get_provider_availability.
+
+    Takes the already-loaded service and working-hours rows so callers that
+    have them (e.g. the provider page) don't query them twice, and loads the
+    confirmed bookings for the whole window in one query.
+    """
+    # Use Guyana local "now"
+    now = now_local_naive()
+
+    day_windows = availability_day_windows(working_hours, days, now)
+    if not day_windows:
+        return []
+
+    # Existing confirmed bookings for this provider across the whole window
+    window_start = min(w[1] for w in day_windows)
+    window_end = max(w[2] for w in day_windows)
+    all_bookings = (
+        db.query(models.Booking.start_time, models.Booking.end_time)
+        .join(models.Service, models.Booking.service_id == models.Service.id)
+        .filter(
+            models.Service.provider_id == provider_id,
+            models.Booking.start_time >= window_start,
+            models.Booking.start_time < window_end,
+            models.Booking.status == "confirmed",
+        )
+        .all()
+    )
+
+    return availability_slots(
+        day_windows,
+        all_bookings,
+        timedelta(minutes=service.duration_minutes),
+        now,
+    )
+
+
+def availability_day_windows(working_hours, days: int, now: datetime):
+    """
+    Each open day's (date, day_start, day_end) window over the next `days`,
+    from the provider's working-hours rows.
 
+    Pure (no DB access), shared by the sync and async availability paths.
+    """
     # Map weekday -> working hours row (only open days with valid times)
     wh_by_weekday = {}
     for wh in working_hours:
@@ -1355,13 +2021,7 @@ def get_provider_availability(
             continue
         wh_by_weekday[wh.weekday] = wh
 
-    availability = []
-
-    # Use Guyana local "now"
-    now = now_local_naive()
-
-    slot_duration = timedelta(minutes=service.duration_minutes)
-
+    day_windows = []
     for offset in range(days):
         day_date = (now + timedelta(days=offset)).date()
         weekday = day_date.weekday()
@@ -1385,27 +2045,32 @@ def get_provider_availability(
         day_end = datetime(
             day_date.year, day_date.month, day_date.day, end_hour, end_minute
         )
+        day_windows.append((day_date, day_start, day_end))
 
-        is_today = (day_date == now.date())
+    return day_windows
 
-        # Get existing confirmed bookings for this provider on that day
-        bookings = (
-            db.query(models.Booking)
-            .join(models.Service, models.Booking.service_id == models.Service.id)
-            .filter(
-                models.Service.provider_id == provider_id,
-                models.Booking.start_time >= day_start,
-                models.Booking.start_time < day_end,
-                models.Booking.status == "confirmed",
-            )
-            .all()
+
+def availability_slots(day_windows, all_bookings, slot_duration: timedelta, now: datetime):
+    """
+    Free slot start times per day, given the confirmed bookings (rows with
+    start_time/end_time) across all of day_windows.
+    """
+
+    def overlaps(slot_start, slot_end, booking):
+        # True if times intersect
+        return not (
+            slot_end <= booking.start_time or slot_start >= booking.end_time
         )
 
-        def overlaps(slot_start, slot_end, booking):
-            # True if times intersect
-            return not (
-                slot_end <= booking.start_time or slot_start >= booking.end_time
-            )
+    availability = []
+
+    for day_date, day_start, day_end in day_windows:
+        is_today = (day_date == now.date())
+
+        # Bookings that start inside this day's working hours
+        bookings = [
+            b for b in all_bookings if day_start <= b.start_time < day_end
+        ]
 
         slot_start = day_start
         slots_for_day = []
@@ -1443,30 +2108,91 @@ def get_provider_availability(
     return availability
 
 
-
-def list_todays_bookings_for_provider(db: Session, provider_id: int):
+def get_provider_page(
+    db: Session,
+    provider_id: int,
+    catalog_limit: int = 12,
+    service_id: Optional[int] = None,
+    availability_days: int = 0,
+) -> Optional[schemas.ProviderPageOut]:
     """
-    All *confirmed* bookings for this provider whose start_time is today
-    and that have not finished yet.
+    Everything the app shows when opening a provider, in one payload.
+
+    Profile, professions, services, working hours and the newest
+    catalog_limit images each take a single query. When service_id and
+    availability_days are given, the first availability days are included
+    using the services/hours already loaded (one extra bookings query).
+
+    Returns None if the provider doesn't exist. Unlike the provider's own
+    working-hours endpoint this never creates default hours rows.
     """
-    now = now_local_naive()   # ⬅ Guyana local date for “today”
-    start_of_day = datetime(now.year, now.month, now.day)
-    end_of_day = start_of_day + timedelta(days=1)
+    row = (
+        db.query(models.Provider, models.User)
+        .join(models.User, models.Provider.user_id == models.User.id)
+        .filter(models.Provider.id == provider_id)
+        .first()
+    )
+    if not row:
+        return None
+    provider, user = row
 
-    q = (
+    professions = get_professions_for_provider(db, provider_id)
+    services = list_services_for_provider(db, provider_id)
+    working_hours = (
+        db.query(models.ProviderWorkingHours)
+        .filter(models.ProviderWorkingHours.provider_id == provider_id)
+        .order_by(models.ProviderWorkingHours.weekday.asc())
+        .all()
+    )
+    catalog = (
+        db.execute(catalog_page_stmt(provider_id, limit=catalog_limit)).scalars().all()
+        if catalog_limit
+        else []
+    )
+    _, catalog_next_cursor = catalog_page_from_rows(catalog, catalog_limit)
+
+    availability = None
+    if service_id is not None and availability_days > 0:
+        service = next((svc for svc in services if svc.id == service_id), None)
+        if not service:
+            raise ValueError("Service not found for this provider")
+        availability = _compute_availability(
+            db, provider_id, service, working_hours, availability_days
+        )
+
+    return schemas.ProviderPageOut(
+        provider_id=provider.id,
+        name=user.full_name or "",
+        location=user.location or "",
+        lat=user.lat,
+        long=user.long,
+        bio=provider.bio or "",
+        avatar_url=provider.avatar_url,
+        avatar_thumb_url=provider.avatar_thumb_url,
+        avatar_medium_url=provider.avatar_medium_url,
+        professions=professions,
+        services=[schemas.ServiceOut.model_validate(svc) for svc in services],
+        working_hours=[
+            schemas.WorkingHoursOut.model_validate(wh, from_attributes=True)
+            for wh in working_hours
+        ],
+        catalog=[schemas.ProviderCatalogImageOut.model_validate(img) for img in catalog],
+        catalog_next_cursor=catalog_next_cursor,
+        availability=availability,
+    )
+
+
+
+def _provider_booking_details(db: Session, provider_id: int):
+    return (
         db.query(models.Booking, models.Service, models.User)
         .join(models.Service, models.Booking.service_id == models.Service.id)
         .join(models.User, models.Booking.customer_id == models.User.id)
-        .filter(
-            models.Service.provider_id == provider_id,
-            models.Booking.start_time >= start_of_day,
-            models.Booking.start_time < end_of_day,
-            models.Booking.end_time > now,
-            models.Booking.status == "confirmed",
-        )
-        .order_by(models.Booking.start_time)
+        .filter(models.Service.provider_id == provider_id)
     )
 
+
+def _booking_details_rows(q) -> List[schemas.BookingWithDetails]:
     results = []
     for booking, service, customer in q.all():
         results.append(
@@ -1485,48 +2211,70 @@ def list_todays_bookings_for_provider(db: Session, provider_id: int):
     return results
 
 
+def list_todays_bookings_for_provider(
+    db: Session,
+    provider_id: int,
+    start_from: Optional[datetime] = None,
+    start_to: Optional[datetime] = None,
+    status: Optional[str] = "confirmed",
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+):
+    """
+    All *confirmed* bookings for this provider whose start_time is today
+    and that have not finished yet.
+
+    start_from/start_to narrow the window further; status overrides the
+    default "confirmed" filter (None for any status).
+    """
+    now = now_local_naive()   # ⬅ Guyana local date for “today”
+    start_of_day = datetime(now.year, now.month, now.day)
+    end_of_day = start_of_day + timedelta(days=1)
+
+    q = _provider_booking_details(db, provider_id).filter(
+        models.Booking.start_time >= start_of_day,
+        models.Booking.start_time < end_of_day,
+        models.Booking.end_time > now,
+    )
+    q = _filter_booking_window(q, start_from, start_to, status)
+    q = _apply_booking_keyset(q, cursor, descending=False)
+
+    if limit:
+        q = q.limit(limit)
+
+    return _booking_details_rows(q)
+
+
 def list_upcoming_bookings_for_provider(
     db: Session,
     provider_id: int,
     days_ahead: int = 7,
+    start_from: Optional[datetime] = None,
+    start_to: Optional[datetime] = None,
+    status: Optional[str] = "confirmed",
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
 ):
     """
     All confirmed bookings for this provider from *tomorrow* up to N days in the future.
+
+    Passing start_from/start_to replaces that window (e.g. a specific week);
+    status overrides the default "confirmed" filter (None for any status).
     """
-    now = now_local_naive()   # ⬅ Guyana local date for “today”
-    start = now + timedelta(days=1)
-    start_of_tomorrow = datetime(start.year, start.month, start.day)
-    end = start_of_tomorrow + timedelta(days=days_ahead)
+    if start_from is None and start_to is None:
+        now = now_local_naive()   # ⬅ Guyana local date for “today”
+        start = now + timedelta(days=1)
+        start_from = datetime(start.year, start.month, start.day)
+        start_to = start_from + timedelta(days=days_ahead)
 
-    q = (
-      db.query(models.Booking, models.Service, models.User)
-      .join(models.Service, models.Booking.service_id == models.Service.id)
-      .join(models.User, models.Booking.customer_id == models.User.id)
-      .filter(
-          models.Service.provider_id == provider_id,
-          models.Booking.start_time >= start_of_tomorrow,
-          models.Booking.start_time < end,
-          models.Booking.status == "confirmed",
-      )
-      .order_by(models.Booking.start_time)
-    )
+    q = _provider_booking_details(db, provider_id)
+    q = _filter_booking_window(q, start_from, start_to, status)
+    q = _apply_booking_keyset(q, cursor, descending=False)
 
-    results = []
-    for booking, service, customer in q.all():
-        results.append(
-            schemas.BookingWithDetails(
-                id=booking.id,
-                start_time=booking.start_time,
-                end_time=booking.end_time,
-                status=booking.status,
-                service_name=service.name,
-                service_duration_minutes=service.duration_minutes,
-                service_price_gyd=service.price_gyd or 0.0,
-                customer_name=customer.full_name or "",
-                customer_phone=customer.phone or "",
-            )
-        )
-    return results
+    if limit:
+        q = q.limit(limit)
+
+    return _booking_details_rows(q)
 
 
 def update_provider(
@@ -1558,6 +2306,7 @@ def update_provider(
 
     db.commit()
     db.refresh(provider)
+    invalidate_provider_directory(provider_id)
     return provider
 
 
@@ -0,0 +1,201 @@
+"""Async versions of the hot public read paths.
+
+These mirror the sync reads in ``crud`` (same return shapes, same directory
+cache keys) but run on ``AsyncSession`` so a slow query doesn't tie up one of
+the Starlette threadpool's worker threads. Only reads live here; every write
+still goes through ``crud`` and its cache invalidation.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import crud, models
+from .cache import directory_cache
+
+
+async def list_providers(db: AsyncSession, profession: Optional[str] = None):
+    """
+    Async crud.list_providers.
+
+    Professions and service names for all providers are loaded with one
+    query each instead of two queries per provider.
+    """
+    stmt = select(models.Provider, models.User).join(
+        models.User, models.Provider.user_id == models.User.id
+    )
+
+    if profession:
+        stmt = stmt.join(
+            models.ProviderProfession,
+            models.ProviderProfession.provider_id == models.Provider.id,
+        ).where(models.ProviderProfession.name.ilike(f"%{profession}%"))
+
+    rows = (await db.execute(stmt)).all()
+    provider_ids = {provider.id for provider, _ in rows}
+
+    professions_by_provider = defaultdict(list)
+    services_by_provider = defaultdict(list)
+    if provider_ids:
+        profession_rows = await db.execute(
+            select(models.ProviderProfession.provider_id, models.ProviderProfession.name)
+            .where(models.ProviderProfession.provider_id.in_(provider_ids))
+            .order_by(models.ProviderProfession.id.asc())
+        )
+        for provider_id, name in profession_rows:
+            professions_by_provider[provider_id].append(name)
+
+        service_rows = await db.execute(
+            select(models.Service.provider_id, models.Service.name)
+            .where(models.Service.provider_id.in_(provider_ids))
+            .order_by(models.Service.id.asc())
+        )
+        for provider_id, name in service_rows:
+            services_by_provider[provider_id].append(name)
+
+    return [
+        {
+            "provider_id": provider.id,
+            "name": user.full_name or "",
+            "location": user.location or "",
+            "lat": user.lat,
+            "long": user.long,
+            "bio": provider.bio or "",
+            "professions": professions_by_provider[provider.id],
+            "services": services_by_provider[provider.id],
+            "avatar_url": provider.avatar_url,
+            "avatar_thumb_url": provider.avatar_thumb_url,
+        }
+        for provider, user in rows
+    ]
+
+
+async def list_services_for_provider(db: AsyncSession, provider_id: int):
+    result = await db.execute(
+        select(models.Service)
+        .where(models.Service.provider_id == provider_id)
+        .order_by(models.Service.id.asc())
+    )
+    return result.scalars().all()
+
+
+async def list_catalog_images_for_provider(
+    db: AsyncSession,
+    provider_id: int,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    view: str = "full",
+):
+    """Async crud.list_catalog_images_for_provider: (items, next_cursor)."""
+    stmt = crud.catalog_page_stmt(provider_id, limit=limit, cursor=cursor, view=view)
+    result = await db.execute(stmt)
+    rows = result.scalars().all() if view == "full" else result.all()
+    return crud.catalog_page_from_rows(rows, limit, view)
+
+
+async def get_provider_availability(
+    db: AsyncSession,
+    provider_id: int,
+    service_id: int,
+    days: int = 14,
+):
+    """
+    Async crud.get_provider_availability.
+
+    The sync version creates default (all closed) working hours for a
+    provider that has none; a read path shouldn't write, and closed days have
+    no slots anyway, so here a provider without rows simply has no
+    availability.
+    """
+    service = (
+        await db.execute(
+            select(models.Service).where(
+                models.Service.id == service_id,
+                models.Service.provider_id == provider_id,
+            )
+        )
+    ).scalar_one_or_none()
+    if not service:
+        raise ValueError("Service not found for this provider")
+
+    working_hours = (
+        await db.execute(
+            select(models.ProviderWorkingHours)
+            .where(models.ProviderWorkingHours.provider_id == provider_id)
+            .order_by(models.ProviderWorkingHours.weekday.asc())
+        )
+    ).scalars().all()
+
+    now = crud.now_local_naive()
+    day_windows = crud.availability_day_windows(working_hours, days, now)
+    if not day_windows:
+        return []
+
+    window_start = min(w[1] for w in day_windows)
+    window_end = max(w[2] for w in day_windows)
+    all_bookings = (
+        await db.execute(
+            select(models.Booking.start_time, models.Booking.end_time)
+            .join(models.Service, models.Booking.service_id == models.Service.id)
+            .where(
+                models.Service.provider_id == provider_id,
+                models.Booking.start_time >= window_start,
+                models.Booking.start_time < window_end,
+                models.Booking.status == "confirmed",
+            )
+        )
+    ).all()
+
+    return crud.availability_slots(
+        day_windows,
+        all_bookings,
+        timedelta(minutes=service.duration_minutes),
+        now,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Public provider directory (cached)
+# ---------------------------------------------------------------------------
+# Same keys and value shapes as the crud *_cached helpers, so the sync and
+# async routes share entries and crud's write-path invalidation covers both.
+
+async def list_providers_cached(db: AsyncSession, profession: Optional[str] = None):
+    key = ("providers", (profession or "").strip().lower())
+    return await directory_cache.get_or_load_async(
+        key, lambda: list_providers(db, profession=profession)
+    )
+
+
+async def list_services_for_provider_cached(
+    db: AsyncSession, provider_id: int
+) -> List[dict]:
+    async def load():
+        return [
+            crud._columns_as_dict(svc)
+            for svc in await list_services_for_provider(db, provider_id)
+        ]
+
+    return await directory_cache.get_or_load_async(("services", provider_id), load)
+
+
+async def list_catalog_images_for_provider_cached(
+    db: AsyncSession,
+    provider_id: int,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    view: str = "full",
+):
+    # First page only: see crud.list_catalog_images_for_provider_cached
+    if cursor is not None:
+        return await list_catalog_images_for_provider(
+            db, provider_id, limit=limit, cursor=cursor, view=view
+        )
+
+    async def load():
+        return await list_catalog_images_for_provider(db, provider_id, limit=limit, view=view)
+
+    return await directory_cache.get_or_load_async(("catalog", provider_id, view, limit), load)
@@ -1,22 +1,218 @@
+import threading
+import time
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from app.config import get_settings
+from app.Logger import logger
 
 settings = get_settings()
+db_logger = logger.getChild("db")
 
 # Central database URL configuration
 DATABASE_URL = settings.DATABASE_URL
 
-engine_kwargs = {}
-if DATABASE_URL.startswith("sqlite"):
-    engine_kwargs["connect_args"] = {"check_same_thread": False}
 
-engine = create_engine(DATABASE_URL, **engine_kwargs)
+class PoolMetrics:
+    """Running counters for connection checkouts and how long they waited."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.slow_waits = 0
+        self.timeouts = 0
+
+    def record_wait(self, seconds: float) -> bool:
+        """Record one checkout; returns True if it waited longer than the threshold."""
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+            slow = seconds * 1000.0 > settings.DB_POOL_WAIT_WARN_MS
+            if slow:
+                self.slow_waits += 1
+        return slow
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "total_wait_seconds": self.total_wait_seconds,
+                "avg_wait_ms": (
+                    self.total_wait_seconds / self.checkouts * 1000.0
+                    if self.checkouts
+                    else 0.0
+                ),
+                "max_wait_ms": self.max_wait_seconds * 1000.0,
+                "slow_waits": self.slow_waits,
+                "slow_wait_threshold_ms": settings.DB_POOL_WAIT_WARN_MS,
+                "timeouts": self.timeouts,
+            }
+
+
+pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    metrics = pool_metrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_timeout()
+            db_logger.warning("Timed out waiting for a DB connection (pool: %s)", self.status())
+            raise
+
+        waited = time.perf_counter() - started
+        if self.metrics.record_wait(waited):
+            db_logger.warning(
+                "Waited %.1f ms for a DB connection (pool: %s)",
+                waited * 1000.0,
+                self.status(),
+            )
+        return conn
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """Same instrumentation for the async engine's pool."""
+
+    metrics = async_pool_metrics
+
+
+def engine_options(url: str, poolclass=InstrumentedQueuePool) -> dict:
+    """create_engine kwargs for url (also used for read replicas)."""
+    options = {}
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+
+    # In-memory SQLite needs its single-connection pool; everything else gets
+    # the configurable queue pool.
+    if ":memory:" not in url:
+        options.update(
+            poolclass=poolclass,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+    return options
+
+
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+# ---------------------------------------------------------------------------
+# Async engine (hot public read routes, see app/routes/provider_reads.py)
+# ---------------------------------------------------------------------------
+
+_ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """
+    Map a sync database URL onto its async driver.
+
+    asyncpg doesn't understand libpq's ``sslmode`` query parameter (used by
+    most hosted Postgres URLs), so it is passed on as ``ssl`` instead.
+    """
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.drivername)
+    if driver is None:
+        raise RuntimeError(
+            f"No async driver known for {parsed.drivername!r}; set ASYNC_DATABASE_URL"
+        )
+
+    query = dict(parsed.query)
+    if driver == "postgresql+asyncpg" and "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+
+    return parsed.set(drivername=driver, query=query).render_as_string(
+        hide_password=False
+    )
+
+
+def async_engine_options(url: str, poolclass=InstrumentedAsyncQueuePool) -> dict:
+    """create_async_engine kwargs for url (also used for read replicas)."""
+    options = {}
+    if ":memory:" not in url:
+        options.update(
+            poolclass=poolclass,
+            pool_size=settings.ASYNC_DB_POOL_SIZE,
+            max_overflow=settings.ASYNC_DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+    return options
+
+
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or async_database_url(DATABASE_URL)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, **async_engine_options(ASYNC_DATABASE_URL)
+)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+def _queue_pool_stats(pool, max_overflow: int, metrics: PoolMetrics) -> dict:
+    stats = {"pool_class": type(pool).__name__}
+
+    if isinstance(pool, QueuePool):
+        stats.update(
+            {
+                "size": pool.size(),
+                "max_overflow": max_overflow,
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                # Negative while the pool hasn't created all of its base
+                # connections yet
+                "overflow": pool.overflow(),
+            }
+        )
+
+    stats.update(metrics.snapshot())
+    return stats
+
+
+def get_pool_stats() -> dict:
+    """Live pool occupancy plus checkout wait counters."""
+    stats = _queue_pool_stats(engine.pool, settings.DB_MAX_OVERFLOW, pool_metrics)
+    stats["async"] = _queue_pool_stats(
+        async_engine.pool, settings.ASYNC_DB_MAX_OVERFLOW, async_pool_metrics
+    )
+    return stats
+
+
 def get_db():
     """Yield a database session and ensure it is closed afterwards."""
     db = SessionLocal()
@@ -25,6 +221,16 @@ def get_db():
     finally:
         db.close()
 
+
+async def get_async_db():
+    """Yield an AsyncSession and ensure it is closed afterwards."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def dispose_async_engine() -> None:
+    await async_engine.dispose()
+
 # import os
 # from sqlalchemy import create_engine
 # from sqlalchemy.orm import sessionmaker, declarative_base
@@ -36,7 +242,7 @@ def get_db():
 # if DATABASE_URL.startswith("sqlite"):
 #     engine_kwargs["connect_args"] = {"check_same_thread": False}
 
-# engine = create_engine(DATABASE_URL, **engine_kwargs)
+# engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
 # SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Base = declarative_base()
 
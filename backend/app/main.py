@@ -1,20 +1,33 @@
 import os
 
-from fastapi import FastAPI, Depends, HTTPException, Response
+from fastapi import FastAPI, Depends, Header, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from apscheduler.schedulers.background import BackgroundScheduler
 
 from app.config import get_settings
-from app.database import get_db, SessionLocal
+from app.Logger import RequestIdMiddleware, logger, stop_logging
+from app.database import get_db, SessionLocal, dispose_async_engine
 from app import crud, schemas, models
+from app.passwords import PasswordHasherBusy, shutdown_executor
+from app.services.upload_executor import UploadsBusy, shutdown_upload_executor
+from app.services.image_storage import get_image_storage
+from app.services.image_variants import shutdown_image_executor
 from app.routes import auth as auth_routes
 from app.routes import users as users_routes
 from app.routes import providers as providers_routes
+from app.routes import provider_reads as provider_reads_routes
 from app.routes import bookings as bookings_routes
 from app.routes import profile as profile_routes
 from app.routes import admin as admin_routes
 from app.security import get_current_user_from_header
+from app.cache import invalidate_provider_directory
+from app.replicas import dispose_replicas
+from app.query_stats import QueryStatsMiddleware
+from app.metrics import MetricsMiddleware, render_metrics
+from app.profiling import ProfilingMiddleware
+from app.tracing import TracingMiddleware, configure_tracing, shutdown_tracing
 from app.workers.cron import registerCronJobs
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
@@ -24,6 +37,17 @@ from app.config import get_settings
 settings = get_settings()
 
 app = FastAPI(title="BookitGY")
+# Added first so QueryStatsMiddleware wraps it and its per-request stats are
+# still available when the request metrics are recorded.
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+if settings.TRACING_ENABLED:
+    configure_tracing()
+    app.add_middleware(TracingMiddleware)
+# Outermost of these, so everything below logs with the request id
+app.add_middleware(RequestIdMiddleware)
 scheduler = BackgroundScheduler()
 
 origins = [
@@ -39,8 +63,43 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        "X-Next-Cursor",
+        "X-DB-Query-Count",
+        "X-DB-Time-Ms",
+        "X-Profile-Id",
+        "X-Request-ID",
+        "X-Trace-Id",
+    ],
 )
 
+@app.exception_handler(PasswordHasherBusy)
+def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(crud.BookingBusy)
+def booking_busy_handler(request: Request, exc: crud.BookingBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(UploadsBusy)
+def uploads_busy_handler(request: Request, exc: UploadsBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "2"},
+    )
+
+
 @app.get("/")
 def root():
     return {"ok": True, "service": "bookitgy-api"}
@@ -54,6 +113,18 @@ def healthz():
     return {"ok": True}
 
 
+if settings.METRICS_ENABLED:
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics(authorization: str = Header(None)):
+        """Prometheus scrape endpoint."""
+        if settings.METRICS_TOKEN and authorization != f"Bearer {settings.METRICS_TOKEN}":
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+
+        body, content_type = render_metrics()
+        return Response(content=body, media_type=content_type)
+
+
 
 def _seed_demo_users() -> None:
     """
@@ -71,8 +142,8 @@ def _seed_demo_users() -> None:
 
     demo_password = os.getenv("DEMO_USER_PASSWORD")
     if not demo_password:
-        print(
-            "[DEMO SEED] Skipping demo seed; DEMO_USER_PASSWORD is not set. "
+        logger.warning(
+            "Skipping demo seed; DEMO_USER_PASSWORD is not set. "
             "Set a strong password (>=12 chars) to enable seeding in dev."
         )
         return
@@ -116,9 +187,10 @@ def _seed_demo_users() -> None:
 
         crud.get_or_create_provider_for_user(db, provider_user.id)
 
-        print(
-            "[DEMO SEED] Created/verified demo users customer@guyana.com and "
-                        "provider@guyana.com using the configured DEMO_USER_PASSWORD."        )
+        logger.info(
+            "Created/verified demo users customer@guyana.com and "
+            "provider@guyana.com using the configured DEMO_USER_PASSWORD."
+        )
     finally:
         db.close()
 
@@ -139,6 +211,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        "X-Next-Cursor",
+        "X-DB-Query-Count",
+        "X-DB-Time-Ms",
+        "X-Profile-Id",
+        "X-Request-ID",
+        "X-Trace-Id",
+    ],
 )
 
 
@@ -166,10 +246,19 @@ def start_scheduler() -> None:
 app.include_router(auth_routes.router)
 app.include_router(users_routes.router)
 app.include_router(providers_routes.router)
+if settings.ASYNC_DB_READS:
+    app.include_router(provider_reads_routes.router)
+else:
+    app.include_router(providers_routes.sync_read_router)
 app.include_router(bookings_routes.router)
 app.include_router(profile_routes.router)
 app.include_router(admin_routes.router)
 
+# Uploaded images, when the storage backend is served by the API itself
+media_app = get_image_storage().asgi_app()
+if media_app is not None:
+    app.mount(settings.MEDIA_URL_PATH, media_app, name="media")
+
 
 # -------------------------------------------------------------------
 # Provider location endpoint (restricted & validated)
@@ -218,6 +307,10 @@ def update_my_location(
     db.commit()
     db.refresh(user)
 
+    provider = crud.get_provider_by_user_id(db, user.id)
+    if provider:
+        invalidate_provider_directory(provider.id)
+
     return {
         "lat": user.lat,
         "long": user.long,
@@ -233,3 +326,14 @@ def update_my_location(
 def on_startup() -> None:
     _seed_demo_users()
     start_scheduler()
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    shutdown_executor()
+    shutdown_upload_executor()
+    shutdown_image_executor()
+    await dispose_async_engine()
+    await dispose_replicas()
+    shutdown_tracing()
+    stop_logging()
@@ -0,0 +1,308 @@
+"""Prometheus metrics, scraped from /metrics.
+
+Hot-path cost is a couple of counter/histogram updates per request:
+MetricsMiddleware labels requests by route template (``/providers/{provider_id}``,
+never the raw path, so cardinality stays bounded) and records count, 5xx
+errors, latency and the request's SQL statement count/DB time from
+app.query_stats.
+
+Pool and cache state is not tracked on the hot path at all; collectors read
+the existing stats objects when Prometheus scrapes.
+
+Outbound calls (Twilio, Expo push, Cloudinary) are timed with
+``observe_outbound``, which also opens a tracing span for them (see
+app.tracing), and cron jobs with ``track_cron_job``.
+
+Metrics are per worker process. For several uvicorn/gunicorn workers set
+PROMETHEUS_MULTIPROC_DIR so prometheus_client aggregates them (the scrape-time
+pool/cache collectors then describe only the worker that answers).
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, REGISTRY
+
+from app.query_stats import current_query_stats
+from app.tracing import span
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0,
+)
+
+# ---------------------------------------------------------------------------
+# HTTP
+# ---------------------------------------------------------------------------
+
+http_requests_total = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code.",
+    ["method", "route", "status"],
+)
+http_request_errors_total = Counter(
+    "http_request_errors_total",
+    "HTTP requests that ended in a 5xx or an unhandled exception.",
+    ["method", "route"],
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds",
+    "Time to the end of the response body, by route template.",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+http_request_db_seconds = Histogram(
+    "http_request_db_seconds",
+    "Time spent executing SQL per request, by route template.",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+http_request_db_queries = Histogram(
+    "http_request_db_queries",
+    "SQL statements issued per request, by route template.",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+
+
+def _route_template(scope) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    # Unmatched paths (404s, scanners) share one label
+    return path or "unmatched"
+
+
+class MetricsMiddleware:
+    """Record per-route request metrics (pure ASGI)."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception:
+            status_code = 500
+            raise
+        finally:
+            method = scope["method"]
+            route = _route_template(scope)
+            http_requests_total.labels(method, route, str(status_code)).inc()
+            if status_code >= 500:
+                http_request_errors_total.labels(method, route).inc()
+            http_request_duration_seconds.labels(method, route).observe(
+                time.perf_counter() - started
+            )
+
+            # Set by QueryStatsMiddleware, which wraps this one
+            stats = current_query_stats()
+            if stats is not None:
+                http_request_db_seconds.labels(method, route).observe(stats.total_seconds)
+                http_request_db_queries.labels(method, route).observe(stats.count)
+
+
+# ---------------------------------------------------------------------------
+# Outbound calls
+# ---------------------------------------------------------------------------
+
+outbound_request_duration_seconds = Histogram(
+    "outbound_request_duration_seconds",
+    "Latency of calls to external services.",
+    ["service", "outcome"],
+    buckets=LATENCY_BUCKETS + (20.0, 30.0),
+)
+
+
+@contextmanager
+def observe_outbound(service: str):
+    """Time (and trace) a call to an external service ("twilio", "expo", "cloudinary")."""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        with span(f"outbound {service}", **{"peer.service": service}):
+            yield
+        outcome = "ok"
+    finally:
+        outbound_request_duration_seconds.labels(service, outcome).observe(
+            time.perf_counter() - started
+        )
+
+
+# ---------------------------------------------------------------------------
+# Cron jobs
+# ---------------------------------------------------------------------------
+
+image_uploads_total = Counter(
+    "image_uploads_total",
+    "Avatar/catalog image uploads, by content-hash dedupe result (hit or miss).",
+    ["result"],
+)
+
+
+booking_create_retries_total = Counter(
+    "booking_create_retries_total",
+    "Booking transactions retried after a lock timeout, deadlock or serialization failure.",
+    ["reason"],
+)
+
+
+cron_job_duration_seconds = Histogram(
+    "cron_job_duration_seconds",
+    "Duration of scheduled jobs.",
+    ["job"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0),
+)
+cron_job_runs_total = Counter(
+    "cron_job_runs_total",
+    "Scheduled job runs by outcome.",
+    ["job", "outcome"],
+)
+
+
+def track_cron_job(fn):
+    """Record duration and success/failure of a scheduled job."""
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = fn(*args, **kwargs)
+            outcome = "success"
+            return result
+        finally:
+            cron_job_duration_seconds.labels(fn.__name__).observe(
+                time.perf_counter() - started
+            )
+            cron_job_runs_total.labels(fn.__name__, outcome).inc()
+
+    return wrapper
+
+
+# ---------------------------------------------------------------------------
+# Scrape-time collectors (no hot-path cost)
+# ---------------------------------------------------------------------------
+
+class DatabasePoolCollector:
+    """Connection pool occupancy and checkout waits, per engine."""
+
+    def collect(self):
+        from app.database import get_pool_stats
+
+        stats = get_pool_stats()
+        engines = {"sync": stats, "async": stats.get("async", {})}
+
+        gauges = {
+            "size": GaugeMetricFamily("db_pool_size", "Configured pool size.", labels=["engine"]),
+            "checked_out": GaugeMetricFamily(
+                "db_pool_checked_out", "Connections currently in use.", labels=["engine"]
+            ),
+            "checked_in": GaugeMetricFamily(
+                "db_pool_checked_in", "Idle connections in the pool.", labels=["engine"]
+            ),
+            "overflow": GaugeMetricFamily(
+                "db_pool_overflow", "Connections beyond pool_size.", labels=["engine"]
+            ),
+        }
+        counters = {
+            "checkouts": CounterMetricFamily(
+                "db_pool_checkouts", "Connection checkouts.", labels=["engine"]
+            ),
+            "slow_waits": CounterMetricFamily(
+                "db_pool_slow_waits",
+                "Checkouts that waited longer than DB_POOL_WAIT_WARN_MS.",
+                labels=["engine"],
+            ),
+            "timeouts": CounterMetricFamily(
+                "db_pool_timeouts", "Checkouts that timed out.", labels=["engine"]
+            ),
+        }
+        wait_total = CounterMetricFamily(
+            "db_pool_wait_seconds", "Total time spent waiting for a connection.", labels=["engine"]
+        )
+
+        for name, engine_stats in engines.items():
+            for key, family in gauges.items():
+                if key in engine_stats:
+                    family.add_metric([name], engine_stats[key])
+            for key, family in counters.items():
+                if key in engine_stats:
+                    family.add_metric([name], engine_stats[key])
+            if "total_wait_seconds" in engine_stats:
+                wait_total.add_metric([name], engine_stats["total_wait_seconds"])
+
+        yield from gauges.values()
+        yield from counters.values()
+        yield wait_total
+
+
+class CacheCollector:
+    """Hits, misses and size of the in-process caches."""
+
+    def collect(self):
+        from app.cache import directory_cache, response_cache, user_cache
+
+        hits = CounterMetricFamily("cache_hits", "Cache hits.", labels=["cache"])
+        misses = CounterMetricFamily("cache_misses", "Cache misses.", labels=["cache"])
+        evictions = CounterMetricFamily("cache_evictions", "LRU evictions.", labels=["cache"])
+        entries = GaugeMetricFamily("cache_entries", "Entries currently cached.", labels=["cache"])
+        ratio = GaugeMetricFamily(
+            "cache_hit_ratio", "Hits / lookups since start.", labels=["cache"]
+        )
+
+        for cache in (directory_cache, response_cache, user_cache):
+            stats = cache.stats()
+            hits.add_metric([stats["name"]], stats["hits"])
+            misses.add_metric([stats["name"]], stats["misses"])
+            evictions.add_metric([stats["name"]], stats["evictions"])
+            entries.add_metric([stats["name"]], stats["entries"])
+            ratio.add_metric([stats["name"]], stats["hit_ratio"])
+
+        yield from (hits, misses, evictions, entries, ratio)
+
+
+REGISTRY.register(DatabasePoolCollector())
+REGISTRY.register(CacheCollector())
+
+
+def render_metrics():
+    """(body, content type) for the /metrics endpoint."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(DatabasePoolCollector())
+        registry.register(CacheCollector())
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+__all__ = [
+    "MetricsMiddleware",
+    "observe_outbound",
+    "render_metrics",
+    "track_cron_job",
+]
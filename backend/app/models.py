@@ -9,7 +9,9 @@ from sqlalchemy import (
     Float,
     Date,
     Numeric,
-    Enum,)
+    Enum,
+    Index,
+    text,)
 
 from .database import Base
 from datetime import datetime
@@ -33,15 +35,20 @@ class User(Base):
     is_admin = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     avatar_url = Column(String, nullable=True)   # 👈 NEW
+    # Resized variants of avatar_url (see app/services/image_variants.py)
+    avatar_thumb_url = Column(String, nullable=True)
+    avatar_medium_url = Column(String, nullable=True)
 
 
 class Provider(Base):
     __tablename__ = "providers"
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     bio = Column(Text)
     account_number = Column(String, unique=True, index=True)  # NEW
     avatar_url = Column(String, nullable=True)
+    avatar_thumb_url = Column(String, nullable=True)
+    avatar_medium_url = Column(String, nullable=True)
     is_locked = Column(Boolean, default=False)
 
 
@@ -55,6 +62,11 @@ class Service(Base):
     price_gyd = Column(Float)
     duration_minutes = Column(Integer)
 
+    __table_args__ = (
+        # Per-provider service lists, ordered by id
+        Index("ix_services_provider_id_id", "provider_id", "id"),
+    )
+
 
 class Booking(Base):
     __tablename__ = "bookings"
@@ -76,6 +88,26 @@ class Booking(Base):
         default="confirmed",
     )
 
+    __table_args__ = (
+        # Provider booking lists: per-service start_time ranges, paged by
+        # (start_time, id) keyset. Status filters other than 'confirmed' are
+        # applied to the rows of that range.
+        Index("ix_bookings_service_id_start_time_id", "service_id", "start_time", "id"),
+        # Customer booking lists, paged by (start_time, id) keyset.
+        Index("ix_bookings_customer_id_start_time_id", "customer_id", "start_time", "id"),
+        # Availability and overlap checks only look at confirmed bookings,
+        # which the partial index keeps small. The predicate can't say
+        # "future" (now() isn't immutable); start_time ordering covers that.
+        Index(
+            "ix_bookings_confirmed_service_id_start_time_end_time",
+            "service_id",
+            "start_time",
+            "end_time",
+            postgresql_where=text("status = 'confirmed'"),
+            sqlite_where=text("status = 'confirmed'"),
+        ),
+    )
+
 
 
 
@@ -91,12 +123,17 @@ class Bill(Base):
     is_paid = Column(Boolean, default=False)
     due_date = Column(DateTime)
 
+    __table_args__ = (
+        # Monthly bill lookup per provider
+        Index("ix_bills_provider_id_month", "provider_id", "month"),
+    )
+
 
 class BillCredit(Base):
     __tablename__ = "bill_credits"
 
     id = Column(Integer, primary_key=True, index=True)
-    provider_id = Column(Integer, ForeignKey("providers.id"), nullable=False)
+    provider_id = Column(Integer, ForeignKey("providers.id"), nullable=False, index=True)
     amount_gyd = Column(Numeric(10, 2), default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
 
@@ -116,21 +153,74 @@ class ProviderWorkingHours(Base):
     start_time = Column(String, nullable=True)  # "09:00"
     end_time = Column(String, nullable=True)    # "17:00"
 
+    __table_args__ = (
+        Index("ix_provider_working_hours_provider_id_weekday", "provider_id", "weekday"),
+    )
+
 class ProviderProfession(Base):
     __tablename__ = "provider_professions"
     id = Column(Integer, primary_key=True, index=True)
     provider_id = Column(Integer, ForeignKey("providers.id"))
     name = Column(String, index=True)
 
+    __table_args__ = (
+        Index("ix_provider_professions_provider_id_id", "provider_id", "id"),
+    )
+
 class ProviderCatalogImage(Base):
     __tablename__ = "provider_catalog_images"
 
     id = Column(Integer, primary_key=True, index=True)
     provider_id = Column(Integer, ForeignKey("providers.id"), index=True, nullable=False)
     image_url = Column(String, nullable=False)
+    thumb_url = Column(String, nullable=True)
+    medium_url = Column(String, nullable=True)
     caption = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Catalog pages: newest first by (created_at, id) per provider
+        Index(
+            "ix_provider_catalog_images_provider_id_created_at_id",
+            "provider_id",
+            "created_at",
+            "id",
+        ),
+    )
+
+
+class StoredImage(Base):
+    """
+    Content-hash index of uploaded images: one row per distinct file per
+    storage backend and folder, pointing at its stored variants. Re-uploads
+    of the same bytes reuse these URLs instead of being processed and
+    uploaded again.
+    """
+
+    __tablename__ = "stored_images"
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), nullable=False)  # sha256 hex of the upload
+    backend = Column(String, nullable=False)  # IMAGE_STORAGE_BACKEND that holds the files
+    folder = Column(String, nullable=False)
+    image_url = Column(String, nullable=False)
+    thumb_url = Column(String, nullable=True)
+    medium_url = Column(String, nullable=True)
+    size_bytes = Column(Integer, nullable=False, default=0)
+    reuse_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index(
+            "ix_stored_images_content_hash_backend_folder",
+            "content_hash",
+            "backend",
+            "folder",
+            unique=True,
+        ),
+    )
+
 
 class PlatformSetting(Base):
     __tablename__ = "platform_settings"
@@ -0,0 +1,223 @@
+"""Password hashing off the request threads.
+
+pbkdf2_sha256 is deliberately CPU-heavy. Running it directly inside sync
+route handlers lets a burst of logins/signups occupy the shared Starlette
+threadpool and every CPU core, so unrelated requests (bookings, directory
+reads) queue behind them.
+
+Instead, hashes are computed in a small dedicated worker pool (a process
+pool by default, for real parallelism outside the GIL). The auth routes are
+``async def`` and await the pool through the ``*_async`` functions, so a
+pending hash holds no request thread at all. Admission is bounded: at most
+PASSWORD_HASH_MAX_PENDING hash jobs may be queued or running, and further
+callers get PasswordHasherBusy straight away, which the API turns into a 503.
+A crashed worker process (BrokenProcessPool) replaces the pool and answers
+503 too, instead of failing every later login until a restart.
+The sync functions are for scripts and startup seeding.
+
+The cost (pbkdf2 rounds) is configurable. Hashes made with a different cost
+are transparently re-hashed on the next successful login.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Raised when the hashing pool is saturated and the caller should retry."""
+
+
+# ---------------------------------------------------------------------------
+# Worker-side functions (must stay top-level so they can be pickled)
+# ---------------------------------------------------------------------------
+
+@lru_cache(maxsize=4)
+def _context_for_rounds(rounds: int) -> CryptContext:
+    # min/max pinned to the configured cost, so needs_update() flags any hash
+    # made with a different cost (higher or lower) for re-hashing.
+    return CryptContext(
+        schemes=["pbkdf2_sha256"],
+        deprecated="auto",
+        pbkdf2_sha256__default_rounds=rounds,
+        pbkdf2_sha256__min_rounds=rounds,
+        pbkdf2_sha256__max_rounds=rounds,
+    )
+
+
+def _hash(password: str, rounds: int) -> str:
+    return _context_for_rounds(rounds).hash(password)
+
+
+def _verify_and_update(
+    password: str, hashed: str, rounds: int
+) -> Tuple[bool, Optional[str]]:
+    return _context_for_rounds(rounds).verify_and_update(password, hashed)
+
+
+# ---------------------------------------------------------------------------
+# Pool management
+# ---------------------------------------------------------------------------
+
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+_admission = threading.BoundedSemaphore(max(1, settings.PASSWORD_HASH_MAX_PENDING))
+
+
+def _get_executor() -> Optional[Executor]:
+    """Return the shared hashing pool, or None when running inline."""
+    global _executor
+
+    mode = settings.PASSWORD_HASH_EXECUTOR
+    if mode == "inline":
+        return None
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = max(1, settings.PASSWORD_HASH_WORKERS)
+                if mode == "thread":
+                    _executor = ThreadPoolExecutor(
+                        max_workers=workers,
+                        thread_name_prefix="password-hash",
+                    )
+                else:
+                    # spawn, not fork: the API process already runs threads
+                    # (uvicorn, APScheduler) and forking those is unsafe.
+                    _executor = ProcessPoolExecutor(
+                        max_workers=workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _replace_broken_executor(broken: Executor) -> None:
+    """Drop a broken pool so the next hash starts a fresh one."""
+    global _executor
+
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _restarting(broken: Executor) -> PasswordHasherBusy:
+    _replace_broken_executor(broken)
+    return PasswordHasherBusy("Password hashing is restarting, please retry shortly")
+
+
+def _admit() -> None:
+    if not _admission.acquire(blocking=False):
+        raise PasswordHasherBusy("Password hashing is busy, please retry shortly")
+
+
+def _run(fn, *args):
+    _admit()
+    try:
+        executor = _get_executor()
+        if executor is None:
+            return fn(*args)
+        try:
+            return executor.submit(fn, *args).result()
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); the pool is unusable now
+            raise _restarting(executor)
+    finally:
+        _admission.release()
+
+
+async def _run_async(fn, *args):
+    _admit()
+    executor = _get_executor()
+    if executor is None:
+        try:
+            return await run_in_threadpool(fn, *args)
+        finally:
+            _admission.release()
+
+    try:
+        future = executor.submit(fn, *args)
+    except BrokenProcessPool:
+        _admission.release()
+        raise _restarting(executor)
+    except BaseException:
+        _admission.release()
+        raise
+    # Released when the job really finishes, even if the request went away
+    future.add_done_callback(lambda _: _admission.release())
+    try:
+        return await asyncio.wrap_future(future)
+    except BrokenProcessPool:
+        raise _restarting(executor)
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+def hash_password(password: str) -> str:
+    """Return a secure hash for the given plaintext password."""
+    return _run(_hash, password, settings.PASSWORD_HASH_ROUNDS)
+
+
+def verify_password(plain: str, hashed: str) -> bool:
+    """Verify that a plaintext password matches a stored hash."""
+    ok, _ = verify_and_update_password(plain, hashed)
+    return ok
+
+
+def verify_and_update_password(plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and, if the stored hash uses an outdated cost, return a
+    replacement hash as well: (ok, new_hash_or_None).
+    """
+    if not hashed:
+        return False, None
+    return _run(_verify_and_update, plain, hashed, settings.PASSWORD_HASH_ROUNDS)
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password for async routes; awaits the pool without a thread."""
+    return await _run_async(_hash, password, settings.PASSWORD_HASH_ROUNDS)
+
+
+async def verify_and_update_password_async(
+    plain: str, hashed: str
+) -> Tuple[bool, Optional[str]]:
+    """verify_and_update_password for async routes."""
+    if not hashed:
+        return False, None
+    return await _run_async(
+        _verify_and_update, plain, hashed, settings.PASSWORD_HASH_ROUNDS
+    )
+
+
+__all__ = [
+    "PasswordHasherBusy",
+    "hash_password",
+    "hash_password_async",
+    "shutdown_executor",
+    "verify_and_update_password",
+    "verify_and_update_password_async",
+    "verify_password",
+]
@@ -0,0 +1,298 @@
+"""On-demand request profiling.
+
+With PROFILING_ENABLED=true, ProfilingMiddleware profiles a request when an
+admin sends ``X-Profile: 1`` (the response then carries ``X-Profile-Id``) or
+when it falls in the PROFILING_SAMPLE_RATE fraction of requests. With
+profiling disabled the middleware is not installed at all. ``X-Profile`` is
+only honoured for access tokens carrying the admin claim (issued at login),
+so other clients can't make it look anything up.
+
+Profiling uses a sampling thread rather than cProfile: sync routes run on
+threadpool threads and cProfile only sees the thread that enabled it. Every
+PROFILING_INTERVAL_MS the sampler records the stack of each thread that is
+executing app code, so the report covers the event loop, the route's worker
+thread and everything they call (SQLAlchemy, drivers, HTTP clients). Other
+requests running at the same moment are sampled too; trigger on a quiet
+instance when you need a clean profile.
+
+Each report is written to PROFILING_DIR as:
+- ``<id>.collapsed``: one ``frame;frame;frame count`` line per stack, the
+  input format of flamegraph.pl and speedscope
+- ``<id>.json``: request details plus the hottest functions by self and
+  total samples
+
+Only the newest PROFILING_MAX_REPORTS reports are kept. Admins list and
+download them from /admin/profiles.
+"""
+
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import HTTPException
+from jose import JWTError, jwt
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+
+from app.config import get_settings
+from app.Logger import logger
+
+settings = get_settings()
+profiling_logger = logger.getChild("profiling")
+
+_REPORT_ID = re.compile(r"^[0-9]+-[0-9a-f]{8}$")
+
+
+# ---------------------------------------------------------------------------
+# Sampler
+# ---------------------------------------------------------------------------
+
+def _frame_name(frame) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{frame.f_code.co_name}"
+
+
+def _collapse(frame) -> Optional[str]:
+    """Root-first "a;b;c" stack for frame, or None if it isn't running app code."""
+    names = []
+    in_app = False
+    while frame is not None:
+        name = _frame_name(frame)
+        if name.startswith("app."):
+            in_app = True
+        names.append(name)
+        frame = frame.f_back
+
+    if not in_app:
+        return None
+    names.reverse()
+    return ";".join(names)
+
+
+class StackSampler(threading.Thread):
+    def __init__(self, interval_seconds: float) -> None:
+        super().__init__(name="request-profiler", daemon=True)
+        self.interval_seconds = interval_seconds
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stopped.wait(self.interval_seconds):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = _collapse(frame)
+                if stack:
+                    self.stacks[stack] += 1
+            self.samples += 1
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+
+# ---------------------------------------------------------------------------
+# Reports
+# ---------------------------------------------------------------------------
+
+def _top_functions(stacks: Counter, limit: int = 25):
+    self_samples: Counter = Counter()
+    total_samples: Counter = Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(";")
+        self_samples[frames[-1]] += count
+        for name in set(frames):
+            total_samples[name] += count
+
+    return {
+        "self": self_samples.most_common(limit),
+        "total": total_samples.most_common(limit),
+    }
+
+
+def _write_report(report_id: str, summary: dict, stacks: Counter) -> None:
+    os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+    base = os.path.join(settings.PROFILING_DIR, report_id)
+
+    with open(base + ".collapsed", "w") as fh:
+        for stack, count in stacks.most_common():
+            fh.write(f"{stack} {count}\n")
+
+    summary["top_functions"] = _top_functions(stacks)
+    with open(base + ".json", "w") as fh:
+        json.dump(summary, fh, indent=2)
+
+    _prune_reports()
+
+
+def _prune_reports() -> None:
+    """Keep only the newest PROFILING_MAX_REPORTS reports."""
+    report_ids = _report_ids()
+    for report_id in report_ids[settings.PROFILING_MAX_REPORTS:]:
+        for ext in (".json", ".collapsed"):
+            try:
+                os.remove(os.path.join(settings.PROFILING_DIR, report_id + ext))
+            except FileNotFoundError:
+                pass
+
+
+def _report_ids() -> List[str]:
+    """Report ids, newest first (ids start with a millisecond timestamp)."""
+    try:
+        names = os.listdir(settings.PROFILING_DIR)
+    except FileNotFoundError:
+        return []
+
+    ids = [name[: -len(".json")] for name in names if name.endswith(".json")]
+    return sorted(
+        (i for i in ids if _REPORT_ID.match(i)),
+        key=lambda i: int(i.split("-")[0]),
+        reverse=True,
+    )
+
+
+def list_reports() -> List[dict]:
+    """Summaries (without the function tables) of the stored reports."""
+    reports = []
+    for report_id in _report_ids():
+        summary = read_report_summary(report_id)
+        summary.pop("top_functions", None)
+        reports.append(summary)
+    return reports
+
+
+def report_path(report_id: str, ext: str) -> str:
+    """Path of a stored report file; ValueError for unknown/invalid ids."""
+    if not _REPORT_ID.match(report_id):
+        raise ValueError("Invalid report id")
+    path = os.path.join(settings.PROFILING_DIR, report_id + ext)
+    if not os.path.isfile(path):
+        raise ValueError("Report not found")
+    return path
+
+
+def read_report_summary(report_id: str) -> dict:
+    with open(report_path(report_id, ".json")) as fh:
+        return json.load(fh)
+
+
+# ---------------------------------------------------------------------------
+# Middleware
+# ---------------------------------------------------------------------------
+
+def _token_claims_admin(authorization: Optional[str]) -> bool:
+    """
+    Whether the bearer token is validly signed, unexpired and carries the
+    adm claim. Cheap (no DB, no thread hop), so X-Profile from anyone else
+    costs nothing; _is_admin then confirms against the user row.
+    """
+    parts = (authorization or "").split()
+    if len(parts) != 2 or parts[0].lower() != "bearer":
+        return False
+    try:
+        payload = jwt.decode(
+            parts[1], settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
+        )
+    except JWTError:
+        return False
+    return payload.get("adm") is True
+
+
+def _is_admin(authorization: Optional[str]) -> bool:
+    # Imported here: security pulls in crud and the DB layer
+    from app.database import SessionLocal
+    from app.security import get_current_user_from_header
+
+    db = SessionLocal()
+    try:
+        user = get_current_user_from_header(authorization=authorization, db=db)
+        return bool(user.is_admin)
+    except HTTPException:
+        return False
+    finally:
+        db.close()
+
+
+class ProfilingMiddleware:
+    """Profile admin-requested or sampled requests (pure ASGI)."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trigger = None
+        headers = Headers(scope=scope)
+        if headers.get("x-profile"):
+            authorization = headers.get("authorization")
+            if _token_claims_admin(authorization) and await run_in_threadpool(
+                _is_admin, authorization
+            ):
+                trigger = "admin"
+        elif settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE:
+            trigger = "sample"
+
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        report_id = f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
+        status_code = None
+
+        async def send_with_profile_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if trigger == "admin":
+                    message = {
+                        **message,
+                        "headers": list(message.get("headers", []))
+                        + [(b"x-profile-id", report_id.encode())],
+                    }
+            await send(message)
+
+        sampler = StackSampler(settings.PROFILING_INTERVAL_MS / 1000.0)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            sampler.stop()
+            route = getattr(scope.get("route"), "path", None)
+            summary = {
+                "id": report_id,
+                "created_at": datetime.utcnow().isoformat(),
+                "trigger": trigger,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": route,
+                "status": status_code,
+                "duration_ms": (time.perf_counter() - started) * 1000.0,
+                "interval_ms": settings.PROFILING_INTERVAL_MS,
+                "samples": sampler.samples,
+            }
+            try:
+                await run_in_threadpool(_write_report, report_id, summary, sampler.stacks)
+            except OSError as exc:
+                profiling_logger.warning("Could not write profile %s: %s", report_id, exc)
+
+
+__all__ = [
+    "ProfilingMiddleware",
+    "list_reports",
+    "read_report_summary",
+    "report_path",
+]
@@ -0,0 +1,199 @@
+"""Per-request SQL statement counts, DB time and a slow-query log.
+
+Engine-level event hooks (registered on every Engine, so the primary, the
+async engine and any read replicas are all covered) add each statement's
+duration to the QueryStats of the current request, held in a context
+variable. QueryStatsMiddleware starts a fresh QueryStats per request and,
+outside prod, reports it as X-DB-Query-Count / X-DB-Time-Ms response
+headers; SQL_STATS_LOG=true also logs one line per request.
+
+Statements slower than SLOW_QUERY_MS are logged with their parameters
+redacted to type and length, so emails, tokens and hashes never reach the
+logs.
+
+For tests, ``assert_max_queries`` fails when a block issues more statements
+than expected, which is how N+1 regressions should be caught::
+
+    from app.query_stats import assert_max_queries
+
+    def test_list_providers_is_not_n_plus_one(client):
+        with assert_max_queries(3):
+            client.get("/providers")
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import get_settings
+from app.Logger import logger
+
+settings = get_settings()
+sql_logger = logger.getChild("sql")
+
+
+class QueryStats:
+    __slots__ = ("count", "total_seconds")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_seconds = 0.0
+
+    @property
+    def total_ms(self) -> float:
+        return self.total_seconds * 1000.0
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "query_stats", default=None
+)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Stats for the request being handled, if any."""
+    return _current_stats.get()
+
+
+# ---------------------------------------------------------------------------
+# Engine hooks
+# ---------------------------------------------------------------------------
+
+def _redact(parameters: Any) -> Any:
+    """Replace parameter values with their type (and length for strings)."""
+    if isinstance(parameters, dict):
+        return {key: _redact_value(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_redact_value(value) for value in parameters]
+    return _redact_value(parameters)
+
+
+def _redact_value(value: Any) -> str:
+    if value is None:
+        return "None"
+    if isinstance(value, (str, bytes)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started_at"].pop()
+    elapsed = time.perf_counter() - started
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.total_seconds += elapsed
+
+    if elapsed * 1000.0 >= settings.SLOW_QUERY_MS:
+        sql_logger.warning(
+            "Slow query (%.1f ms): %s | params=%s",
+            elapsed * 1000.0,
+            " ".join(statement.split()),
+            _redact(parameters),
+        )
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_timer(exception_context):
+    # after_cursor_execute doesn't fire for failed statements
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started_at"):
+        conn.info["query_started_at"].pop()
+
+
+# ---------------------------------------------------------------------------
+# Middleware
+# ---------------------------------------------------------------------------
+
+class QueryStatsMiddleware:
+    """Collect QueryStats for each HTTP request (pure ASGI, no body buffering)."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        status_code = None
+
+        async def send_with_stats(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.SQL_STATS_HEADERS:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-db-query-count", str(stats.count).encode()))
+                    headers.append((b"x-db-time-ms", f"{stats.total_ms:.1f}".encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current_stats.reset(token)
+            if settings.SQL_STATS_LOG:
+                sql_logger.info(
+                    "%s %s status=%s queries=%d db_ms=%.1f",
+                    scope["method"],
+                    scope["path"],
+                    status_code,
+                    stats.count,
+                    stats.total_ms,
+                )
+
+
+# ---------------------------------------------------------------------------
+# Test helpers
+# ---------------------------------------------------------------------------
+
+@contextmanager
+def count_queries():
+    """
+    Count every statement any engine in this process issues inside the block.
+
+    Uses a temporary engine listener rather than the per-request context, so
+    it also sees requests that a TestClient runs on its own event-loop thread.
+    """
+    stats = QueryStats()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        stats.count += 1
+
+    event.listen(Engine, "after_cursor_execute", record)
+    try:
+        yield stats
+    finally:
+        event.remove(Engine, "after_cursor_execute", record)
+
+
+@contextmanager
+def assert_max_queries(limit: int):
+    """Fail with AssertionError if the block issues more than limit statements."""
+    with count_queries() as stats:
+        yield stats
+    assert stats.count <= limit, (
+        f"Expected at most {limit} SQL statements, got {stats.count}"
+    )
+
+
+__all__ = [
+    "QueryStats",
+    "QueryStatsMiddleware",
+    "assert_max_queries",
+    "count_queries",
+    "current_query_stats",
+]
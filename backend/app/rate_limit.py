@@ -0,0 +1,186 @@
+"""Token-bucket rate limiting for auth and public endpoints.
+
+Each (route group, scope, key) gets its own bucket, e.g. ("auth", "ip",
+"203.0.113.7"), ("auth", "account", "someone@example.com|203.0.113.7") or
+("auth", "account_global", "someone@example.com"). A
+bucket holds up to `capacity` tokens and refills continuously at
+capacity/period. A request takes one token; when the bucket is empty the
+request is rejected with a 429 and a Retry-After header saying when the next
+token will be available.
+
+Limits per group/scope come from Settings.RATE_LIMITS as "capacity/seconds".
+
+Each account has two buckets. The tight "account" bucket is keyed by account
+*and* client address: it slows down password guessing against one account
+from one client without letting anyone lock a victim out by spraying their
+email from elsewhere. The much looser "account_global" bucket is keyed by the
+account alone and bounds guessing spread over many addresses.
+
+Buckets live in a pluggable backend. The default in-memory backend is per
+process; multi-instance deployments can point RATE_LIMIT_BACKEND at a
+"module:Class" implementing RateLimitBackend on top of shared storage.
+"""
+
+import importlib
+import math
+from abc import ABC, abstractmethod
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+class RateLimitBackend(ABC):
+    """Storage for token buckets. Implementations must be thread-safe."""
+
+    @abstractmethod
+    def take(self, key: str, capacity: int, period_seconds: float) -> float:
+        """
+        Try to take one token from the bucket at key.
+
+        Returns 0 if the request is allowed, otherwise the number of seconds
+        until a token will be available.
+        """
+
+
+class InMemoryTokenBucketBackend(RateLimitBackend):
+    """Per-process buckets, bounded to max_keys (least recently used dropped)."""
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self.max_keys = max(1, max_keys)
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, key: str, capacity: int, period_seconds: float) -> float:
+        refill_per_second = capacity / period_seconds
+        now = time.monotonic()
+
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (float(capacity), now))
+            tokens = min(float(capacity), tokens + (now - updated_at) * refill_per_second)
+
+            if tokens >= 1.0:
+                tokens -= 1.0
+                wait = 0.0
+            else:
+                wait = (1.0 - tokens) / refill_per_second
+
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+        return wait
+
+
+def _parse_limit(raw: str) -> Optional[Tuple[int, float]]:
+    """Parse "capacity/seconds"; empty or "0" disables the limit."""
+    raw = (raw or "").strip()
+    if not raw or raw == "0":
+        return None
+    capacity, _, period = raw.partition("/")
+    return int(capacity), float(period or 60)
+
+
+def _load_backend() -> RateLimitBackend:
+    name = settings.RATE_LIMIT_BACKEND
+    if name == "memory":
+        return InMemoryTokenBucketBackend(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+
+    module_name, _, class_name = name.partition(":")
+    if not class_name:
+        raise RuntimeError(
+            "RATE_LIMIT_BACKEND must be 'memory' or 'package.module:ClassName'"
+        )
+    backend_cls = getattr(importlib.import_module(module_name), class_name)
+    return backend_cls()
+
+
+class RateLimiter:
+    def __init__(self, backend: RateLimitBackend, limits: Dict[str, str]) -> None:
+        self.backend = backend
+        self.limits = {rule: _parse_limit(raw) for rule, raw in limits.items()}
+
+    def check(self, group: str, scope: str, key: Optional[str]) -> None:
+        """Take a token for (group, scope, key) or raise a 429."""
+        if not settings.RATE_LIMIT_ENABLED or not key:
+            return
+
+        limit = self.limits.get(f"{group}:{scope}")
+        if limit is None:
+            return
+
+        capacity, period_seconds = limit
+        wait = self.backend.take(f"{group}:{scope}:{key}", capacity, period_seconds)
+        if wait > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, please slow down.",
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+
+
+limiter = RateLimiter(_load_backend(), settings.RATE_LIMITS)
+
+
+def client_ip(request: Request) -> str:
+    """
+    Client address, honouring X-Forwarded-For only behind a trusted proxy.
+
+    Proxies append the address they saw, so the leftmost entries are
+    whatever the client sent. The client's real address is the one
+    RATE_LIMIT_TRUSTED_PROXY_HOPS entries from the right.
+    """
+    if settings.RATE_LIMIT_TRUST_PROXY:
+        hops = max(1, settings.RATE_LIMIT_TRUSTED_PROXY_HOPS)
+        forwarded = [
+            entry.strip()
+            for entry in request.headers.get("x-forwarded-for", "").split(",")
+            if entry.strip()
+        ]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.client.host if request.client else ""
+
+
+def limit_by_ip(group: str):
+    """Route dependency applying the group's per-IP limit."""
+
+    # async so it runs on the event loop instead of taking a threadpool slot;
+    # custom backends must therefore answer take() without blocking for long
+    async def dependency(request: Request) -> None:
+        limiter.check(group, "ip", client_ip(request))
+
+    return dependency
+
+
+def limit_by_account(group: str, request: Request, email: Optional[str]) -> None:
+    """
+    Apply the group's per-account limits (call before verifying a password).
+
+    The "account" bucket is per (account, client address), so one client
+    hammering an account is throttled but the account stays usable from
+    everywhere else. The looser "account_global" bucket is per account and
+    caps attempts across all addresses.
+    """
+    email = (email or "").strip().lower()
+    if email:
+        limiter.check(group, "account", f"{email}|{client_ip(request)}")
+        limiter.check(group, "account_global", email)
+
+
+__all__ = [
+    "InMemoryTokenBucketBackend",
+    "RateLimitBackend",
+    "RateLimiter",
+    "client_ip",
+    "limit_by_account",
+    "limit_by_ip",
+    "limiter",
+]
@@ -0,0 +1,274 @@
+"""Read-replica routing for read-only endpoints.
+
+When DATABASE_READ_URLS is set, routes that only read (the public provider
+directory, availability and booking lists) take their session from
+``get_read_db`` / ``get_async_read_db`` instead of ``get_db`` /
+``get_async_db``. Each request goes to the next healthy replica in
+round-robin order; everything else keeps using the primary.
+
+Health is checked passively: the session connects before it is handed to
+the route, and a replica that fails to connect is skipped for
+DB_REPLICA_RETRY_SECONDS before being tried again. With no healthy replica
+the request falls back to the primary.
+
+Read your writes: a user who just created a booking would otherwise not see
+it until the replicas catch up, so ``mark_recent_write`` pins that user's
+reads to the primary for READ_YOUR_WRITES_SECONDS. Like the caches, this is
+tracked per worker process.
+
+For local testing, point DATABASE_READ_URLS at the same database as
+DATABASE_URL, or at a second SQLite/Postgres database.
+"""
+
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+from fastapi import Request
+from jose import JWTError, jwt
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.config import get_settings
+from app.database import (
+    AsyncSessionLocal,
+    SessionLocal,
+    async_database_url,
+    async_engine_options,
+    db_logger,
+    engine_options,
+)
+
+settings = get_settings()
+
+
+class Replica:
+    """Sync and async engines for one replica URL, plus its health state."""
+
+    def __init__(self, url: str) -> None:
+        parsed = make_url(url)
+        self.name = f"{parsed.host or parsed.database}"
+        self.engine = create_engine(url, **engine_options(url, poolclass=QueuePool))
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        async_url = async_database_url(url)
+        self.async_engine = create_async_engine(
+            async_url, **async_engine_options(async_url, poolclass=AsyncAdaptedQueuePool)
+        )
+        self.AsyncSessionLocal = async_sessionmaker(
+            self.async_engine,
+            class_=AsyncSession,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+
+        self.down_until = 0.0
+        self.failures = 0
+        self.sessions = 0
+
+
+class ReplicaRouter:
+    def __init__(self, urls: List[str]) -> None:
+        self.replicas = [Replica(url) for url in urls]
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self.primary_fallbacks = 0
+
+    def candidates(self) -> List[Replica]:
+        """Healthy replicas, starting from the next one in round-robin order."""
+        if not self.replicas:
+            return []
+
+        start = next(self._counter) % len(self.replicas)
+        ordered = self.replicas[start:] + self.replicas[:start]
+        now = time.monotonic()
+        return [replica for replica in ordered if replica.down_until <= now]
+
+    def mark_up(self, replica: Replica) -> None:
+        with self._lock:
+            replica.sessions += 1
+            recovered = replica.down_until > 0
+            replica.down_until = 0.0
+        if recovered:
+            db_logger.info("Read replica %s is reachable again", replica.name)
+
+    def mark_down(self, replica: Replica, exc: Exception) -> None:
+        with self._lock:
+            replica.failures += 1
+            replica.down_until = time.monotonic() + settings.DB_REPLICA_RETRY_SECONDS
+        db_logger.warning(
+            "Read replica %s unavailable, skipping it for %.0fs: %s",
+            replica.name,
+            settings.DB_REPLICA_RETRY_SECONDS,
+            exc,
+        )
+
+    def fell_back_to_primary(self) -> None:
+        with self._lock:
+            self.primary_fallbacks += 1
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        return {
+            "replicas": [
+                {
+                    "name": replica.name,
+                    "healthy": replica.down_until <= now,
+                    "sessions": replica.sessions,
+                    "failures": replica.failures,
+                    "checked_out": replica.engine.pool.checkedout()
+                    if isinstance(replica.engine.pool, QueuePool)
+                    else None,
+                }
+                for replica in self.replicas
+            ],
+            "primary_fallbacks": self.primary_fallbacks,
+        }
+
+
+replica_router = ReplicaRouter(settings.DATABASE_READ_URLS)
+
+
+# ---------------------------------------------------------------------------
+# Read your writes
+# ---------------------------------------------------------------------------
+
+class RecentWriters:
+    """User ids that wrote recently, each expiring after window_seconds."""
+
+    def __init__(self, window_seconds: float, max_entries: int = 10_000) -> None:
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._until: "OrderedDict[int, float]" = OrderedDict()
+
+    def mark(self, user_id: int) -> None:
+        with self._lock:
+            self._until[user_id] = time.monotonic() + self.window_seconds
+            self._until.move_to_end(user_id)
+            while len(self._until) > self.max_entries:
+                self._until.popitem(last=False)
+
+    def is_recent(self, user_id: int) -> bool:
+        with self._lock:
+            until = self._until.get(user_id)
+            if until is None:
+                return False
+            if until <= time.monotonic():
+                del self._until[user_id]
+                return False
+            return True
+
+    def __len__(self) -> int:
+        return len(self._until)
+
+
+recent_writers = RecentWriters(settings.READ_YOUR_WRITES_SECONDS)
+
+
+def mark_recent_write(user_id: int) -> None:
+    """Send user_id's reads to the primary for the read-your-writes window."""
+    if replica_router.replicas:
+        recent_writers.mark(user_id)
+
+
+def _token_user_id(request: Request) -> Optional[int]:
+    """
+    The uid claim of the request's bearer token, if any.
+
+    The signature isn't checked here: the worst a forged token can do is send
+    its own reads to the primary. Authentication still happens in the route.
+    """
+    parts = request.headers.get("authorization", "").split()
+    if len(parts) != 2 or parts[0].lower() != "bearer":
+        return None
+    try:
+        user_id = jwt.get_unverified_claims(parts[1]).get("uid")
+    except JWTError:
+        return None
+    return user_id if isinstance(user_id, int) else None
+
+
+def _pinned_to_primary(request: Request) -> bool:
+    if not len(recent_writers):
+        return False
+    user_id = _token_user_id(request)
+    return user_id is not None and recent_writers.is_recent(user_id)
+
+
+# ---------------------------------------------------------------------------
+# Session dependencies
+# ---------------------------------------------------------------------------
+
+def _open_read_session(request: Request) -> Session:
+    if replica_router.replicas and not _pinned_to_primary(request):
+        for replica in replica_router.candidates():
+            db = replica.SessionLocal()
+            try:
+                db.connection()
+            except DBAPIError as exc:
+                db.close()
+                replica_router.mark_down(replica, exc)
+                continue
+            replica_router.mark_up(replica)
+            return db
+        replica_router.fell_back_to_primary()
+
+    return SessionLocal()
+
+
+def get_read_db(request: Request):
+    """get_db for read-only endpoints: a healthy replica, else the primary."""
+    db = _open_read_session(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def _open_async_read_session(request: Request) -> AsyncSession:
+    if replica_router.replicas and not _pinned_to_primary(request):
+        for replica in replica_router.candidates():
+            db = replica.AsyncSessionLocal()
+            try:
+                await db.connection()
+            except DBAPIError as exc:
+                await db.close()
+                replica_router.mark_down(replica, exc)
+                continue
+            replica_router.mark_up(replica)
+            return db
+        replica_router.fell_back_to_primary()
+
+    return AsyncSessionLocal()
+
+
+async def get_async_read_db(request: Request):
+    """get_async_db for read-only endpoints: a healthy replica, else the primary."""
+    db = await _open_async_read_session(request)
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+async def dispose_replicas() -> None:
+    for replica in replica_router.replicas:
+        replica.engine.dispose()
+        await replica.async_engine.dispose()
+
+
+__all__ = [
+    "ReplicaRouter",
+    "dispose_replicas",
+    "get_async_read_db",
+    "get_read_db",
+    "mark_recent_write",
+    "replica_router",
+]
@@ -1,10 +1,14 @@
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 
 from app import crud, schemas, models
-from app.database import get_db
+from app.cache import directory_cache, response_cache, user_cache
+from app.database import get_db, get_pool_stats
+from app import profiling
+from app.replicas import replica_router
 from app.security import get_current_user_from_header
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -127,3 +131,60 @@ def update_provider_lock_state(
         raise HTTPException(status_code=404, detail="Provider not found")
 
     return summary
+
+
+@router.get("/cache/stats")
+def get_cache_stats(_: models.User = Depends(_require_admin)):
+    """Hit/miss/eviction counters for the in-process caches."""
+    return {
+        "directory": directory_cache.stats(),
+        "responses": response_cache.stats(),
+        "users": user_cache.stats(),
+    }
+
+
+@router.get("/uploads/dedupe")
+def get_upload_dedupe_stats(
+    db: Session = Depends(get_db),
+    _: models.User = Depends(_require_admin),
+):
+    """How many image uploads were served from the content-hash index."""
+    return crud.get_image_dedupe_stats(db)
+
+
+@router.get("/db/pool")
+def get_db_pool_stats(_: models.User = Depends(_require_admin)):
+    """Connection pool occupancy and checkout wait times for this worker."""
+    stats = get_pool_stats()
+    stats["read_replicas"] = replica_router.status()
+    return stats
+
+
+@router.get("/profiles")
+def list_profiles(_: models.User = Depends(_require_admin)):
+    """Stored request profiles on this worker, newest first."""
+    return profiling.list_reports()
+
+
+@router.get("/profiles/{report_id}")
+def get_profile_summary(report_id: str, _: models.User = Depends(_require_admin)):
+    """Request details and the hottest functions of one profile."""
+    try:
+        return profiling.read_report_summary(report_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/profiles/{report_id}/collapsed")
+def download_profile(report_id: str, _: models.User = Depends(_require_admin)):
+    """Collapsed stacks for flamegraph.pl / speedscope."""
+    try:
+        path = profiling.report_path(report_id, ".collapsed")
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    return FileResponse(
+        path,
+        media_type="text/plain",
+        filename=f"profile-{report_id}.collapsed",
+    )
@@ -1,31 +1,45 @@
 from datetime import datetime, timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from jose import jwt
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.config import get_settings
 from app.database import get_db
-from app import crud, schemas
+from app.Logger import logger
+from app.rate_limit import limit_by_account, limit_by_ip
+from app import crud, models, passwords, schemas
 
 router = APIRouter(tags=["auth"])
 settings = get_settings()
+auth_logger = logger.getChild("auth")
 
 
-@router.post("/auth/signup")
-def signup(user: schemas.UserCreate, db: Session = Depends(get_db)):
+# The handlers that hash passwords are async: the hash is awaited on the
+# hashing pool (app/passwords.py) and only the DB work goes through the
+# threadpool, so a login storm can't hold Starlette's request threads.
+
+@router.post("/auth/signup", dependencies=[Depends(limit_by_ip("auth"))])
+async def signup(user: schemas.UserCreate, db: Session = Depends(get_db)):
     # Check if email already exists
-    existing = crud.get_user_by_email(db, user.email)
+    existing = await run_in_threadpool(crud.get_user_by_email, db, user.email)
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
 
-    # Create user
-    created = crud.create_user(db, user)
-      # If the user chose to register as a provider, ensure the flag is stored
+    hashed = await passwords.hash_password_async(user.password)
+    return await run_in_threadpool(_create_signed_up_user, db, user, hashed)
+
+
+def _create_signed_up_user(
+    db: Session, user: schemas.UserCreate, hashed: str
+) -> models.User:
+    created = crud.create_user(db, user, hashed_password=hashed)
+    # If the user chose to register as a provider, ensure the flag is stored
     # and create their provider row too.
     if user.is_provider:
         if not getattr(created, "is_provider", False):
@@ -37,11 +51,14 @@ def signup(user: schemas.UserCreate, db: Session = Depends(get_db)):
     return created
 
 
-def _create_access_token(subject: str) -> str:
+def _create_access_token(subject: str, user_id: int, is_admin: bool = False) -> str:
     """
     Create a signed JWT access token for a given subject (user email).
 
     Adds:
+    - uid: the user's id, so requests can load the user by primary key
+    - adm: present for admins, so cheap checks (request profiling) can skip
+      non-admins without a DB lookup; authorization still uses the DB row
     - exp: expiration time
     - iat: issued-at timestamp (seconds since epoch)
     """
@@ -52,9 +69,12 @@ def _create_access_token(subject: str) -> str:
 
     payload = {
         "sub": subject,
+        "uid": user_id,
         "exp": expire,               # jose can handle datetime
         "iat": int(now.timestamp()), # numeric timestamp for freshness checks
     }
+    if is_admin:
+        payload["adm"] = True
 
     return jwt.encode(
         payload,
@@ -109,8 +129,9 @@ def _decode_password_reset_token(token: str) -> str:
     return email
 
 
-@router.post("/auth/login")
-def login(
+@router.post("/auth/login", dependencies=[Depends(limit_by_ip("auth"))])
+async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db),
 ):
@@ -119,7 +140,8 @@ def login(
     - username: email
     - password: password
     """
-    user = crud.authenticate_user(db, form_data.username, form_data.password)
+    limit_by_account("auth", request, form_data.username)
+    user = await crud.authenticate_user_async(db, form_data.username, form_data.password)
 
     if not user:
         raise HTTPException(
@@ -127,7 +149,9 @@ def login(
             detail="Incorrect email or password",
         )
 
-    access_token = _create_access_token(user.email)
+    access_token = _create_access_token(
+        user.email, user.id, is_admin=bool(getattr(user, "is_admin", False))
+    )
 
     return {
         "access_token": access_token,
@@ -139,8 +163,9 @@ def login(
     }
 
 
-@router.post("/auth/login_by_email")
-def login_by_email(
+@router.post("/auth/login_by_email", dependencies=[Depends(limit_by_ip("auth"))])
+async def login_by_email(
+    request: Request,
     payload: schemas.LoginByEmailPayload,
     db: Session = Depends(get_db),
 ):
@@ -151,7 +176,8 @@ def login_by_email(
       "password": "..."
     }
     """
-    user = crud.authenticate_user(db, payload.email, payload.password)
+    limit_by_account("auth", request, payload.email)
+    user = await crud.authenticate_user_async(db, payload.email, payload.password)
 
     if not user:
         raise HTTPException(
@@ -159,7 +185,9 @@ def login_by_email(
             detail="Incorrect email or password",
         )
 
-    access_token = _create_access_token(user.email)
+    access_token = _create_access_token(
+        user.email, user.id, is_admin=bool(getattr(user, "is_admin", False))
+    )
 
     return {
         "access_token": access_token,
@@ -171,18 +199,23 @@ def login_by_email(
     }
 
 
-@router.post("/auth/forgot-password")
+@router.post(
+    "/auth/forgot-password",
+    dependencies=[Depends(limit_by_ip("password_reset"))],
+)
 def forgot_password(
+    request: Request,
     payload: schemas.ForgotPasswordRequest,
     db: Session = Depends(get_db),
 ):
+    limit_by_account("password_reset", request, payload.email)
     user = crud.get_user_by_email(db, payload.email)
     reset_link = None
 
     if user:
         token = _create_password_reset_token(user.email)
         reset_link = f"{settings.PASSWORD_RESET_URL}?token={token}"
-        print(f"[RESET PASSWORD] Send this link to {user.email}: {reset_link}")
+        auth_logger.info("Password reset link for user %s: %s", user.id, reset_link)
 
     response = {
         "message": "If an account exists for that email, a reset link has been sent.",
@@ -194,10 +227,15 @@ def forgot_password(
     return response
 
 
-@router.post("/auth/reset-password")
-def reset_password(payload: schemas.ResetPasswordPayload, db: Session = Depends(get_db)):
+@router.post(
+    "/auth/reset-password",
+    dependencies=[Depends(limit_by_ip("password_reset"))],
+)
+async def reset_password(
+    payload: schemas.ResetPasswordPayload, db: Session = Depends(get_db)
+):
     email = _decode_password_reset_token(payload.token)
-    user = crud.get_user_by_email(db, email)
+    user = await run_in_threadpool(crud.get_user_by_email, db, email)
 
     if not user:
         raise HTTPException(
@@ -205,6 +243,7 @@ def reset_password(payload: schemas.ResetPasswordPayload, db: Session = Depends(
             detail="User not found",
         )
 
-    crud.set_user_password(db, user, payload.new_password)
+    hashed = await passwords.hash_password_async(payload.new_password)
+    await run_in_threadpool(crud.set_user_password_hash, db, user, hashed)
 
     return {"message": "Password updated successfully"}
\ No newline at end of file
@@ -1,9 +1,11 @@
+from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Response
 from sqlalchemy.orm import Session
 
 from app.database import get_db
+from app.replicas import get_read_db, mark_recent_write
 from app import crud, schemas, models
 from app.security import get_current_user_from_header
 
@@ -51,23 +53,93 @@ def create_booking_for_me(
         # bad time, slot already taken, etc.
         raise HTTPException(status_code=400, detail=str(e))
 
+    # Let this customer's next reads (e.g. /bookings/me) see the new booking
+    # even if the read replicas lag behind
+    mark_recent_write(current_user.id)
     return booking
 
 
+def _set_next_cursor(response: Response, rows, limit: Optional[int]) -> None:
+    """Expose the cursor for the next page when this page came back full."""
+    if limit and len(rows) == limit:
+        last = rows[-1]
+        if isinstance(last, dict):
+            start_time, booking_id = last["start_time"], last["id"]
+        else:
+            start_time, booking_id = last.start_time, last.id
+        response.headers["X-Next-Cursor"] = crud.encode_booking_cursor(
+            start_time, booking_id
+        )
+
+
 @router.get("/bookings/me")
 def list_my_bookings(
-    db: Session = Depends(get_db),
+    response: Response,
+    when: Optional[str] = Query(None, description="'upcoming' or 'past'"),
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user_from_header),
 ):
-    return crud.list_bookings_for_customer(db, current_user.id)
+    """
+    Bookings for the current customer.
+
+    Pass limit to page the results; when a page is full the X-Next-Cursor
+    response header holds the cursor for the next one.
+    """
+    try:
+        rows = crud.list_bookings_for_customer(
+            db, current_user.id, when=when, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    _set_next_cursor(response, rows, limit)
+    return rows
+
+
+class ProviderBookingListParams:
+    """Range, status and paging query params shared by the provider lists."""
+
+    def __init__(
+        self,
+        start_from: Optional[datetime] = Query(None, alias="from"),
+        start_to: Optional[datetime] = Query(None, alias="to"),
+        status: Optional[str] = None,
+        limit: Optional[int] = Query(None, ge=1, le=200),
+        cursor: Optional[str] = None,
+    ):
+        # Aware bounds (e.g. "...Z") are compared against naive local columns
+        self.start_from = crud.to_local_naive(start_from)
+        self.start_to = crud.to_local_naive(start_to)
+        self.status = status
+        self.limit = limit
+        self.cursor = cursor
+
+    def as_kwargs(self, default_status: Optional[str] = None) -> dict:
+        return {
+            "start_from": self.start_from,
+            "start_to": self.start_to,
+            "status": self.status or default_status,
+            "limit": self.limit,
+            "cursor": self.cursor,
+        }
 
 
 @router.get("/providers/me/bookings")
 def list_provider_bookings(
-    db: Session = Depends(get_db),
+    response: Response,
+    params: ProviderBookingListParams = Depends(),
+    db: Session = Depends(get_read_db),
      provider: models.Provider = Depends(_require_current_provider),
 ):
-    return crud.list_bookings_for_provider(db, provider.id)
+    try:
+        rows = crud.list_bookings_for_provider(db, provider.id, **params.as_kwargs())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    _set_next_cursor(response, rows, params.limit)
+    return rows
 
 
 @router.post("/providers/me/bookings/{booking_id}/confirm")
@@ -81,6 +153,9 @@ def confirm_booking_as_provider(
     )
     if not ok:
         raise HTTPException(status_code=404, detail="Booking not found")
+
+    # The provider's booking lists are read from the replicas
+    mark_recent_write(provider.user_id)
     return {"status": "confirmed"}
 
 
@@ -95,6 +170,9 @@ def cancel_booking_as_provider(
     )
     if not ok:
         raise HTTPException(status_code=404, detail="Booking not found")
+
+    # The provider's booking lists are read from the replicas
+    mark_recent_write(provider.user_id)
     return {"status": "cancelled"}
 
 
@@ -130,21 +208,42 @@ def cancel_my_booking(
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
 
+    mark_recent_write(current_user.id)
     return booking
 
 
 @router.get("/providers/me/bookings/today")
 def list_my_todays_bookings(
-    db: Session = Depends(get_db),
+    response: Response,
+    params: ProviderBookingListParams = Depends(),
+    db: Session = Depends(get_read_db),
     provider: models.Provider = Depends(_require_current_provider),
 ):
-    return crud.list_todays_bookings_for_provider(db, provider.id)
+    try:
+        rows = crud.list_todays_bookings_for_provider(
+            db, provider.id, **params.as_kwargs(default_status="confirmed")
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    _set_next_cursor(response, rows, params.limit)
+    return rows
 
 
 @router.get("/providers/me/bookings/upcoming")
 def list_my_upcoming_bookings(
-    db: Session = Depends(get_db),
+    response: Response,
+    params: ProviderBookingListParams = Depends(),
+    db: Session = Depends(get_read_db),
     provider: models.Provider = Depends(_require_current_provider),
 ):
-    return crud.list_upcoming_bookings_for_provider(db, provider.id)
+    try:
+        rows = crud.list_upcoming_bookings_for_provider(
+            db, provider.id, **params.as_kwargs(default_status="confirmed")
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    _set_next_cursor(response, rows, params.limit)
+    return rows
 
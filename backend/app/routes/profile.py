@@ -5,6 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.database import get_db
+from app.cache import invalidate_provider_directory
 from app import models, schemas, crud
 from app.config import get_settings
 from app.security import get_current_user_from_header
@@ -139,6 +140,9 @@ def update_my_provider_profile(
     # Update avatar URL (sanitized)
     if payload.avatar_url is not None:
         provider.avatar_url = _sanitize_avatar_url(payload.avatar_url)
+        # A client-supplied URL has no resized variants
+        provider.avatar_thumb_url = None
+        provider.avatar_medium_url = None
 
     # Update professions if provided
     if payload.professions is not None:
@@ -151,6 +155,7 @@ def update_my_provider_profile(
     db.commit()
     db.refresh(user)
     db.refresh(provider)
+    invalidate_provider_directory(provider.id)
 
     return schemas.ProviderProfileOut(
         full_name=user.full_name or "",
@@ -265,10 +270,18 @@ def update_my_profile(
 
     if payload.avatar_url is not None:      # 👈 NEW
         user.avatar_url = payload.avatar_url
+        user.avatar_thumb_url = None
+        user.avatar_medium_url = None
 
     db.commit()
     db.refresh(user)
 
+    # Provider names/locations are shown in the public directory
+    if user.is_provider:
+        provider = crud.get_provider_by_user_id(db, user.id)
+        if provider:
+            invalidate_provider_directory(provider.id)
+
     return schemas.UserProfileOut(
         full_name=user.full_name or "",
         phone=user.phone or "",
@@ -0,0 +1,93 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud_async, schemas
+from app.cache import cached_json_response_async
+from app.rate_limit import limit_by_ip
+from app.replicas import get_async_read_db
+from app.routes.providers import CatalogPageOut, CatalogPageParams, catalog_page_response
+
+# Async versions of the hot public provider reads, served from the async
+# engine (or an async read replica, see app/replicas.py). Mounted instead of
+# providers.sync_read_router when settings.ASYNC_DB_READS is on (the default).
+router = APIRouter(tags=["providers"])
+
+
+@router.get("/providers", dependencies=[Depends(limit_by_ip("public"))])
+async def list_providers(
+    request: Request,
+    profession: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    return await cached_json_response_async(
+        request,
+        ("providers", (profession or "").strip().lower()),
+        lambda: crud_async.list_providers_cached(db, profession=profession),
+    )
+
+
+@router.get(
+    "/providers/{provider_id}/services",
+    dependencies=[Depends(limit_by_ip("public"))],
+)
+async def list_provider_services(
+    provider_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    return await cached_json_response_async(
+        request,
+        ("services", provider_id),
+        lambda: crud_async.list_services_for_provider_cached(db, provider_id),
+    )
+
+
+@router.get(
+    "/providers/{provider_id}/catalog",
+    response_model=CatalogPageOut,
+    dependencies=[Depends(limit_by_ip("public"))],
+)
+async def list_provider_catalog(
+    provider_id: int,
+    response: Response,
+    params: CatalogPageParams = Depends(),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """Catalog newest first; paged and projected like /providers/me/catalog."""
+    try:
+        page = await crud_async.list_catalog_images_for_provider_cached(
+            db, provider_id, **params.as_kwargs()
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return catalog_page_response(response, page)
+
+
+@router.get(
+    "/providers/{provider_id}/availability",
+    response_model=List[schemas.ProviderAvailabilityDay],
+    dependencies=[Depends(limit_by_ip("public"))],
+)
+async def get_provider_availability_route(
+    provider_id: int,
+    service_id: int,
+    days: int = 14,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Availability for a specific provider + service over the next `days`.
+    Used by the client calendar/time slot picker.
+    """
+    try:
+        availability = await crud_async.get_provider_availability(
+            db,
+            provider_id=provider_id,
+            service_id=service_id,
+            days=days,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return availability
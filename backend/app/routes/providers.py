@@ -1,100 +1,39 @@
-from typing import List, Optional
-import os
-from io import BytesIO
-import cloudinary
-import cloudinary.uploader
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status, Form
+import asyncio
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Query
 from sqlalchemy.orm import Session
-from tempfile import NamedTemporaryFile
+from starlette.concurrency import run_in_threadpool
 
-from app.services.cloudinary_service import upload_avatar
+from app.services.image_uploads import (
+    ImageUpload,
+    multipart_openapi,
+    receive_image_upload,
+    receive_image_uploads,
+)
+from app.services.image_variants import store_image_variants
+from app.services.upload_executor import UploadsBusy
+from app.cache import cached_json_response, invalidate_provider_directory
 from app.database import get_db
+from app.replicas import get_read_db
 from app import crud, schemas, models
 from app.security import get_current_user_from_header
+from app.rate_limit import limit_by_ip
 from app.config import get_settings
-from PIL import Image, UnidentifiedImageError
+from app.Logger import logger
 
-Image.MAX_IMAGE_PIXELS = 10_000_000 
 settings = get_settings()
 
-cloudinary.config(
-    cloud_name=settings.CLOUDINARY_CLOUD_NAME,
-    api_key=settings.CLOUDINARY_API_KEY,
-    api_secret=settings.CLOUDINARY_API_SECRET,
-    secure=True,
-)
-
 router = APIRouter(tags=["providers"])
 
+# Hot public reads (directory, services, catalog, availability). main.py mounts
+# either this sync version or the async one in provider_reads.py, depending on
+# settings.ASYNC_DB_READS.
+sync_read_router = APIRouter(tags=["providers"])
+
 # -------------------------------------------------------------------
-# Avatar upload validation
+# Upload scanning
 # -------------------------------------------------------------------
 
-ALLOWED_AVATAR_CONTENT_TYPES = {
-    "image/jpeg",
-    "image/png",
-    "image/webp",
-}
-
-ALLOWED_AVATAR_FORMATS = {"JPEG", "PNG", "WEBP"}
-
-MAX_AVATAR_FILE_SIZE = 5 * 1024 * 1024  # 5 MB
-MAX_AVATAR_DIMENSION = 4096  # cap width/height to avoid extremely large images
-
-def _validate_image_contents(contents: bytes) -> None:
-    """Ensure the uploaded bytes are a real, reasonably sized image."""
-    try:
-        with Image.open(BytesIO(contents)) as img:
-            img_format = (img.format or "").upper()
-            img.verify()
-    except UnidentifiedImageError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Uploaded file is not a valid image.",
-        )
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Could not read uploaded image.",
-        )
-
-    if img_format not in ALLOWED_AVATAR_FORMATS:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid image format. Allowed: JPEG, PNG, WEBP.",
-        )
-
-    try:
-        with Image.open(BytesIO(contents)) as img_dim:
-            width, height = img_dim.size
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Could not inspect image dimensions.",
-        )
-
-    if width > MAX_AVATAR_DIMENSION or height > MAX_AVATAR_DIMENSION:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Avatar image dimensions are too large.",
-        )
-
-
-
-def _ensure_pillow():
-    """Import Pillow lazily so missing deps don’t break app startup."""
-    try:
-        from PIL import Image, UnidentifiedImageError
-    except ImportError as exc:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Image validation dependency missing (Pillow). Install backend requirements.",
-        ) from exc
-
-    # Guard against decompression bombs
-    Image.MAX_IMAGE_PIXELS = 10_000_000
-    return Image, UnidentifiedImageError
-
 def _scan_bytes_for_viruses(data: bytes) -> None:
     """
     Hook for virus scanning.
@@ -150,75 +89,39 @@ def _require_current_provider(
 # Provider "me" avatar
 # -------------------------------------------------------------------
 
-@router.post("/providers/me/avatar")
+@router.post("/providers/me/avatar", openapi_extra=multipart_openapi())
 async def upload_my_avatar(
-    file: UploadFile = File(...),
+    request: Request,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user_from_header),
+    provider: models.Provider = Depends(_require_current_provider),
 ):
-    provider = _get_provider_for_user(db, current_user)
-
-    # Validate MIME type
-    if file.content_type not in ALLOWED_AVATAR_CONTENT_TYPES:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid avatar file type. Allowed: JPEG, PNG, WEBP.",
-        )
+    # Streams the body with the size limit enforced and validates the image
+    upload = await receive_image_upload(request, label="Avatar")
 
-    # Read and enforce size
-    contents = await file.read()
-    if len(contents) > MAX_AVATAR_FILE_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Avatar file is too large. Maximum size is 5 MB.",
-        )
-    
-    _validate_image_contents(contents)
+    # Optional malware scan (blocking, like any real scanner client)
+    await run_in_threadpool(_scan_bytes_for_viruses, upload.contents)
 
-    # Optional malware scan
-    _scan_bytes_for_viruses(contents)
+    # Resized in the image worker pool, uploaded through the upload pool
+    urls = await store_image_variants(
+        upload, settings.CLOUDINARY_UPLOAD_FOLDER, label="Avatar"
+    )
 
-    # Write to a temporary file for Cloudinary
-    try:
-        with NamedTemporaryFile(delete=False) as tmp:
-            tmp.write(contents)
-            tmp_path = tmp.name
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to buffer uploaded file",
-        )
+    return await run_in_threadpool(_save_provider_avatar, db, provider, urls)
 
-    # Upload using your Cloudinary helper
-    try:
-        upload_result = upload_avatar(tmp_path)
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to upload avatar",
-        )
-    finally:
-        try:
-            os.remove(tmp_path)
-        except Exception:
-            pass
-
-    if isinstance(upload_result, dict):
-        secure_url = upload_result.get("secure_url")
-    else:
-        secure_url = str(upload_result)
-
-    if not secure_url:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Avatar upload did not return a valid URL",
-)
 
-    provider.avatar_url = secure_url
+def _save_provider_avatar(db: Session, provider: models.Provider, urls: dict) -> dict:
+    provider.avatar_url = urls["full"]
+    provider.avatar_thumb_url = urls["thumb"]
+    provider.avatar_medium_url = urls["medium"]
     db.commit()
     db.refresh(provider)
+    invalidate_provider_directory(provider.id)
 
-    return {"avatar_url": secure_url}
+    return {
+        "avatar_url": provider.avatar_url,
+        "avatar_thumb_url": provider.avatar_thumb_url,
+        "avatar_medium_url": provider.avatar_medium_url,
+    }
 
 
 # -------------------------------------------------------------------
@@ -279,6 +182,7 @@ def delete_my_service(
 
 @router.get("/providers/me/working-hours", response_model=List[schemas.WorkingHoursOut])
 def get_my_working_hours(
+    request: Request,
     db: Session = Depends(get_db),
     provider: models.Provider = Depends(_require_current_provider),
 ):
@@ -286,7 +190,14 @@ def get_my_working_hours(
     Return 7 rows (Mon–Sun). If none exist, create defaults (all closed)
     so the frontend always has something to render.
     """
-    return crud.get_or_create_working_hours_for_provider(db, provider.id)
+    return cached_json_response(
+        request,
+        ("working_hours", provider.id),
+        lambda: [
+            schemas.WorkingHoursOut.model_validate(row, from_attributes=True)
+            for row in crud.get_or_create_working_hours_for_provider(db, provider.id)
+        ],
+    )
 
 
 @router.put(
@@ -367,6 +278,10 @@ def update_my_location(
     db.commit()
     db.refresh(current_user)
 
+    provider = crud.get_provider_by_user_id(db, current_user.id)
+    if provider:
+        invalidate_provider_directory(provider.id)
+
     return schemas.ProviderLocationUpdate(
         lat=current_user.lat,
         long=current_user.long,
@@ -378,83 +293,166 @@ def update_my_location(
 # Provider "me" catalog (portfolio images)
 # -------------------------------------------------------------------
 
-@router.get(
-    "/providers/me/catalog",
-    response_model=List[schemas.ProviderCatalogImageOut],
-)
+class CatalogPageParams:
+    """Paging and projection query params shared by the catalog lists."""
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=100),
+        cursor: Optional[str] = None,
+        view: str = Query("full", description="'full' or 'thumbs' (id + thumb_url only)"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.view = view
+
+    def as_kwargs(self) -> dict:
+        return {"limit": self.limit, "cursor": self.cursor, "view": self.view}
+
+
+CatalogPageOut = List[Union[schemas.ProviderCatalogImageOut, schemas.ProviderCatalogThumbOut]]
+
+
+def catalog_page_response(response: Response, page):
+    items, next_cursor = page
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
+
+
+@router.get("/providers/me/catalog", response_model=CatalogPageOut)
 def list_my_catalog_images(
+    response: Response,
+    params: CatalogPageParams = Depends(),
     db: Session = Depends(get_db),
     provider: models.Provider = Depends(_require_current_provider),
 ):
-    return crud.list_catalog_images_for_provider(db, provider.id)
+    """
+    The current provider's catalog, newest first.
+
+    Pass limit to page it; when a page is full the X-Next-Cursor response
+    header holds the cursor for the next one. view=thumbs returns only id
+    and thumb_url per image.
+    """
+    try:
+        page = crud.list_catalog_images_for_provider(db, provider.id, **params.as_kwargs())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return catalog_page_response(response, page)
 
 
 @router.post(
     "/providers/me/catalog",
     response_model=schemas.ProviderCatalogImageOut,
+    openapi_extra=multipart_openapi("file", "caption"),
 )
 async def upload_my_catalog_image(
-    file: UploadFile = File(...),
-    caption: Optional[str] = Form(None),
+    request: Request,
     db: Session = Depends(get_db),
     provider: models.Provider = Depends(_require_current_provider),
 ):
-    # Validate MIME type
-    if file.content_type not in ALLOWED_AVATAR_CONTENT_TYPES:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid image type. Allowed: JPEG, PNG, WEBP.",
-        )
-
-    contents = await file.read()
-    if len(contents) > MAX_AVATAR_FILE_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Image file is too large. Maximum size is 5 MB.",
-        )
+    upload = await receive_image_upload(request, label="Image")
+    caption = upload.fields.get("caption")
+    await run_in_threadpool(_scan_bytes_for_viruses, upload.contents)
 
-    _validate_image_contents(contents)
-    _scan_bytes_for_viruses(contents)
-
-    # Write to temp file for Cloudinary
-    try:
-        with NamedTemporaryFile(delete=False) as tmp:
-            tmp.write(contents)
-            tmp_path = tmp.name
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to buffer uploaded file",
-        )
-
-    try:
-        # You can tweak folder/name options here if you want
-        upload_result = cloudinary.uploader.upload(tmp_path, folder="bookitgy/catalog")
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to upload image",
-        )
-    finally:
-        try:
-            os.remove(tmp_path)
-        except Exception:
-            pass
-
-    image_url = upload_result.get("secure_url") if isinstance(upload_result, dict) else str(upload_result)
-    if not image_url:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Image upload did not return a valid URL",
-        )
+    urls = await store_image_variants(upload, "bookitgy/catalog", label="Image")
 
-    item = crud.add_catalog_image_for_provider(
+    return await run_in_threadpool(
+        crud.add_catalog_image_for_provider,
         db,
         provider_id=provider.id,
-        image_url=image_url,
+        image_url=urls["full"],
         caption=caption,
+        thumb_url=urls["thumb"],
+        medium_url=urls["medium"],
+    )
+
+
+@router.post(
+    "/providers/me/catalog/bulk",
+    response_model=schemas.CatalogBulkUploadOut,
+    openapi_extra=multipart_openapi("files", multiple=True),
+)
+async def bulk_upload_my_catalog_images(
+    request: Request,
+    db: Session = Depends(get_db),
+    provider: models.Provider = Depends(_require_current_provider),
+):
+    """
+    Upload several catalog images in one request (repeated "files" parts).
+
+    Files are processed CATALOG_BULK_CONCURRENCY at a time and all accepted
+    images are inserted in one transaction. Files that fail (bad type, size
+    or image, upload error) are listed in "failed" with their position in
+    the request; the others are still saved.
+    """
+    parts, _ = await receive_image_uploads(
+        request,
+        label="Image",
+        max_files=settings.CATALOG_BULK_MAX_FILES,
+        max_total_bytes=settings.CATALOG_BULK_MAX_BYTES,
+    )
+    accepted = [part for part in parts if isinstance(part, ImageUpload)]
+    failed = [
+        schemas.CatalogUploadError(index=part.index, filename=part.filename, detail=part.detail)
+        for part in parts
+        if not isinstance(part, ImageUpload)
+    ]
+
+    semaphore = asyncio.Semaphore(max(1, settings.CATALOG_BULK_CONCURRENCY))
+
+    async def process(upload: ImageUpload):
+        async with semaphore:
+            await run_in_threadpool(_scan_bytes_for_viruses, upload.contents)
+            return await store_image_variants(upload, "bookitgy/catalog", label="Image")
+
+    outcomes = await asyncio.gather(
+        *(process(upload) for upload in accepted), return_exceptions=True
+    )
+
+    images = []
+    for upload, outcome in zip(accepted, outcomes):
+        if isinstance(outcome, (HTTPException, UploadsBusy)):
+            detail = (
+                outcome.detail
+                if isinstance(outcome, HTTPException)
+                else "Server busy, please retry this image shortly."
+            )
+            failed.append(
+                schemas.CatalogUploadError(
+                    index=upload.index, filename=upload.filename, detail=detail
+                )
+            )
+        elif isinstance(outcome, Exception):
+            # Other files' variants are already stored: keep them, fail this one
+            logger.error(
+                "Bulk catalog upload of %r failed",
+                upload.filename,
+                exc_info=(type(outcome), outcome, outcome.__traceback__),
+            )
+            failed.append(
+                schemas.CatalogUploadError(
+                    index=upload.index, filename=upload.filename, detail="Failed to upload image"
+                )
+            )
+        elif isinstance(outcome, BaseException):
+            raise outcome
+        else:
+            images.append(
+                {
+                    "image_url": outcome["full"],
+                    "thumb_url": outcome["thumb"],
+                    "medium_url": outcome["medium"],
+                }
+            )
+
+    uploaded = (
+        await run_in_threadpool(crud.add_catalog_images_for_provider, db, provider.id, images)
+        if images
+        else []
     )
-    return item
+    failed.sort(key=lambda error: error.index)
+    return {"uploaded": uploaded, "failed": failed}
 
 
 @router.delete("/providers/me/catalog/{image_id}")
@@ -473,43 +471,122 @@ def delete_my_catalog_image(
 # Public provider routes
 # -------------------------------------------------------------------
 
-@router.get("/providers")
+@sync_read_router.get("/providers", dependencies=[Depends(limit_by_ip("public"))])
 def list_providers(
+    request: Request,
     profession: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    return crud.list_providers(db, profession=profession)
+    return cached_json_response(
+        request,
+        ("providers", (profession or "").strip().lower()),
+        lambda: crud.list_providers_cached(db, profession=profession),
+    )
 
 
-@router.get("/providers/{provider_id}")
-def get_provider(provider_id: int, db: Session = Depends(get_db)):
-    provider = crud.get_provider(db, provider_id)
+@router.get("/providers/{provider_id}", dependencies=[Depends(limit_by_ip("public"))])
+def get_provider(provider_id: int, db: Session = Depends(get_read_db)):
+    provider = crud.get_provider_cached(db, provider_id)
     if not provider:
         raise HTTPException(status_code=404, detail="Provider not found")
     return provider
 
 
-@router.get("/providers/{provider_id}/services")
-def list_provider_services(provider_id: int, db: Session = Depends(get_db)):
-    return crud.list_services_for_provider(db, provider_id)
+@sync_read_router.get(
+    "/providers/{provider_id}/services",
+    dependencies=[Depends(limit_by_ip("public"))],
+)
+def list_provider_services(
+    provider_id: int,
+    request: Request,
+    db: Session = Depends(get_read_db),
+):
+    return cached_json_response(
+        request,
+        ("services", provider_id),
+        lambda: crud.list_services_for_provider_cached(db, provider_id),
+    )
 
-@router.get(
+@sync_read_router.get(
     "/providers/{provider_id}/catalog",
-    response_model=List[schemas.ProviderCatalogImageOut],
+    response_model=CatalogPageOut,
+    dependencies=[Depends(limit_by_ip("public"))],
 )
-def list_provider_catalog(provider_id: int, db: Session = Depends(get_db)):
-    return crud.list_catalog_images_for_provider(db, provider_id)
+def list_provider_catalog(
+    provider_id: int,
+    response: Response,
+    params: CatalogPageParams = Depends(),
+    db: Session = Depends(get_read_db),
+):
+    """Catalog newest first; paged and projected like /providers/me/catalog."""
+    try:
+        page = crud.list_catalog_images_for_provider_cached(
+            db, provider_id, **params.as_kwargs()
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return catalog_page_response(response, page)
 
 
 @router.get(
+    "/providers/{provider_id}/page",
+    response_model=schemas.ProviderPageOut,
+    dependencies=[Depends(limit_by_ip("public"))],
+)
+def get_provider_page(
+    provider_id: int,
+    request: Request,
+    catalog_limit: int = Query(12, ge=0, le=100),
+    service_id: Optional[int] = None,
+    days: int = Query(3, ge=0, le=31),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Profile, professions, services, working hours and the first catalog page
+    for a provider in one round trip.
+
+    Pass service_id to also include availability for the next `days` days.
+    Without availability the rendered page is cached until the provider
+    edits it; availability depends on bookings and the clock, so pages
+    that include it are always built fresh.
+    """
+    if service_id is None:
+        def load():
+            page = crud.get_provider_page(db, provider_id, catalog_limit=catalog_limit)
+            if page is None:
+                raise HTTPException(status_code=404, detail="Provider not found")
+            return page
+
+        return cached_json_response(
+            request, ("page", provider_id, catalog_limit), load
+        )
+
+    try:
+        page = crud.get_provider_page(
+            db,
+            provider_id,
+            catalog_limit=catalog_limit,
+            service_id=service_id,
+            availability_days=days,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if page is None:
+        raise HTTPException(status_code=404, detail="Provider not found")
+    return page
+
+
+@sync_read_router.get(
     "/providers/{provider_id}/availability",
     response_model=List[schemas.ProviderAvailabilityDay],
+    dependencies=[Depends(limit_by_ip("public"))],
 )
 def get_provider_availability_route(
     provider_id: int,
     service_id: int,
     days: int = 14,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     Availability for a specific provider + service over the next `days`.
@@ -553,5 +630,6 @@ def update_my_provider_profile(
     db.commit()
     db.refresh(updated)
     db.refresh(current_user)
+    invalidate_provider_directory(provider.id)
 
     return updated
@@ -232,6 +232,7 @@ class ProviderListItem(BaseModel):
     professions: List[str] = []
     services: List[str] = []
     avatar_url: Optional[str] = None
+    avatar_thumb_url: Optional[str] = None
 
 
 class AvailabilitySlot(BaseModel):
@@ -280,12 +281,52 @@ class ProviderLocationUpdate(BaseModel):
 class ProviderCatalogImageOut(BaseModel):
     id: int
     image_url: str
+    thumb_url: Optional[str] = None
+    medium_url: Optional[str] = None
     caption: Optional[str] = None
 
     class Config:
         from_attributes = True
 
 
+class ProviderCatalogThumbOut(BaseModel):
+    """Catalog grid item (view=thumbs)."""
+
+    id: int
+    thumb_url: str
+
+
+class CatalogUploadError(BaseModel):
+    index: int  # position of the file in the request
+    filename: Optional[str] = None
+    detail: str
+
+
+class CatalogBulkUploadOut(BaseModel):
+    uploaded: List[ProviderCatalogImageOut]
+    failed: List[CatalogUploadError]
+
+
+class ProviderPageOut(BaseModel):
+    provider_id: int
+    name: str
+    location: str
+    lat: Optional[float] = None
+    long: Optional[float] = None
+    bio: Optional[str] = None
+    avatar_url: Optional[str] = None
+    avatar_thumb_url: Optional[str] = None
+    avatar_medium_url: Optional[str] = None
+    professions: List[str] = []
+    services: List[ServiceOut] = []
+    working_hours: List[WorkingHoursOut] = []
+    catalog: List[ProviderCatalogImageOut] = []
+    # Pass as cursor to /providers/{id}/catalog for the rest of the catalog
+    catalog_next_cursor: Optional[str] = None
+    # Only present when a service_id was requested
+    availability: Optional[List[ProviderAvailabilityDay]] = None
+
+
 class ServiceChargeUpdate(BaseModel):
     service_charge_percentage: float
 
@@ -3,8 +3,10 @@ from typing import Optional
 
 from fastapi import Depends, Header, HTTPException, status
 from jose import jwt, JWTError
-from sqlalchemy.orm import Session
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached
 
+from app.cache import invalidate_user, user_cache
 from app.config import get_settings
 from app.database import get_db
 from app import crud, models
@@ -12,6 +14,49 @@ from app import crud, models
 settings = get_settings()
 
 
+# ---------------------------------------------------------------------------
+# Authenticated-user cache
+# ---------------------------------------------------------------------------
+
+def _user_snapshot(user: models.User) -> dict:
+    return {col.name: getattr(user, col.name) for col in models.User.__table__.columns}
+
+
+def _attach_cached_user(db: Session, snapshot: dict) -> models.User:
+    """
+    Rebuild a User from a cached snapshot and attach it to this request's
+    session without emitting a SELECT.
+
+    Routes mutate current_user and commit through their own session, so the
+    instance has to be persistent in *that* session rather than a shared,
+    detached object.
+    """
+    user = models.User(**snapshot)
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context) -> None:
+    changed = session.info.setdefault("changed_user_ids", set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, models.User) and obj.id is not None:
+            changed.add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session) -> None:
+    # Invalidate only once the change is visible to other sessions, so a
+    # concurrent request can't re-cache the old row in between.
+    for user_id in session.info.pop("changed_user_ids", ()):
+        invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session) -> None:
+    session.info.pop("changed_user_ids", None)
+
+
 def get_current_user_from_header(
     authorization: str = Header(None),
     db: Session = Depends(get_db),
@@ -21,8 +66,14 @@ def get_current_user_from_header(
 
     - Validates the header format.
     - Decodes and verifies the JWT.
-    - Looks up the user by email (sub).
     - Optionally enforces token freshness using 'iat' and a max age.
+    - Looks up the user by primary key (uid claim), served from the user
+      cache when possible. Tokens issued before the uid claim existed fall
+      back to an uncached lookup by email (sub).
+
+    Any committed change to a User row drops its cache entries (see the
+    session hooks above), which covers update_user, set_user_password,
+    profile/location/avatar updates and role changes.
     """
     if not authorization:
         raise HTTPException(
@@ -58,13 +109,6 @@ def get_current_user_from_header(
             detail="Invalid token payload",
         )
 
-    user = crud.get_user_by_email(db, user_email)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
-
     # ------------------------------------------------------------------
     # Token freshness check using iat
     # ------------------------------------------------------------------
@@ -86,4 +130,26 @@ def get_current_user_from_header(
                 detail="Token is too old, please log in again",
             )
 
+    user_id = payload.get("uid")
+    if isinstance(user_id, int):
+        cache_key = ("user", user_id, issued_at_ts)
+        snapshot = user_cache.get(cache_key)
+        if snapshot is not None:
+            return _attach_cached_user(db, snapshot)
+
+        user = crud.get_user(db, user_id)
+        if user and user.email == user_email:
+            user_cache.set(cache_key, _user_snapshot(user))
+        elif user:
+            # uid and sub disagree (e.g. email changed) – don't trust the token
+            user = None
+    else:
+        user = crud.get_user_by_email(db, user_email)
+
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
+
     return user
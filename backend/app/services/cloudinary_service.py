@@ -3,6 +3,7 @@ import cloudinary.uploader
 from typing import Optional
 
 from app.config import get_settings
+from app.metrics import observe_outbound
 
 settings = get_settings()
 
@@ -21,13 +22,38 @@ def upload_avatar(file_path: str, public_id: Optional[str] = None) -> str:
     file_path: path to the local file (or tempfile) on disk.
     public_id: optional stable ID (e.g. provider_{id}_avatar).
     """
+    return _upload(file_path, settings.CLOUDINARY_UPLOAD_FOLDER, public_id)
+
+
+def upload_image_bytes(
+    contents: bytes, folder: str, public_id: Optional[str] = None
+) -> str:
+    """
+    Upload already-validated image bytes and return the secure URL.
+
+    The bytes are sent straight from memory. Blocking; the upload routes
+    call it through run_upload_job.
+    """
+    return _upload(contents, folder, public_id)
+
+
+def delete_image(public_id: str) -> None:
+    """Delete an uploaded image by its full public id (folder/name). Blocking."""
+    with observe_outbound("cloudinary"):
+        cloudinary.uploader.destroy(public_id, resource_type="image", invalidate=True)
+
+
+def _upload(file, folder: str, public_id: Optional[str]) -> str:
     upload_options = {
-        "folder": settings.CLOUDINARY_UPLOAD_FOLDER,
+        "folder": folder,
         "overwrite": True,
         "resource_type": "image",
+        # Bounds the HTTP call itself, so a stuck upload frees its worker
+        "timeout": settings.UPLOAD_TIMEOUT_SECONDS,
     }
     if public_id:
         upload_options["public_id"] = public_id
 
-    result = cloudinary.uploader.upload(file_path, **upload_options)
+    with observe_outbound("cloudinary"):
+        result = cloudinary.uploader.upload(file, **upload_options)
     return result["secure_url"]
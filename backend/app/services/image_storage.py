@@ -0,0 +1,247 @@
+"""Pluggable storage for uploaded images.
+
+The upload pipeline (app/services/image_variants.py) hands encoded image
+bytes to ``get_image_storage().save(...)`` and stores the returned URL.
+IMAGE_STORAGE_BACKEND picks the implementation:
+
+- "cloudinary": the Cloudinary upload API (production default)
+- "local": files under MEDIA_ROOT, served by the API itself at
+  MEDIA_URL_PATH with long-lived cache headers
+- "memory": a per-process dict served the same way; nothing touches disk or
+  the network, for benchmarking the upload path (single worker only)
+- "package.module:ClassName": any other ImageStorage implementation
+
+"local" and "memory" make the whole upload path, from request body to
+served file, testable offline. Stored names are unique per upload, so served
+files are marked immutable; a backend that reuses names must not be served
+through ``MediaFiles``.
+"""
+
+import importlib
+import os
+import re
+import tempfile
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+
+from starlette._utils import get_route_path
+from starlette.datastructures import Headers
+from starlette.responses import PlainTextResponse, Response
+from starlette.staticfiles import StaticFiles
+
+from app.config import get_settings
+
+settings = get_settings()
+
+# folder and public_id become path segments of the stored file
+_SAFE_KEY = re.compile(r"^[A-Za-z0-9_\-]+(?:/[A-Za-z0-9_\-]+)*$")
+
+
+def _image_type(contents: bytes) -> Tuple[str, str]:
+    """(extension, content type) from the image signature."""
+    if contents[:4] == b"RIFF" and contents[8:12] == b"WEBP":
+        return "webp", "image/webp"
+    if contents[:8] == b"\x89PNG\r\n\x1a\n":
+        return "png", "image/png"
+    if contents[:3] == b"\xff\xd8\xff":
+        return "jpg", "image/jpeg"
+    raise ValueError("Unsupported image type")
+
+
+def _storage_key(contents: bytes, folder: str, public_id: Optional[str]) -> str:
+    public_id = public_id or uuid.uuid4().hex
+    folder = folder.strip("/")
+    if not _SAFE_KEY.match(folder) or not _SAFE_KEY.match(public_id):
+        raise ValueError(f"Invalid storage path {folder!r}/{public_id!r}")
+    extension, _ = _image_type(contents)
+    return f"{folder}/{public_id}.{extension}"
+
+
+def _media_url(key: str) -> str:
+    return f"{settings.MEDIA_BASE_URL}{settings.MEDIA_URL_PATH}/{key}"
+
+
+def _cache_headers() -> Dict[str, str]:
+    return {"Cache-Control": f"public, max-age={settings.MEDIA_CACHE_MAX_AGE}, immutable"}
+
+
+class ImageStorage(ABC):
+    """Destination for uploaded images. Implementations must be thread-safe."""
+
+    # False when stored files don't outlive the process: their URLs must not
+    # be indexed for upload dedupe
+    persistent = True
+
+    @abstractmethod
+    def save(self, contents: bytes, folder: str, public_id: Optional[str] = None) -> str:
+        """
+        Store encoded image bytes and return their public URL.
+
+        Blocking; called from the upload pool (run_upload_job).
+        """
+
+    def delete(self, folder: str, public_id: str) -> None:
+        """
+        Best-effort removal of an image saved with this folder/public_id,
+        used to clean up after a failed multi-variant upload. Blocking.
+        """
+
+    def asgi_app(self):
+        """ASGI app serving the stored files, for backends the API serves itself."""
+        return None
+
+
+class CloudinaryImageStorage(ImageStorage):
+    def save(self, contents: bytes, folder: str, public_id: Optional[str] = None) -> str:
+        # Imported here so the offline backends don't need Cloudinary config
+        from app.services.cloudinary_service import upload_image_bytes
+
+        return upload_image_bytes(contents, folder, public_id)
+
+    def delete(self, folder: str, public_id: str) -> None:
+        from app.services.cloudinary_service import delete_image
+
+        delete_image(f"{folder.strip('/')}/{public_id}")
+
+
+class LocalImageStorage(ImageStorage):
+    """Files under root, written atomically (temp file + rename)."""
+
+    def __init__(self, root: str) -> None:
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+
+    def save(self, contents: bytes, folder: str, public_id: Optional[str] = None) -> str:
+        key = _storage_key(contents, folder, public_id)
+        path = os.path.join(self.root, *key.split("/"))
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(contents)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return _media_url(key)
+
+    def delete(self, folder: str, public_id: str) -> None:
+        directory = os.path.join(self.root, *folder.strip("/").split("/"))
+        for extension in ("jpg", "png", "webp"):
+            path = os.path.join(directory, f"{public_id}.{extension}")
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def asgi_app(self):
+        return MediaFiles(directory=self.root)
+
+
+class MemoryImageStorage(ImageStorage):
+    """Per-process in-memory store; contents are lost on restart."""
+
+    persistent = False
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._files: Dict[str, Tuple[bytes, str]] = {}
+
+    def save(self, contents: bytes, folder: str, public_id: Optional[str] = None) -> str:
+        key = _storage_key(contents, folder, public_id)
+        _, content_type = _image_type(contents)
+        with self._lock:
+            self._files[key] = (contents, content_type)
+        return _media_url(key)
+
+    def delete(self, folder: str, public_id: str) -> None:
+        prefix = f"{folder.strip('/')}/{public_id}."
+        with self._lock:
+            for key in [key for key in self._files if key.startswith(prefix)]:
+                del self._files[key]
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            return self._files.get(key)
+
+    def asgi_app(self):
+        return _MemoryFiles(self)
+
+
+class MediaFiles(StaticFiles):
+    """StaticFiles with long-lived, immutable cache headers."""
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        response.headers.update(_cache_headers())
+        return response
+
+
+class _MemoryFiles:
+    def __init__(self, storage: MemoryImageStorage) -> None:
+        self.storage = storage
+
+    async def __call__(self, scope, receive, send):
+        if scope["method"] not in ("GET", "HEAD"):
+            response = PlainTextResponse("Method Not Allowed", status_code=405)
+        else:
+            key = get_route_path(scope).lstrip("/")
+            stored = self.storage.get(key)
+            if stored is None:
+                response = PlainTextResponse("Not Found", status_code=404)
+            else:
+                contents, content_type = stored
+                headers = _cache_headers()
+                # Keys are unique per upload, so the key works as the ETag
+                headers["ETag"] = f'"{key}"'
+                if Headers(scope=scope).get("if-none-match") == headers["ETag"]:
+                    response = Response(status_code=304, headers=headers)
+                else:
+                    response = Response(contents, media_type=content_type, headers=headers)
+        await response(scope, receive, send)
+
+
+def _load_storage() -> ImageStorage:
+    name = settings.IMAGE_STORAGE_BACKEND
+    if name == "cloudinary":
+        return CloudinaryImageStorage()
+    if name == "local":
+        return LocalImageStorage(settings.MEDIA_ROOT)
+    if name == "memory":
+        return MemoryImageStorage()
+
+    module_name, _, class_name = name.partition(":")
+    if not class_name:
+        raise RuntimeError(
+            "IMAGE_STORAGE_BACKEND must be 'cloudinary', 'local', 'memory' "
+            "or 'package.module:ClassName'"
+        )
+    storage_cls = getattr(importlib.import_module(module_name), class_name)
+    return storage_cls()
+
+
+_storage: Optional[ImageStorage] = None
+_storage_lock = threading.Lock()
+
+
+def get_image_storage() -> ImageStorage:
+    global _storage
+
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = _load_storage()
+    return _storage
+
+
+__all__ = [
+    "CloudinaryImageStorage",
+    "ImageStorage",
+    "LocalImageStorage",
+    "MediaFiles",
+    "MemoryImageStorage",
+    "get_image_storage",
+]
@@ -0,0 +1,427 @@
+"""Upload pipeline for avatar and catalog images.
+
+``receive_image_upload`` parses the multipart request body itself instead of
+letting FastAPI spool it through ``UploadFile``:
+
+- the size limit is enforced while the body streams in (and up front from
+  Content-Length), so an oversized upload is rejected after at most
+  MAX_IMAGE_FILE_SIZE bytes, never buffered to disk first
+- the file part is collected in one in-memory buffer, which is handed
+  to the image variant pipeline as-is (no temp file)
+- format and dimensions come from a single header-only Pillow parse; pixel
+  data is not decoded (or verified) here. A file with a valid header but
+  corrupt data is rejected when the variant stage decodes it
+  (app/services/image_variants.py, 400 "Could not process uploaded image.")
+- the SHA-256 of the file is computed as it arrives (``content_hash``), so
+  re-uploads of the same photo can be matched without another pass
+
+``receive_image_uploads`` does the same for multi-file forms (bulk catalog
+upload), collecting every file part and rejecting bad files individually.
+
+Routes using it take ``request: Request`` rather than ``File(...)`` so
+FastAPI doesn't consume the body first; ``multipart_openapi`` keeps the
+request body documented in the OpenAPI schema. Auth dependencies still run
+before any of the body is read.
+"""
+
+import hashlib
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple, Union
+
+import python_multipart
+from fastapi import HTTPException, Request, status
+from PIL import Image, UnidentifiedImageError
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import parse_options_header
+
+
+ALLOWED_IMAGE_CONTENT_TYPES = {
+    "image/jpeg",
+    "image/png",
+    "image/webp",
+}
+ALLOWED_IMAGE_FORMATS = {"JPEG", "PNG", "WEBP"}
+
+MAX_IMAGE_FILE_SIZE = 5 * 1024 * 1024  # 5 MB
+MAX_IMAGE_DIMENSION = 4096  # cap width/height to avoid extremely large images
+
+# Guard against decompression bombs
+Image.MAX_IMAGE_PIXELS = 10_000_000
+
+# Multipart framing and small text fields around the file part
+_MULTIPART_OVERHEAD = 64 * 1024
+_MAX_TEXT_FIELD_SIZE = 4096
+_MAX_TEXT_FIELDS = 10
+
+
+@dataclass
+class ImageUpload:
+    contents: bytes
+    content_type: str
+    filename: Optional[str]
+    format: str
+    width: int
+    height: int
+    content_hash: str
+    index: int = 0  # position among the file parts of the request
+    fields: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class RejectedImage:
+    """A file part of a multi-file upload that failed validation."""
+
+    index: int
+    filename: Optional[str]
+    detail: str
+
+
+def _bad_request(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+# ---------------------------------------------------------------------------
+# Multipart parsing
+# ---------------------------------------------------------------------------
+
+class _FilePart:
+    def __init__(self, index: int, content_type: str, filename: Optional[str]) -> None:
+        self.index = index
+        self.content_type = content_type
+        self.filename = filename
+        self.buffer: Optional[BytesIO] = BytesIO()
+        self.hash = hashlib.sha256()
+        self.error: Optional[str] = None
+
+
+class _ImagePartCollector:
+    """
+    python-multipart callbacks that keep the image part(s) in memory.
+
+    With per_file_errors, a bad type or oversized file only rejects that
+    part (its data is dropped) and the other files are still collected;
+    otherwise the first problem fails the whole request.
+    """
+
+    def __init__(
+        self,
+        file_field: str,
+        label: str,
+        max_bytes: int,
+        max_files: int = 1,
+        max_total_bytes: Optional[int] = None,
+        per_file_errors: bool = False,
+    ) -> None:
+        self.file_field = file_field
+        self.label = label
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.max_total_bytes = max_total_bytes
+        self.per_file_errors = per_file_errors
+
+        self.files: List[_FilePart] = []
+        self.fields: Dict[str, str] = {}
+        self.error: Optional[HTTPException] = None
+        self.total_bytes = 0
+
+        self._header_name = b""
+        self._header_value = b""
+        self._headers: Dict[bytes, bytes] = {}
+        self._part_name: Optional[str] = None
+        self._file: Optional[_FilePart] = None
+        self._text = bytearray()
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    def _fail(self, exc: HTTPException) -> None:
+        # Exceptions raised inside callbacks would surface as parser errors,
+        # so record the first one and stop the read loop
+        if self.error is None:
+            self.error = exc
+
+    def _reject(self, part: _FilePart, detail: str) -> None:
+        if self.per_file_errors:
+            part.error = detail
+            part.buffer = None
+        else:
+            self._fail(_bad_request(detail))
+
+    def on_part_begin(self) -> None:
+        self._headers = {}
+        self._part_name = None
+        self._file = None
+        self._text = bytearray()
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        self._headers[self._header_name.lower()] = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name")
+        self._part_name = name.decode("utf-8", "replace") if name else None
+
+        if self._part_name != self.file_field:
+            return
+
+        if len(self.files) >= self.max_files:
+            self._fail(_bad_request(f"Too many files. Maximum is {self.max_files}."))
+            return
+
+        content_type = self._headers.get(b"content-type", b"").decode("latin-1")
+        filename = options.get(b"filename")
+        self._file = _FilePart(
+            index=len(self.files),
+            content_type=content_type.split(";")[0].strip().lower(),
+            filename=filename.decode("utf-8", "replace") if filename else None,
+        )
+        self.files.append(self._file)
+
+        if self._file.content_type not in ALLOWED_IMAGE_CONTENT_TYPES:
+            self._reject(
+                self._file,
+                f"Invalid {self.label.lower()} file type. Allowed: JPEG, PNG, WEBP.",
+            )
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self.error is not None:
+            return
+
+        part = self._file
+        if part is not None:
+            self.total_bytes += end - start
+            if self.max_total_bytes is not None and self.total_bytes > self.max_total_bytes:
+                limit_mb = self.max_total_bytes // (1024 * 1024)
+                self._fail(_bad_request(f"Upload is too large. Maximum total size is {limit_mb} MB."))
+                return
+            if part.buffer is None:
+                return
+            if part.buffer.tell() + (end - start) > self.max_bytes:
+                limit_mb = self.max_bytes // (1024 * 1024)
+                self._reject(
+                    part, f"{self.label} file is too large. Maximum size is {limit_mb} MB."
+                )
+                return
+            chunk = data[start:end]
+            part.buffer.write(chunk)
+            part.hash.update(chunk)
+        elif self._part_name is not None:
+            self._text += data[start:end]
+            if len(self._text) > _MAX_TEXT_FIELD_SIZE:
+                self._fail(_bad_request(f"Form field '{self._part_name}' is too long."))
+
+    def on_part_end(self) -> None:
+        if self._part_name is None or self._part_name == self.file_field:
+            return
+        if len(self.fields) >= _MAX_TEXT_FIELDS:
+            self._fail(_bad_request("Too many form fields."))
+            return
+        self.fields[self._part_name] = self._text.decode("utf-8", "replace")
+
+
+def inspect_image(contents: bytes, label: str = "Image") -> tuple:
+    """
+    (format, width, height) from the image header.
+
+    Pixels are not decoded and there is no ``verify()`` pass: the variant
+    stage decodes every upload anyway and turns decode errors into a 400.
+    """
+    try:
+        with Image.open(BytesIO(contents)) as img:
+            img_format = (img.format or "").upper()
+            width, height = img.size
+    except UnidentifiedImageError:
+        raise _bad_request("Uploaded file is not a valid image.")
+    except Exception:
+        # Includes DecompressionBombError for absurd pixel counts
+        raise _bad_request("Could not read uploaded image.")
+
+    if img_format not in ALLOWED_IMAGE_FORMATS:
+        raise _bad_request("Invalid image format. Allowed: JPEG, PNG, WEBP.")
+
+    if width > MAX_IMAGE_DIMENSION or height > MAX_IMAGE_DIMENSION:
+        raise _bad_request(f"{label} image dimensions are too large.")
+
+    return img_format, width, height
+
+
+async def _stream_multipart(
+    request: Request, collector: _ImagePartCollector, max_body_bytes: int, too_large: str
+) -> None:
+    content_type_header = request.headers.get("content-type", "")
+    _, params = parse_options_header(content_type_header)
+    if not content_type_header.lower().startswith("multipart/form-data") or b"boundary" not in params:
+        raise _bad_request("Expected a multipart/form-data upload.")
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit():
+        if int(content_length) > max_body_bytes + _MULTIPART_OVERHEAD:
+            raise _bad_request(too_large)
+
+    parser = python_multipart.MultipartParser(params[b"boundary"], collector.callbacks())
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            if collector.error is not None:
+                raise collector.error
+        parser.finalize()
+    except MultipartParseError:
+        raise _bad_request("Malformed multipart body.")
+
+
+def _build_upload(part: _FilePart, fields: Dict[str, str], label: str) -> ImageUpload:
+    contents = part.buffer.getvalue()
+    img_format, width, height = inspect_image(contents, label)
+
+    return ImageUpload(
+        contents=contents,
+        content_type=part.content_type,
+        filename=part.filename,
+        format=img_format,
+        width=width,
+        height=height,
+        content_hash=part.hash.hexdigest(),
+        index=part.index,
+        fields=fields,
+    )
+
+
+async def receive_image_upload(
+    request: Request,
+    *,
+    file_field: str = "file",
+    label: str = "Image",
+    max_bytes: int = MAX_IMAGE_FILE_SIZE,
+) -> ImageUpload:
+    """
+    Stream a multipart/form-data body and return the validated image part.
+
+    Other (small) text fields of the form are returned in ``fields``.
+    Raises HTTPException(400) for a bad type, size or image and 422 when the
+    file part is missing.
+    """
+    collector = _ImagePartCollector(file_field, label, max_bytes)
+    limit_mb = max_bytes // (1024 * 1024)
+    await _stream_multipart(
+        request,
+        collector,
+        max_bytes,
+        f"{label} file is too large. Maximum size is {limit_mb} MB.",
+    )
+
+    if not collector.files:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Missing '{file_field}' file field.",
+        )
+
+    return _build_upload(collector.files[0], collector.fields, label)
+
+
+async def receive_image_uploads(
+    request: Request,
+    *,
+    file_field: str = "files",
+    label: str = "Image",
+    max_files: int,
+    max_total_bytes: int,
+    max_bytes: int = MAX_IMAGE_FILE_SIZE,
+) -> Tuple[List[Union[ImageUpload, RejectedImage]], Dict[str, str]]:
+    """
+    Stream a multipart/form-data body with several image parts.
+
+    Returns (one ImageUpload or RejectedImage per file part, in request
+    order; the text fields). A bad type, size or image only rejects that
+    file. The whole request fails (400) past max_files or max_total_bytes,
+    and with 422 when there is no file part at all.
+    """
+    collector = _ImagePartCollector(
+        file_field,
+        label,
+        max_bytes,
+        max_files=max_files,
+        max_total_bytes=max_total_bytes,
+        per_file_errors=True,
+    )
+    limit_mb = max_total_bytes // (1024 * 1024)
+    await _stream_multipart(
+        request,
+        collector,
+        max_total_bytes,
+        f"Upload is too large. Maximum total size is {limit_mb} MB.",
+    )
+
+    if not collector.files:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Missing '{file_field}' file field.",
+        )
+
+    results: List[Union[ImageUpload, RejectedImage]] = []
+    for part in collector.files:
+        if part.error is None:
+            try:
+                results.append(_build_upload(part, collector.fields, label))
+                continue
+            except HTTPException as exc:
+                part.error = exc.detail
+        results.append(RejectedImage(index=part.index, filename=part.filename, detail=part.error))
+    return results, collector.fields
+
+
+def multipart_openapi(
+    file_field: str = "file", *text_fields: str, multiple: bool = False
+) -> dict:
+    """``openapi_extra`` describing the multipart body of an upload route."""
+    file_schema = {"type": "string", "format": "binary"}
+    if multiple:
+        file_schema = {"type": "array", "items": file_schema}
+    properties = {file_field: file_schema}
+    for name in text_fields:
+        properties[name] = {"type": "string"}
+
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": [file_field],
+                        "properties": properties,
+                    }
+                }
+            },
+        }
+    }
+
+
+__all__ = [
+    "ALLOWED_IMAGE_CONTENT_TYPES",
+    "ALLOWED_IMAGE_FORMATS",
+    "ImageUpload",
+    "MAX_IMAGE_DIMENSION",
+    "MAX_IMAGE_FILE_SIZE",
+    "RejectedImage",
+    "inspect_image",
+    "multipart_openapi",
+    "receive_image_upload",
+    "receive_image_uploads",
+]
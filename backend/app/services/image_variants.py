@@ -0,0 +1,356 @@
+"""Resized, re-encoded variants of uploaded images.
+
+Every avatar and catalog upload is turned into three variants:
+
+- ``thumb``: longest side at most 200 px, for lists and carousels
+- ``medium``: at most 800 px, for profile headers and detail views
+- ``full``: at most 2048 px, replacing the original upload
+
+Each variant is re-encoded as WebP (or JPEG with IMAGE_VARIANT_FORMAT=jpeg)
+after applying the EXIF orientation, and saved without the EXIF block, so
+camera metadata such as GPS coordinates never leaves the server.
+
+Decoding and resizing a 4096x4096 photo is CPU-bound, so it runs in a small
+worker pool (a spawn process pool by default, like password hashing) with
+the same admission limit and timeout as the upload pool. The three variants
+are then uploaded concurrently through the upload pool to the configured
+image storage (app/services/image_storage.py). They are admitted to the
+upload pool together, and if any of them fails the ones that were stored
+are deleted again, so a failed upload leaves no orphaned variants.
+
+Only Pillow decode errors count as a bad image (400). A crashed worker
+process (BrokenProcessPool) replaces the pool and answers 503, so one bad
+worker doesn't turn every later upload into a 400.
+
+Uploads are deduplicated by content hash (``StoredImage``): when the same
+bytes were already stored in the same folder of the same storage backend,
+the earlier variant URLs are reused and nothing is decoded or uploaded.
+Backends whose files don't outlive the process ("memory") are not
+deduplicated, since their URLs die with it.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Dict, Optional
+
+from fastapi import HTTPException, status
+from PIL import Image, ImageOps, UnidentifiedImageError
+from starlette.concurrency import run_in_threadpool
+
+from app import crud
+from app.config import get_settings
+from app.database import SessionLocal
+from app.Logger import logger
+from app.metrics import image_uploads_total
+from app.services.image_uploads import ImageUpload  # also sets Image.MAX_IMAGE_PIXELS
+from app.services.image_storage import get_image_storage
+from app.services.upload_executor import (
+    UploadsBusy,
+    run_in_upload_pool,
+    submit_upload_jobs,
+    wait_upload_jobs,
+)
+
+settings = get_settings()
+image_logger = logger.getChild("images")
+
+VARIANT_SIZES = {
+    "thumb": 200,
+    "medium": 800,
+    "full": 2048,
+}
+
+
+class ImageProcessingError(ValueError):
+    """The upload passed header validation but could not be decoded."""
+
+
+# What Pillow raises for corrupt, truncated or oversized image data (some
+# plugins, e.g. PNG, report broken files as SyntaxError)
+_DECODE_ERRORS = (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError)
+
+
+# ---------------------------------------------------------------------------
+# Worker-side functions (must stay top-level so they can be pickled)
+# ---------------------------------------------------------------------------
+
+def _encode(img: Image.Image, image_format: str) -> bytes:
+    out = BytesIO()
+    # No exif= argument: the re-encoded file carries no EXIF block
+    if image_format == "jpeg":
+        img.save(out, format="JPEG", quality=85, optimize=True, progressive=True)
+    else:
+        img.save(out, format="WEBP", quality=80, method=4)
+    return out.getvalue()
+
+
+def _build_variants(contents: bytes, image_format: str) -> Dict[str, bytes]:
+    try:
+        return _resize_variants(contents, image_format)
+    except _DECODE_ERRORS as exc:
+        # Raised in the worker so only decode errors come back as a 400
+        raise ImageProcessingError("Could not process uploaded image.") from exc
+
+
+def _resize_variants(contents: bytes, image_format: str) -> Dict[str, bytes]:
+    with Image.open(BytesIO(contents)) as original:
+        img = ImageOps.exif_transpose(original)
+
+        has_alpha = img.mode in ("RGBA", "LA") or "transparency" in img.info
+        if image_format == "jpeg" or not has_alpha:
+            if has_alpha:
+                # JPEG has no alpha: flatten onto white
+                rgba = img.convert("RGBA")
+                img = Image.new("RGB", img.size, (255, 255, 255))
+                img.paste(rgba, mask=rgba.getchannel("A"))
+            else:
+                img = img.convert("RGB")
+        else:
+            img = img.convert("RGBA")
+
+    variants = {}
+    # Largest first, each derived from the previous one to keep resizing cheap
+    source = img
+    for name, max_side in sorted(VARIANT_SIZES.items(), key=lambda item: -item[1]):
+        variant = source.copy()
+        variant.thumbnail((max_side, max_side), Image.LANCZOS)
+        variants[name] = _encode(variant, image_format)
+        source = variant
+    return variants
+
+
+# ---------------------------------------------------------------------------
+# Pool management
+# ---------------------------------------------------------------------------
+
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+_admission = threading.BoundedSemaphore(max(1, settings.UPLOAD_MAX_PENDING))
+
+
+def _get_executor() -> Optional[Executor]:
+    """Return the shared image pool, or None when running inline."""
+    global _executor
+
+    mode = settings.IMAGE_PROCESS_EXECUTOR
+    if mode == "inline":
+        return None
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = max(1, settings.IMAGE_PROCESS_WORKERS)
+                if mode == "thread":
+                    _executor = ThreadPoolExecutor(
+                        max_workers=workers,
+                        thread_name_prefix="image-process",
+                    )
+                else:
+                    # spawn, not fork: the API process already runs threads
+                    _executor = ProcessPoolExecutor(
+                        max_workers=workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+    return _executor
+
+
+def shutdown_image_executor() -> None:
+    global _executor
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _replace_broken_executor(broken: Executor) -> None:
+    """Drop a broken pool so the next upload starts a fresh one."""
+    global _executor
+
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+async def build_image_variants(contents: bytes) -> Dict[str, bytes]:
+    """
+    {variant name: encoded bytes} for an uploaded image.
+
+    Raises UploadsBusy when the pool is saturated or had to be replaced,
+    asyncio.TimeoutError after UPLOAD_TIMEOUT_SECONDS and
+    ImageProcessingError if Pillow can't decode it.
+    """
+    executor = _get_executor()
+    if executor is None:
+        return _build_variants(contents, settings.IMAGE_VARIANT_FORMAT)
+
+    if not _admission.acquire(blocking=False):
+        raise UploadsBusy("Too many uploads in progress, please retry shortly")
+
+    try:
+        future = executor.submit(_build_variants, contents, settings.IMAGE_VARIANT_FORMAT)
+    except BrokenProcessPool:
+        _admission.release()
+        _replace_broken_executor(executor)
+        raise UploadsBusy("Image processing is restarting, please retry shortly")
+    except BaseException:
+        _admission.release()
+        raise
+    future.add_done_callback(lambda _: _admission.release())
+
+    wrapped = asyncio.wrap_future(future)
+    done, _ = await asyncio.wait({wrapped}, timeout=settings.UPLOAD_TIMEOUT_SECONDS)
+    if not done:
+        raise asyncio.TimeoutError()
+
+    try:
+        return wrapped.result()
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); the pool is unusable now
+        _replace_broken_executor(executor)
+        raise UploadsBusy("Image processing is restarting, please retry shortly")
+
+
+def _discard_variant(storage, folder: str, public_id: str):
+    """Done-callback deleting a variant that was stored for a failed upload."""
+
+    def callback(future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            # Deleting blocks (e.g. a Cloudinary call): not on the event loop
+            run_in_upload_pool(_delete_quietly, storage, folder, public_id)
+
+    return callback
+
+
+def _delete_quietly(storage, folder: str, public_id: str) -> None:
+    try:
+        storage.delete(folder, public_id)
+    except Exception:
+        image_logger.warning(
+            "Could not delete orphaned image %s/%s", folder, public_id, exc_info=True
+        )
+
+
+def _variant_urls(stored) -> Dict[str, str]:
+    return {
+        "thumb": stored.thumb_url,
+        "medium": stored.medium_url,
+        "full": stored.image_url,
+    }
+
+
+def _reuse_stored_image(content_hash: str, folder: str) -> Optional[Dict[str, str]]:
+    # Own session: the bulk route runs several uploads in threads at once
+    db = SessionLocal()
+    try:
+        stored = crud.get_stored_image(db, content_hash, settings.IMAGE_STORAGE_BACKEND, folder)
+        if stored is None:
+            return None
+        urls = _variant_urls(stored)
+        crud.mark_stored_image_reused(db, stored)
+        return urls
+    finally:
+        db.close()
+
+
+def _record_stored_image(
+    upload: ImageUpload, folder: str, urls: Dict[str, str]
+) -> Dict[str, str]:
+    db = SessionLocal()
+    try:
+        stored = crud.record_stored_image(
+            db,
+            content_hash=upload.content_hash,
+            backend=settings.IMAGE_STORAGE_BACKEND,
+            folder=folder,
+            size_bytes=len(upload.contents),
+            image_url=urls["full"],
+            thumb_url=urls["thumb"],
+            medium_url=urls["medium"],
+        )
+        return _variant_urls(stored)
+    finally:
+        db.close()
+
+
+async def store_image_variants(
+    upload: ImageUpload, folder: str, label: str = "Image"
+) -> Dict[str, str]:
+    """
+    Build and upload the variants of an upload; {variant name: URL}.
+
+    A file already stored in ``folder`` of the configured backend (same
+    content hash) is not processed again; its existing URLs are returned.
+    For the upload routes: failures become HTTPException (400 undecodable,
+    504 timeout, 500 upload error); UploadsBusy propagates for the 503
+    handler.
+
+    The dedupe index is read and written in the threadpool, each time with
+    a short-lived session of its own, so concurrent uploads never share one.
+    """
+    storage = get_image_storage()
+    if storage.persistent:
+        reused = await run_in_threadpool(_reuse_stored_image, upload.content_hash, folder)
+        if reused is not None:
+            image_uploads_total.labels("hit").inc()
+            return reused
+
+    try:
+        variants = await build_image_variants(upload.contents)
+
+        # One id per upload so the variants sit next to each other in storage
+        base_id = uuid.uuid4().hex
+        names = list(variants)
+        # All variants are admitted together (or UploadsBusy, nothing stored)
+        futures = submit_upload_jobs(
+            [(storage.save, variants[name], folder, f"{base_id}_{name}") for name in names]
+        )
+        try:
+            urls = await wait_upload_jobs(futures)
+        except BaseException:
+            for name, future in zip(names, futures):
+                future.add_done_callback(
+                    _discard_variant(storage, folder, f"{base_id}_{name}")
+                )
+            raise
+    except UploadsBusy:
+        raise
+    except ImageProcessingError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"{label} upload timed out",
+        )
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to upload {label.lower()}",
+        )
+
+    if not all(urls):
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"{label} upload did not return a valid URL",
+        )
+    image_uploads_total.labels("miss").inc()
+
+    urls = dict(zip(names, urls))
+    if not storage.persistent:
+        return urls
+    return await run_in_threadpool(_record_stored_image, upload, folder, urls)
+
+
+__all__ = [
+    "ImageProcessingError",
+    "VARIANT_SIZES",
+    "build_image_variants",
+    "shutdown_image_executor",
+    "store_image_variants",
+]
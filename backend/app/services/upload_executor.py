@@ -0,0 +1,133 @@
+"""Blocking upload work (Pillow, Cloudinary) off the event loop.
+
+The upload routes are ``async def`` so they can await the request body, but
+Pillow decoding and ``cloudinary.uploader.upload`` are blocking calls; made
+directly they freeze every other request on the worker for the length of
+the upload. ``run_upload_job`` runs them in a dedicated, bounded thread pool
+instead (separate from Starlette's threadpool, so slow uploads can't starve
+the sync routes).
+
+Admission is bounded like password hashing (app/passwords.py): at most
+UPLOAD_MAX_PENDING jobs may be queued or running, and further uploads get
+UploadsBusy, which the API turns into a 503. A job slot is only released
+when the job really finishes, so timed-out uploads still count against the
+limit until their thread is free again.
+
+``submit_upload_jobs`` admits a group of jobs that only make sense together
+(the variants of one image) all at once or not at all, so a busy pool never
+leaves half of a group stored.
+"""
+
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, List, Optional, Sequence, Tuple
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+class UploadsBusy(RuntimeError):
+    """Raised when the upload pool is saturated and the caller should retry."""
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_admission = threading.BoundedSemaphore(max(1, settings.UPLOAD_MAX_PENDING))
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=max(1, settings.UPLOAD_WORKERS),
+                    thread_name_prefix="upload",
+                )
+    return _executor
+
+
+def shutdown_upload_executor() -> None:
+    global _executor
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def submit_upload_jobs(jobs: Sequence[Tuple[Any, ...]]) -> List[Future]:
+    """
+    Submit jobs, each a (fn, *args) tuple, to the upload pool.
+
+    Slots for all of them are taken up front: either every job is submitted
+    or UploadsBusy is raised and none is.
+    """
+    acquired = 0
+    try:
+        for _ in jobs:
+            if not _admission.acquire(blocking=False):
+                raise UploadsBusy("Too many uploads in progress, please retry shortly")
+            acquired += 1
+
+        futures = []
+        for fn, *args in jobs:
+            # Copy the context so request ids and tracing spans follow the job
+            context = contextvars.copy_context()
+            future = _get_executor().submit(context.run, fn, *args)
+            acquired -= 1
+            future.add_done_callback(lambda _: _admission.release())
+            futures.append(future)
+        return futures
+    finally:
+        for _ in range(acquired):
+            _admission.release()
+
+
+async def wait_upload_jobs(futures: Sequence[Future], timeout: Optional[float] = None) -> list:
+    """
+    Await submitted jobs and return their results in order.
+
+    Raises the first job exception, or asyncio.TimeoutError after timeout
+    seconds (default UPLOAD_TIMEOUT_SECONDS). Either way the other jobs keep
+    running to completion in the pool.
+    """
+    if timeout is None:
+        timeout = settings.UPLOAD_TIMEOUT_SECONDS
+    # shield: on timeout stop waiting, but let the threads finish on their own
+    return await asyncio.wait_for(
+        asyncio.gather(*(asyncio.shield(asyncio.wrap_future(f)) for f in futures)),
+        timeout,
+    )
+
+
+def run_in_upload_pool(fn, *args) -> None:
+    """Fire-and-forget follow-up work (cleanup) in the upload pool, unadmitted."""
+    _get_executor().submit(contextvars.copy_context().run, fn, *args)
+
+
+async def run_upload_job(fn, *args, timeout: Optional[float] = None):
+    """
+    Run fn(*args) in the upload pool and await its result.
+
+    Raises UploadsBusy when the pool is saturated and asyncio.TimeoutError
+    after timeout seconds (default UPLOAD_TIMEOUT_SECONDS). Exceptions from
+    fn (including HTTPException from validation) propagate unchanged.
+    """
+    futures = submit_upload_jobs([(fn, *args)])
+    (result,) = await wait_upload_jobs(futures, timeout)
+    return result
+
+
+__all__ = [
+    "UploadsBusy",
+    "run_in_upload_pool",
+    "run_upload_job",
+    "shutdown_upload_executor",
+    "submit_upload_jobs",
+    "wait_upload_jobs",
+]
@@ -0,0 +1,296 @@
+"""Request tracing with OpenTelemetry.
+
+With TRACING_ENABLED=true each sampled request produces a trace:
+
+- a server span per request (TracingMiddleware), named by route template
+  and tagged with the request id from app.Logger
+- a span per SQL statement, on every engine (primary, async, replicas),
+  and one per session commit (flush + COMMIT)
+- a span per directory/response cache lookup, tagged hit or miss
+- a span per outbound call made through ``observe_outbound`` (Twilio,
+  Expo push, Cloudinary)
+
+Spans are exported from a background thread (BatchSpanProcessor), so
+requests never wait on the exporter. The default "file" exporter appends
+one JSON span per line to TRACING_FILE, rotated at TRACING_FILE_MAX_BYTES
+(meant for local debugging); ``python -m scripts.trace_waterfall``
+turns that into per-request waterfalls. "otlp" sends to any OpenTelemetry
+collector (Jaeger, Tempo, ...).
+
+TRACING_SAMPLE_RATE picks which new traces are recorded; a caller's sampled
+``traceparent`` header is always honoured, so a single request can be
+traced on demand. With tracing disabled nothing is registered and ``span``
+is a no-op.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Optional, Sequence
+
+from opentelemetry import propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SpanExporter,
+    SpanExportResult,
+)
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.Logger import logger, request_id_var
+
+settings = get_settings()
+tracing_logger = logger.getChild("tracing")
+
+_provider: Optional[TracerProvider] = None
+_tracer = trace.get_tracer("bookitgy")
+
+# Long statements (IN lists, bulk inserts) are cut to keep span files small
+_MAX_STATEMENT_CHARS = 2000
+
+
+# ---------------------------------------------------------------------------
+# Exporters
+# ---------------------------------------------------------------------------
+
+class FileSpanExporter(SpanExporter):
+    """
+    Append finished spans to a file, one JSON object per line.
+
+    Once the file reaches max_bytes it is rotated like a RotatingFileHandler
+    (spans.jsonl -> spans.jsonl.1 -> ... up to backups files), so disk use
+    stays under roughly (backups + 1) * max_bytes. max_bytes=0 disables
+    rotation.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 0, backups: int = 0) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _rotate(self) -> None:
+        if self.backups <= 0:
+            os.remove(self.path)
+            return
+        for index in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = "".join(span.to_json(indent=None) + "\n" for span in spans)
+        try:
+            with self._lock:
+                if (
+                    self.max_bytes
+                    and os.path.exists(self.path)
+                    and os.path.getsize(self.path) + len(lines) > self.max_bytes
+                ):
+                    self._rotate()
+                with open(self.path, "a") as fh:
+                    fh.write(lines)
+        except OSError as exc:
+            tracing_logger.warning("Could not write spans to %s: %s", self.path, exc)
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+
+def _build_exporter() -> SpanExporter:
+    if settings.TRACING_EXPORTER == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter,
+        )
+
+        return OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+    if settings.TRACING_EXPORTER == "console":
+        return ConsoleSpanExporter()
+    return FileSpanExporter(
+        settings.TRACING_FILE,
+        max_bytes=settings.TRACING_FILE_MAX_BYTES,
+        backups=settings.TRACING_FILE_BACKUPS,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Setup
+# ---------------------------------------------------------------------------
+
+def configure_tracing() -> None:
+    """Install the tracer provider and SQL hooks (once, when enabled)."""
+    global _provider, _tracer
+    if _provider is not None or not settings.TRACING_ENABLED:
+        return
+
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.TRACING_SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATE)),
+    )
+    _provider.add_span_processor(BatchSpanProcessor(_build_exporter()))
+    _tracer = _provider.get_tracer("bookitgy")
+
+    event.listen(Engine, "before_cursor_execute", _start_sql_span)
+    event.listen(Engine, "after_cursor_execute", _end_sql_span)
+    event.listen(Engine, "handle_error", _fail_sql_span)
+    event.listen(Session, "before_commit", _start_commit_span)
+    event.listen(Session, "after_commit", _end_commit_span)
+    event.listen(Session, "after_rollback", _end_commit_span)
+
+    tracing_logger.info(
+        "Tracing enabled (exporter=%s, sample rate=%s)",
+        settings.TRACING_EXPORTER,
+        settings.TRACING_SAMPLE_RATE,
+    )
+
+
+def shutdown_tracing() -> None:
+    """Flush pending spans."""
+    global _provider
+    if _provider is not None:
+        _provider.shutdown()
+        _provider = None
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Child span of the current one; a no-op when tracing is off."""
+    if _provider is None:
+        yield None
+        return
+
+    with _tracer.start_as_current_span(name, attributes=attributes) as current:
+        yield current
+
+
+# ---------------------------------------------------------------------------
+# SQL spans
+# ---------------------------------------------------------------------------
+
+def _start_sql_span(conn, cursor, statement, parameters, context, executemany):
+    if not trace.get_current_span().is_recording():
+        conn.info.setdefault("trace_spans", []).append(None)
+        return
+
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement else "SQL"
+    sql_span = _tracer.start_span(
+        f"db {operation}",
+        kind=SpanKind.CLIENT,
+        attributes={
+            "db.system": conn.dialect.name,
+            "db.operation": operation,
+            "db.statement": " ".join(statement.split())[:_MAX_STATEMENT_CHARS],
+            "db.executemany": executemany,
+        },
+    )
+    conn.info.setdefault("trace_spans", []).append(sql_span)
+
+
+def _end_sql_span(conn, cursor, statement, parameters, context, executemany):
+    sql_span = conn.info["trace_spans"].pop()
+    if sql_span is not None:
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            sql_span.set_attribute("db.rowcount", cursor.rowcount)
+        sql_span.end()
+
+
+def _fail_sql_span(exception_context):
+    conn = exception_context.connection
+    if conn is None or not conn.info.get("trace_spans"):
+        return
+
+    sql_span = conn.info["trace_spans"].pop()
+    if sql_span is not None:
+        sql_span.record_exception(exception_context.original_exception)
+        sql_span.set_status(Status(StatusCode.ERROR))
+        sql_span.end()
+
+
+def _start_commit_span(session):
+    if trace.get_current_span().is_recording():
+        session.info["trace_commit_span"] = _tracer.start_span(
+            "db COMMIT", kind=SpanKind.CLIENT
+        )
+
+
+def _end_commit_span(session):
+    # after_commit, or after_rollback when the commit (or its flush) failed
+    commit_span = session.info.pop("trace_commit_span", None)
+    if commit_span is not None:
+        commit_span.end()
+
+
+# ---------------------------------------------------------------------------
+# Middleware
+# ---------------------------------------------------------------------------
+
+class TracingMiddleware:
+    """Server span per HTTP request (pure ASGI)."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _provider is None:
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {
+            name.decode("latin-1"): value.decode("latin-1")
+            for name, value in scope.get("headers", [])
+        }
+        method = scope["method"]
+        status_code = None
+
+        with _tracer.start_as_current_span(
+            f"{method} {scope['path']}",
+            context=propagate.extract(carrier),
+            kind=SpanKind.SERVER,
+            attributes={
+                "http.request.method": method,
+                "url.path": scope["path"],
+                "request.id": request_id_var.get() or "",
+            },
+        ) as server_span:
+
+            async def send_with_trace_id(message):
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    if server_span.is_recording():
+                        trace_id = format(server_span.get_span_context().trace_id, "032x")
+                        headers = list(message.get("headers", []))
+                        headers.append((b"x-trace-id", trace_id.encode()))
+                        message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_trace_id)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    server_span.update_name(f"{method} {route}")
+                    server_span.set_attribute("http.route", route)
+                if status_code is not None:
+                    server_span.set_attribute("http.response.status_code", status_code)
+                    if status_code >= 500:
+                        server_span.set_status(Status(StatusCode.ERROR))
+
+
+__all__ = [
+    "FileSpanExporter",
+    "TracingMiddleware",
+    "configure_tracing",
+    "shutdown_tracing",
+    "span",
+]
@@ -4,8 +4,10 @@ from sqlalchemy.orm import Session
 from app.database import SessionLocal
 from app import models
 from app.crud import send_push, now_local_naive, generate_monthly_bills
+from app.metrics import track_cron_job
 
 
+@track_cron_job
 def send_upcoming_reminders():
     """
     Send push reminder to clients 1 hour before their appointment.
@@ -40,6 +42,7 @@ def send_upcoming_reminders():
     db.close()
 
 
+@track_cron_job
 def run_billing_job():
     """
     Recalculate monthly bills for all providers based on completed bookings.
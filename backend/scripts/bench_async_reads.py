@@ -0,0 +1,170 @@
+"""Concurrency sweep for the public provider reads, sync vs async DB path.
+
+Hits the hot public reads (/providers, provider services/catalog and
+availability) at increasing client concurrency and reports throughput and
+p50/p99 latency per level. Run it once against a server started with
+ASYNC_DB_READS=false and once with ASYNC_DB_READS=true, saving each run with
+--output, then print them side by side with --compare.
+
+Disable the in-process caches on the server for these runs, otherwise most
+requests never reach the database:
+
+    DIRECTORY_CACHE_ENABLED=false RESPONSE_CACHE_ENABLED=false \\
+    RATE_LIMIT_ENABLED=false ASYNC_DB_READS=false uvicorn app.main:app
+
+Usage (from the backend directory, with the API running):
+
+    python -m scripts.bench_async_reads --provider-id 1 --service-id 1 \\
+        --output sync.json
+    # restart the server with ASYNC_DB_READS=true
+    python -m scripts.bench_async_reads --provider-id 1 --service-id 1 \\
+        --output async.json
+    python -m scripts.bench_async_reads --compare sync.json async.json
+"""
+
+import argparse
+import itertools
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _paths(args):
+    return [
+        "/providers",
+        f"/providers/{args.provider_id}/services",
+        f"/providers/{args.provider_id}/catalog",
+        f"/providers/{args.provider_id}/availability"
+        f"?service_id={args.service_id}&days={args.days}",
+    ]
+
+
+def _worker(base_url, paths, stop, latencies, errors):
+    session = requests.Session()
+    for path in itertools.cycle(paths):
+        if stop.is_set():
+            return
+        started = time.perf_counter()
+        try:
+            resp = session.get(base_url + path, timeout=30)
+            if resp.status_code != 200:
+                errors.append(resp.status_code)
+                continue
+        except requests.RequestException:
+            errors.append("exc")
+            continue
+        latencies.append((time.perf_counter() - started) * 1000.0)
+
+
+def _run_level(args, concurrency):
+    stop = threading.Event()
+    latencies, errors = [], []
+    paths = _paths(args)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i in range(concurrency):
+            # Stagger the starting path so every endpoint is in flight at once
+            offset = i % len(paths)
+            pool.submit(
+                _worker,
+                args.base_url,
+                paths[offset:] + paths[:offset],
+                stop,
+                latencies,
+                errors,
+            )
+        time.sleep(args.duration)
+        stop.set()
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "rps": len(latencies) / args.duration,
+        "errors": len(errors),
+        "p50_ms": _percentile(latencies, 50),
+        "p99_ms": _percentile(latencies, 99),
+    }
+
+
+def _print_results(label, results):
+    print(f"\n== {label} ==")
+    print(f"{'conc':>6} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for r in results:
+        print(
+            f"{r['concurrency']:>6} {r['rps']:>9.1f} {r['p50_ms']:>9.1f} "
+            f"{r['p99_ms']:>9.1f} {r['errors']:>7}"
+        )
+
+
+def _compare(path_a, path_b):
+    with open(path_a) as fh:
+        a = json.load(fh)
+    with open(path_b) as fh:
+        b = json.load(fh)
+
+    _print_results(a["label"], a["results"])
+    _print_results(b["label"], b["results"])
+
+    print(f"\n== {b['label']} vs {a['label']} ==")
+    print(f"{'conc':>6} {'req/s x':>9} {'p99 x':>9}")
+    by_conc = {r["concurrency"]: r for r in a["results"]}
+    for r in b["results"]:
+        base = by_conc.get(r["concurrency"])
+        if not base:
+            continue
+        rps_ratio = r["rps"] / base["rps"] if base["rps"] else 0.0
+        p99_ratio = r["p99_ms"] / base["p99_ms"] if base["p99_ms"] else 0.0
+        print(f"{r['concurrency']:>6} {rps_ratio:>9.2f} {p99_ratio:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--provider-id", type=int, default=1)
+    parser.add_argument("--service-id", type=int, default=1)
+    parser.add_argument("--days", type=int, default=14, help="availability window")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per level")
+    parser.add_argument(
+        "--concurrency",
+        default="1,8,32,64,128",
+        help="comma-separated client concurrency levels",
+    )
+    parser.add_argument("--label", help="name for this run (default: the --output file name)")
+    parser.add_argument("--output", help="write results as JSON for --compare")
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("BASELINE", "CANDIDATE"),
+        help="print two saved runs side by side instead of running",
+    )
+    args = parser.parse_args()
+
+    if args.compare:
+        _compare(*args.compare)
+        return
+
+    args.base_url = args.base_url.rstrip("/")
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    label = args.label or (args.output or "run")
+
+    results = [_run_level(args, c) for c in levels]
+    _print_results(label, results)
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump({"label": label, "results": results}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
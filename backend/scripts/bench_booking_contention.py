@@ -0,0 +1,207 @@
+"""Concurrent booking load test: double-booking check and throughput.
+
+Fires --requests simultaneous POST /bookings at a small set of slots of
+one service (every slot is wanted by many requests at once), then checks
+the database for overlapping confirmed bookings and prints throughput,
+latency percentiles and the outcome counts:
+
+- ok (200)     the request won its slot; ideally exactly one per slot
+- taken (400)  "Selected slot is no longer available"
+- busy (503)   the service stayed locked through every retry
+
+Any overlap found in the database is a double booking and fails the run
+(exit code 1).
+
+Usage (from the backend directory, with the API running against the same
+DATABASE_URL):
+
+    python -m scripts.bench_booking_contention \\
+        --base-url http://localhost:8000 \\
+        --email customer@guyana.com --password '...' \\
+        --service-id 1 --requests 400 --slots 10 --concurrency 100
+
+Slots are placed on a random day far in the future (or --date YYYY-MM-DD)
+so repeated runs don't collide; the bookings it creates are left in place.
+Pass --service-id several times to spread the load over more service locks
+and compare throughput against the single-service run.
+"""
+
+import argparse
+import random
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+import requests
+from sqlalchemy import and_
+
+from app import models
+from app.database import SessionLocal
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _login(base_url, email, password):
+    resp = requests.post(
+        base_url + "/auth/login_by_email",
+        json={"email": email, "password": password},
+        timeout=30,
+    )
+    resp.raise_for_status()
+    return resp.json()["access_token"]
+
+
+def _slots(db, service_ids, day, count):
+    """[(service_id, start_time)], count back-to-back slots per service."""
+    slots = []
+    for service_id in service_ids:
+        service = db.query(models.Service).filter(models.Service.id == service_id).first()
+        if service is None:
+            raise SystemExit(f"Service {service_id} not found")
+        start = datetime.combine(day, datetime.min.time()) + timedelta(hours=8)
+        for i in range(count):
+            slots.append((service_id, start + timedelta(minutes=i * service.duration_minutes)))
+    return slots
+
+
+def _book(session, base_url, service_id, start_time, start_gate):
+    start_gate.wait()
+    started = time.perf_counter()
+    try:
+        resp = session.post(
+            base_url + "/bookings",
+            json={"service_id": service_id, "start_time": start_time.isoformat()},
+            timeout=60,
+        )
+        status = resp.status_code
+    except requests.RequestException:
+        status = "exc"
+    return status, (time.perf_counter() - started) * 1000.0
+
+
+def _double_bookings(db, service_ids, day):
+    """Pairs of overlapping confirmed bookings for the services on day."""
+    day_start = datetime.combine(day, datetime.min.time())
+    day_end = day_start + timedelta(days=1)
+
+    booking = models.Booking
+    rows = (
+        db.query(booking.service_id, booking.id, booking.start_time, booking.end_time)
+        .filter(booking.service_id.in_(service_ids))
+        .filter(booking.status == "confirmed")
+        .filter(and_(booking.start_time < day_end, booking.end_time > day_start))
+        .order_by(booking.service_id, booking.start_time, booking.id)
+        .all()
+    )
+
+    # Sorted by start: a booking overlaps an earlier one iff it starts
+    # before the latest end seen so far for its service
+    overlaps = []
+    latest = None
+    for row in rows:
+        if latest is not None and latest.service_id == row.service_id:
+            if row.start_time < latest.end_time:
+                overlaps.append((latest, row))
+            if row.end_time <= latest.end_time:
+                continue
+        latest = row
+    return overlaps, len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True, help="customer account making the bookings")
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--service-id", type=int, action="append", dest="services")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--slots", type=int, default=10, help="contended slots per service")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--date", type=date.fromisoformat)
+    args = parser.parse_args()
+    args.base_url = args.base_url.rstrip("/")
+    services = args.services or [1]
+    day = args.date or date.today() + timedelta(days=random.randint(400, 4000))
+
+    db = SessionLocal()
+    try:
+        slots = _slots(db, services, day, args.slots)
+    finally:
+        db.close()
+
+    token = _login(args.base_url, args.email, args.password)
+    print(
+        f"{args.requests} bookings at {len(slots)} slots of service(s) {services} "
+        f"on {day}, {args.concurrency} at a time"
+    )
+
+    local = threading.local()
+
+    def session():
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+            local.session.headers["Authorization"] = f"Bearer {token}"
+        return local.session
+
+    # Requests wait on the gate so each wave really arrives at once
+    start_gate = threading.Event()
+    targets = [slots[i % len(slots)] for i in range(args.requests)]
+    random.shuffle(targets)
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = [
+            pool.submit(
+                lambda target: _book(session(), args.base_url, target[0], target[1], start_gate),
+                target,
+            )
+            for target in targets
+        ]
+        started = time.perf_counter()
+        start_gate.set()
+        results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - started
+
+    statuses = Counter(status for status, _ in results)
+    latencies = [ms for _, ms in results]
+    print(
+        f"done in {elapsed:.2f}s ({len(results) / elapsed:.1f} req/s): "
+        f"ok={statuses.get(200, 0)} taken={statuses.get(400, 0)} "
+        f"busy={statuses.get(503, 0)} other="
+        f"{sum(n for s, n in statuses.items() if s not in (200, 400, 503))}"
+    )
+    print(
+        "latency ms: "
+        f"p50={_percentile(latencies, 50):.1f} "
+        f"p95={_percentile(latencies, 95):.1f} "
+        f"p99={_percentile(latencies, 99):.1f} "
+        f"mean={statistics.mean(latencies):.1f}"
+    )
+
+    db = SessionLocal()
+    try:
+        overlaps, confirmed = _double_bookings(db, services, day)
+    finally:
+        db.close()
+
+    print(f"confirmed bookings on {day}: {confirmed} for {len(slots)} slots")
+    if overlaps:
+        for prev, row in overlaps[:10]:
+            print(
+                f"  DOUBLE BOOKING service={row.service_id}: #{prev.id} "
+                f"{prev.start_time}-{prev.end_time} overlaps #{row.id} {row.start_time}"
+            )
+        raise SystemExit(f"{len(overlaps)} double booking(s) found")
+    print("no double bookings")
+
+
+if __name__ == "__main__":
+    main()
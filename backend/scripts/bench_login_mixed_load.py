@@ -0,0 +1,149 @@
+"""Login throughput vs. general API latency under mixed load.
+
+Runs two phases against a running API:
+
+1. baseline – only "general" traffic (GET /providers by default)
+2. mixed    – the same general traffic plus a concurrent login storm
+
+and prints login throughput alongside the general endpoint's latency
+percentiles for both phases. With password hashing in its own bounded pool,
+the general p95/p99 in the mixed phase should stay close to the baseline;
+excess logins are shed with 503s rather than queueing behind the CPU.
+
+Usage (from the backend directory, with the API running):
+
+    python -m scripts.bench_login_mixed_load \\
+        --base-url http://localhost:8000 \\
+        --email customer@guyana.com --password '...'
+
+Compare runs with PASSWORD_HASH_EXECUTOR=inline (old behaviour) and the
+default process pool on the server side.
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _general_worker(base_url, path, stop, latencies, errors):
+    session = requests.Session()
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            resp = session.get(base_url + path, timeout=30)
+            if resp.status_code >= 500:
+                errors.append(resp.status_code)
+        except requests.RequestException:
+            errors.append("exc")
+            continue
+        latencies.append((time.perf_counter() - started) * 1000.0)
+
+
+def _login_worker(base_url, email, password, stop, results):
+    session = requests.Session()
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            resp = session.post(
+                base_url + "/auth/login_by_email",
+                json={"email": email, "password": password},
+                timeout=30,
+            )
+            status = resp.status_code
+        except requests.RequestException:
+            status = "exc"
+        results.append((status, (time.perf_counter() - started) * 1000.0))
+
+
+def _run_phase(args, with_logins):
+    stop = threading.Event()
+    latencies, errors, login_results = [], [], []
+
+    workers = args.general_concurrency + (args.login_concurrency if with_logins else 0)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for _ in range(args.general_concurrency):
+            pool.submit(
+                _general_worker, args.base_url, args.path, stop, latencies, errors
+            )
+        if with_logins:
+            for _ in range(args.login_concurrency):
+                pool.submit(
+                    _login_worker,
+                    args.base_url,
+                    args.email,
+                    args.password,
+                    stop,
+                    login_results,
+                )
+
+        time.sleep(args.duration)
+        stop.set()
+
+    return latencies, errors, login_results
+
+
+def _report(name, duration, latencies, errors, login_results):
+    print(f"\n== {name} ==")
+    print(
+        f"general {len(latencies)} reqs ({len(latencies) / duration:.1f}/s), "
+        f"errors={len(errors)}"
+    )
+    if latencies:
+        print(
+            "general latency ms: "
+            f"p50={_percentile(latencies, 50):.1f} "
+            f"p95={_percentile(latencies, 95):.1f} "
+            f"p99={_percentile(latencies, 99):.1f} "
+            f"mean={statistics.mean(latencies):.1f}"
+        )
+
+    if login_results:
+        ok = [ms for status, ms in login_results if status == 200]
+        shed = sum(1 for status, _ in login_results if status == 503)
+        failed = len(login_results) - len(ok) - shed
+        print(
+            f"logins ok={len(ok)} ({len(ok) / duration:.1f}/s) "
+            f"shed(503)={shed} failed={failed}"
+        )
+        if ok:
+            print(
+                "login latency ms: "
+                f"p50={_percentile(ok, 50):.1f} "
+                f"p95={_percentile(ok, 95):.1f} "
+                f"p99={_percentile(ok, 99):.1f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--path", default="/providers", help="general endpoint to measure")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per phase")
+    parser.add_argument("--general-concurrency", type=int, default=8)
+    parser.add_argument("--login-concurrency", type=int, default=32)
+    args = parser.parse_args()
+    args.base_url = args.base_url.rstrip("/")
+
+    baseline = _run_phase(args, with_logins=False)
+    _report("baseline (general traffic only)", args.duration, *baseline)
+
+    mixed = _run_phase(args, with_logins=True)
+    _report("mixed (general traffic + login storm)", args.duration, *mixed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Upload throughput and latency for catalog image uploads.
+
+Logs in as a provider and posts generated JPEGs to /providers/me/catalog
+from several threads for a fixed duration, then prints upload throughput,
+latency percentiles and how many uploads were shed (503) or timed out
+(504). Each upload fetches its returned thumb URL once, so serving is
+covered too. With the server on IMAGE_STORAGE_BACKEND=local (or memory,
+single worker) the whole path runs offline: nothing goes to Cloudinary.
+
+Every image is unique by default, so each upload is decoded, resized and
+stored; --duplicate-ratio re-sends earlier images to exercise the
+content-hash dedupe (not with IMAGE_STORAGE_BACKEND=memory, which is never
+deduplicated).
+
+Usage (from the backend directory, with the API running):
+
+    IMAGE_STORAGE_BACKEND=local uvicorn app.main:app --port 8000
+    python -m scripts.bench_uploads \\
+        --base-url http://localhost:8000 \\
+        --email provider@guyana.com --password '...'
+
+Uploaded catalog images are left in place; use a throwaway provider.
+"""
+
+import argparse
+import io
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from PIL import Image
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _make_images(count, size):
+    """Distinct JPEGs of roughly camera-photo complexity."""
+    images = []
+    for seed in range(count):
+        rng = random.Random(seed)
+        bands = [Image.effect_noise((size, size), rng.uniform(20, 80)) for _ in range(3)]
+        img = Image.merge("RGB", bands)
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG", quality=90)
+        images.append(buf.getvalue())
+    return images
+
+
+def _login(base_url, email, password):
+    resp = requests.post(
+        base_url + "/auth/login_by_email",
+        json={"email": email, "password": password},
+        timeout=30,
+    )
+    resp.raise_for_status()
+    return resp.json()["access_token"]
+
+
+def _upload_worker(args, token, images, counter, stop, results):
+    session = requests.Session()
+    session.headers["Authorization"] = f"Bearer {token}"
+    rng = random.Random()
+
+    while not stop.is_set():
+        with counter["lock"]:
+            sent = counter["sent"]
+            counter["sent"] += 1
+        if sent and rng.random() < args.duplicate_ratio:
+            contents = images[rng.randrange(min(sent, len(images)))]
+        else:
+            contents = images[sent % len(images)]
+
+        started = time.perf_counter()
+        try:
+            resp = session.post(
+                args.base_url + "/providers/me/catalog",
+                files={"file": ("bench.jpg", contents, "image/jpeg")},
+                timeout=120,
+            )
+            status = resp.status_code
+        except requests.RequestException:
+            results.append(("exc", 0.0, None))
+            continue
+        elapsed = (time.perf_counter() - started) * 1000.0
+
+        serve_ms = None
+        if status == 200:
+            thumb = resp.json().get("thumb_url") or resp.json()["image_url"]
+            if thumb.startswith("/"):
+                thumb = args.base_url + thumb
+            served_at = time.perf_counter()
+            served = session.get(thumb, timeout=30)
+            if served.status_code == 200:
+                serve_ms = (time.perf_counter() - served_at) * 1000.0
+        results.append((status, elapsed, serve_ms))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds to run")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--images", type=int, default=200, help="distinct images to generate")
+    parser.add_argument("--size", type=int, default=1600, help="image width/height in px")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.0)
+    args = parser.parse_args()
+    args.base_url = args.base_url.rstrip("/")
+
+    print(f"generating {args.images} images of {args.size}x{args.size} ...")
+    images = _make_images(args.images, args.size)
+    token = _login(args.base_url, args.email, args.password)
+
+    stop = threading.Event()
+    counter = {"lock": threading.Lock(), "sent": 0}
+    results = []
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for _ in range(args.concurrency):
+            pool.submit(_upload_worker, args, token, images, counter, stop, results)
+        time.sleep(args.duration)
+        stop.set()
+
+    ok = [ms for status, ms, _ in results if status == 200]
+    served = [ms for status, _, ms in results if status == 200 and ms is not None]
+    shed = sum(1 for status, _, _ in results if status == 503)
+    timed_out = sum(1 for status, _, _ in results if status == 504)
+    failed = len(results) - len(ok) - shed - timed_out
+
+    print(
+        f"uploads ok={len(ok)} ({len(ok) / args.duration:.1f}/s) "
+        f"shed(503)={shed} timeout(504)={timed_out} failed={failed}"
+    )
+    if ok:
+        print(
+            "upload latency ms: "
+            f"p50={_percentile(ok, 50):.1f} "
+            f"p95={_percentile(ok, 95):.1f} "
+            f"p99={_percentile(ok, 99):.1f} "
+            f"mean={statistics.mean(ok):.1f}"
+        )
+    if served:
+        print(
+            f"served {len(served)}/{len(ok)} thumbs, latency ms: "
+            f"p50={_percentile(served, 50):.1f} p95={_percentile(served, 95):.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""EXPLAIN the SQL behind the hot crud reads.
+
+Runs each crud read against the configured DATABASE_URL with real ids from
+that database, captures the SQL it emits and prints the query plan for every
+statement, flagging full table scans. Works on Postgres (EXPLAIN) and SQLite
+(EXPLAIN QUERY PLAN).
+
+To see the effect of a migration, save the output before and after it and
+diff the two (from the backend directory):
+
+    alembic downgrade 4f2a9c1d7e53
+    python -m scripts.explain_queries > before.txt
+    alembic upgrade head
+    python -m scripts.explain_queries > after.txt
+    diff before.txt after.txt
+
+On a small development database Postgres prefers sequential scans no matter
+which indexes exist; pass --no-seqscan to check that an index *can* be used.
+"""
+
+import argparse
+from contextlib import contextmanager
+from datetime import date
+
+from sqlalchemy import event
+
+from app import crud, models
+from app.database import SessionLocal, engine
+
+
+class StatementCapture:
+    """Collects the SELECTs the engine runs while active."""
+
+    def __init__(self) -> None:
+        self.active = False
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.active and statement.lstrip().upper().startswith("SELECT"):
+            self.statements.append((statement, parameters))
+
+    @contextmanager
+    def capture(self):
+        self.statements = []
+        self.active = True
+        try:
+            yield self.statements
+        finally:
+            self.active = False
+
+
+def _sample_ids(db):
+    """Ids of a provider with services, one of its services, and a customer."""
+    service = db.query(models.Service).order_by(models.Service.id.asc()).first()
+    if service is None:
+        raise SystemExit("No services in this database; seed some data first.")
+
+    provider = db.query(models.Provider).filter(models.Provider.id == service.provider_id).first()
+    booking = db.query(models.Booking).order_by(models.Booking.id.asc()).first()
+    customer_id = booking.customer_id if booking else provider.user_id
+    return provider, service, customer_id
+
+
+def _crud_reads(db, provider, service, customer_id):
+    """(label, callable) pairs covering the hot read paths."""
+    today = date.today()
+    month_start = date(today.year, today.month, 1)
+
+    return [
+        ("list_providers", lambda: crud.list_providers(db)),
+        ("list_providers(profession)", lambda: crud.list_providers(db, profession="bar")),
+        ("get_provider_by_user_id", lambda: crud.get_provider_by_user_id(db, provider.user_id)),
+        ("list_services_for_provider", lambda: crud.list_services_for_provider(db, provider.id)),
+        ("get_professions_for_provider", lambda: crud.get_professions_for_provider(db, provider.id)),
+        (
+            "list_catalog_images_for_provider",
+            lambda: crud.list_catalog_images_for_provider(db, provider.id),
+        ),
+        (
+            "list_catalog_images_for_provider(thumbs page)",
+            lambda: crud.list_catalog_images_for_provider(
+                db, provider.id, limit=24, view="thumbs"
+            ),
+        ),
+        (
+            "get_provider_availability",
+            lambda: crud.get_provider_availability(db, provider.id, service.id, days=14),
+        ),
+        (
+            "create_booking overlap check",
+            lambda: db.query(models.Booking)
+            .filter(models.Booking.service_id == service.id)
+            .filter(models.Booking.status == "confirmed")
+            .filter(models.Booking.end_time > crud.now_local_naive())
+            .filter(
+                models.Booking.start_time < crud.now_local_naive(),
+                models.Booking.end_time > crud.now_local_naive(),
+            )
+            .first(),
+        ),
+        (
+            "list_bookings_for_customer",
+            lambda: crud.list_bookings_for_customer(db, customer_id, when="upcoming", limit=20),
+        ),
+        (
+            "list_bookings_for_provider",
+            lambda: crud.list_bookings_for_provider(db, provider.id, limit=20),
+        ),
+        (
+            "generate_monthly_bills lookup",
+            lambda: db.query(models.Bill)
+            .filter(models.Bill.provider_id == provider.id, models.Bill.month == month_start)
+            .first(),
+        ),
+        ("get_provider_billing_row", lambda: crud.get_provider_billing_row(db, provider.id)),
+    ]
+
+
+def _explain(conn, statement, parameters):
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+        return [row[-1] for row in rows]
+
+    rows = conn.exec_driver_sql("EXPLAIN " + statement, parameters).fetchall()
+    return [row[0] for row in rows]
+
+
+def _full_scans(plan_lines):
+    scans = []
+    for line in plan_lines:
+        text = line.strip()
+        if "Seq Scan" in text:
+            scans.append(text)
+        # SQLite: "SCAN bookings" is a full scan; "SCAN x USING INDEX" is not
+        elif text.startswith("SCAN ") and "USING" not in text:
+            scans.append(text)
+    return scans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--no-seqscan",
+        action="store_true",
+        help="Postgres only: SET enable_seqscan = off before explaining",
+    )
+    parser.add_argument("--sql", action="store_true", help="print each statement too")
+    args = parser.parse_args()
+
+    capture = StatementCapture()
+    event.listen(engine, "before_cursor_execute", capture)
+
+    db = SessionLocal()
+    try:
+        provider, service, customer_id = _sample_ids(db)
+        reads = _crud_reads(db, provider, service, customer_id)
+
+        captured = []
+        for label, run in reads:
+            with capture.capture() as statements:
+                run()
+            captured.append((label, list(statements)))
+    finally:
+        db.close()
+
+    event.remove(engine, "before_cursor_execute", capture)
+
+    total_scans = 0
+    with engine.connect() as conn:
+        if args.no_seqscan and conn.dialect.name == "postgresql":
+            conn.exec_driver_sql("SET enable_seqscan = off")
+
+        for label, statements in captured:
+            print(f"== {label} ({len(statements)} queries) ==")
+            for statement, parameters in statements:
+                plan = _explain(conn, statement, parameters)
+                scans = _full_scans(plan)
+                total_scans += len(scans)
+
+                if args.sql:
+                    print("  " + " ".join(statement.split()))
+                for line in plan:
+                    print(f"    {line}")
+                if scans:
+                    print(f"    !! full scan: {'; '.join(scans)}")
+            print()
+
+    print(f"full scans: {total_scans}")
+
+
+if __name__ == "__main__":
+    main()
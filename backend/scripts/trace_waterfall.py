@@ -0,0 +1,158 @@
+"""Print per-request waterfalls from the file span exporter.
+
+Reads the JSON-lines file written with TRACING_EXPORTER=file (TRACING_FILE
+and its rotated backups) and prints each trace as an indented tree: offset
+from the start of the request, duration and a bar showing where in the
+request the time went.
+
+Usage (from the backend directory):
+
+    python -m scripts.trace_waterfall                   # latest trace
+    python -m scripts.trace_waterfall --slowest 5       # 5 slowest requests
+    python -m scripts.trace_waterfall --route "POST /bookings" --slowest 3
+    python -m scripts.trace_waterfall --trace-id <X-Trace-Id header value>
+    python -m scripts.trace_waterfall --request-id <X-Request-ID header value>
+"""
+
+import argparse
+import json
+import os
+from collections import defaultdict
+from datetime import datetime
+
+BAR_WIDTH = 40
+
+
+def _parse_time(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def _span_files(path):
+    """Rotated backups (oldest first), then the current file."""
+    backups = []
+    index = 1
+    while os.path.exists(f"{path}.{index}"):
+        backups.append(f"{path}.{index}")
+        index += 1
+    return list(reversed(backups)) + [path]
+
+
+def _span_lines(path):
+    for name in _span_files(path):
+        if not os.path.exists(name):
+            continue
+        with open(name) as fh:
+            yield from fh
+
+
+def load_traces(path):
+    """{trace_id: [span, ...]} with start/end as float seconds."""
+    traces = defaultdict(list)
+    for line in _span_lines(path):
+        line = line.strip()
+        if not line:
+            continue
+        raw = json.loads(line)
+        traces[raw["context"]["trace_id"][2:]].append(
+            {
+                "span_id": raw["context"]["span_id"],
+                "parent_id": raw.get("parent_id"),
+                "name": raw["name"],
+                "start": _parse_time(raw["start_time"]),
+                "end": _parse_time(raw["end_time"]),
+                "attributes": raw.get("attributes", {}),
+                "error": raw.get("status", {}).get("status_code") == "ERROR",
+            }
+        )
+    return traces
+
+
+def _root(spans):
+    ids = {span["span_id"] for span in spans}
+    roots = [span for span in spans if span["parent_id"] not in ids]
+    return min(roots, key=lambda span: span["start"])
+
+
+def _label(span):
+    attrs = span["attributes"]
+    if "db.statement" in attrs:
+        return f"{span['name']}  {attrs['db.statement'][:70]}"
+    if "cache.hit" in attrs:
+        return f"{span['name']}  {'hit' if attrs['cache.hit'] else 'miss'}"
+    return span["name"]
+
+
+def print_waterfall(trace_id, spans):
+    root = _root(spans)
+    total = max(root["end"] - root["start"], 1e-9)
+    attrs = root["attributes"]
+
+    print(
+        f"{root['name']}  {total * 1000:.1f} ms  status={attrs.get('http.response.status_code', '?')}"
+        f"  trace={trace_id}  request={attrs.get('request.id', '-')}"
+    )
+
+    children = defaultdict(list)
+    for span in spans:
+        children[span["parent_id"]].append(span)
+
+    db_seconds = 0.0
+
+    def walk(span, depth):
+        nonlocal db_seconds
+        offset = span["start"] - root["start"]
+        duration = span["end"] - span["start"]
+        if "db.statement" in span["attributes"]:
+            db_seconds += duration
+
+        first = int(offset / total * BAR_WIDTH)
+        width = max(1, int(round(duration / total * BAR_WIDTH)))
+        bar = " " * first + "#" * min(width, BAR_WIDTH - first)
+        marker = "!" if span["error"] else " "
+        print(
+            f"  {offset * 1000:8.1f} {duration * 1000:8.1f} ms{marker}|{bar:<{BAR_WIDTH}}| "
+            f"{'  ' * depth}{_label(span)}"
+        )
+        for child in sorted(children[span["span_id"]], key=lambda s: s["start"]):
+            walk(child, depth + 1)
+
+    walk(root, 0)
+    print(f"  sql statement time: {db_seconds * 1000:.1f} ms of {total * 1000:.1f} ms\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--file", default=os.getenv("TRACING_FILE", "./traces/spans.jsonl"))
+    parser.add_argument("--trace-id")
+    parser.add_argument("--request-id")
+    parser.add_argument("--route", help='server span name, e.g. "POST /bookings"')
+    parser.add_argument("--slowest", type=int, help="show the N slowest traces")
+    args = parser.parse_args()
+
+    traces = load_traces(args.file)
+    selected = []
+    for trace_id, spans in traces.items():
+        root = _root(spans)
+        if args.trace_id and trace_id != args.trace_id:
+            continue
+        if args.request_id and root["attributes"].get("request.id") != args.request_id:
+            continue
+        if args.route and root["name"] != args.route:
+            continue
+        selected.append((trace_id, spans, root))
+
+    if not selected:
+        raise SystemExit("No matching traces.")
+
+    if args.slowest:
+        selected.sort(key=lambda item: item[2]["end"] - item[2]["start"], reverse=True)
+        selected = selected[: args.slowest]
+    elif not (args.trace_id or args.request_id):
+        selected = [max(selected, key=lambda item: item[2]["start"])]
+
+    for trace_id, spans, _ in selected:
+        print_waterfall(trace_id, spans)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Shared fixtures: the app's settings pointed at a throwaway SQLite database.
+
+Settings are read at import time, so the environment is prepared here before
+anything from ``app`` is imported. Run from the backend directory:
+
+    python -m pytest
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+_tmp_dir = tempfile.mkdtemp(prefix="booking-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'test.db')}"
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret-key-not-for-production-use-00")
+os.environ.setdefault("CORS_ALLOW_ORIGINS", "http://localhost")
+os.environ["PASSWORD_HASH_EXECUTOR"] = "inline"
+os.environ["PASSWORD_HASH_ROUNDS"] = "1000"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["DIRECTORY_CACHE_ENABLED"] = "false"
+os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+
+from app import crud, schemas  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def make_provider(db):
+    """make_provider(n) -> a provider with n services, professions and images."""
+    counter = iter(range(1_000_000))
+
+    def make(n: int = 1):
+        i = next(counter)
+        user = crud.create_user(
+            db,
+            schemas.UserCreate(
+                email=f"provider{i}@example.com",
+                password="test-password-123",
+                full_name=f"Provider {i}",
+                phone="5550000",
+                location="Georgetown",
+                is_provider=True,
+            ),
+        )
+        user.is_provider = True
+        db.commit()
+
+        provider = crud.get_or_create_provider_for_user(db, user.id)
+        crud.set_professions_for_provider(
+            db, provider.id, [f"Profession {j}" for j in range(n)]
+        )
+        for j in range(n):
+            crud.create_service_for_provider(
+                db,
+                provider.id,
+                schemas.ServiceCreate(
+                    name=f"Service {j}",
+                    description="",
+                    price_gyd=1000,
+                    duration_minutes=30,
+                ),
+            )
+            crud.add_catalog_image_for_provider(
+                db, provider.id, f"https://img.example.com/{i}/{j}.jpg", f"Image {j}"
+            )
+        crud.set_working_hours_for_provider(
+            db,
+            provider.id,
+            [
+                dict(weekday=d, is_closed=False, start_time="08:00", end_time="17:00")
+                for d in range(7)
+            ],
+        )
+        return provider
+
+    return make
@@ -0,0 +1,84 @@
+"""Concurrent crud.create_booking calls never double-book a slot.
+
+A self-contained take on scripts/bench_booking_contention.py: no API server,
+just threads racing for a few slots of one service on the test database.
+On SQLite the booking lock is the database write lock; on PostgreSQL the
+same code path takes the per-service row lock.
+"""
+
+import threading
+from collections import Counter
+from datetime import timedelta
+
+from app import crud, models, schemas
+from app.database import SessionLocal
+
+SLOTS = 4
+REQUESTS_PER_SLOT = 6
+
+
+def test_concurrent_bookings_get_one_confirmed_booking_per_slot(db, make_provider):
+    provider = make_provider(1)
+    service_id = crud.list_services_for_provider(db, provider.id)[0].id
+    customer_id = crud.create_user(
+        db,
+        schemas.UserCreate(
+            email="customer@example.com",
+            password="test-password-123",
+            full_name="Customer",
+            phone="5550001",
+            location="Georgetown",
+        ),
+    ).id
+
+    # Service slots are 30 minutes; an hour apart they can't overlap
+    day = crud.now_local_naive().replace(hour=9, minute=0, second=0, microsecond=0)
+    slots = [day + timedelta(days=30, hours=i) for i in range(SLOTS)]
+
+    barrier = threading.Barrier(SLOTS * REQUESTS_PER_SLOT)
+    outcomes = Counter()
+    outcomes_lock = threading.Lock()
+
+    def book(start_time):
+        session = SessionLocal()
+        try:
+            barrier.wait()
+            try:
+                crud.create_booking(
+                    session,
+                    customer_id,
+                    schemas.BookingCreate(service_id=service_id, start_time=start_time),
+                )
+                outcome = "ok"
+            except ValueError:
+                outcome = "taken"
+            except crud.BookingBusy:
+                outcome = "busy"
+        finally:
+            session.close()
+        with outcomes_lock:
+            outcomes[outcome] += 1
+
+    threads = [
+        threading.Thread(target=book, args=(slot,))
+        for slot in slots
+        for _ in range(REQUESTS_PER_SLOT)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+    assert not any(thread.is_alive() for thread in threads)
+
+    confirmed = Counter(
+        start_time
+        for (start_time,) in db.query(models.Booking.start_time).filter(
+            models.Booking.service_id == service_id,
+            models.Booking.status == "confirmed",
+        )
+    )
+    assert all(count == 1 for count in confirmed.values())
+    assert outcomes["ok"] == len(confirmed)
+    assert sum(outcomes.values()) == SLOTS * REQUESTS_PER_SLOT
+    # Busy requests are allowed, but every slot should still find a winner
+    assert set(confirmed) == set(slots)
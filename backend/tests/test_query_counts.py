@@ -0,0 +1,172 @@
+"""Pin the number of SQL statements behind the hot provider, booking and
+billing reads.
+
+These reads used to issue queries per provider/service/booking; a regression
+back to N+1 shows up here as a count that grows with the data.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from app import crud, crud_async, models, schemas
+from app.database import AsyncSessionLocal, async_engine
+from app.query_stats import assert_max_queries, count_queries
+
+
+def test_list_providers_query_count_is_constant(db, make_provider):
+    make_provider(1)
+    with count_queries() as few:
+        assert len(crud.list_providers(db)) == 1
+
+    for _ in range(4):
+        make_provider(5)
+    with assert_max_queries(3) as many:
+        providers = crud.list_providers(db)
+
+    assert len(providers) == 5
+    assert providers[-1]["services"] == [f"Service {j}" for j in range(5)]
+    assert many.count == few.count
+
+
+def test_list_providers_by_profession_query_count(db, make_provider):
+    for _ in range(3):
+        make_provider(3)
+    with assert_max_queries(3):
+        assert len(crud.list_providers(db, profession="profession 2")) == 3
+
+
+def test_async_list_providers_query_count(db, make_provider):
+    for _ in range(3):
+        make_provider(3)
+
+    async def list_providers():
+        try:
+            async with AsyncSessionLocal() as session:
+                return await crud_async.list_providers(session)
+        finally:
+            # Pooled aiosqlite connections belong to this event loop
+            await async_engine.dispose()
+
+    with assert_max_queries(3):
+        assert len(asyncio.run(list_providers())) == 3
+
+
+def test_provider_page_query_count(db, make_provider):
+    provider_id = make_provider(6).id
+    with assert_max_queries(5):
+        page = crud.get_provider_page(db, provider_id)
+
+    assert len(page.services) == 6
+    assert len(page.catalog) == 6
+    assert len(page.working_hours) == 7
+
+
+def test_provider_page_with_availability_adds_one_query(db, make_provider):
+    provider_id = make_provider(3).id
+    service_id = crud.list_services_for_provider(db, provider_id)[0].id
+    with assert_max_queries(6):
+        page = crud.get_provider_page(
+            db, provider_id, service_id=service_id, availability_days=7
+        )
+
+    assert len(page.availability) == 7
+
+
+def _make_customer(db):
+    return crud.create_user(
+        db,
+        schemas.UserCreate(
+            email="customer@example.com",
+            password="test-password-123",
+            full_name="Customer",
+            phone="5550001",
+            location="Georgetown",
+        ),
+    )
+
+
+def _book(db, customer_id, provider_id, start_time):
+    service = crud.list_services_for_provider(db, provider_id)[0]
+    db.add(
+        models.Booking(
+            customer_id=customer_id,
+            service_id=service.id,
+            start_time=start_time,
+            end_time=start_time + timedelta(minutes=service.duration_minutes),
+            status="confirmed",
+        )
+    )
+    db.commit()
+
+
+def test_list_bookings_for_customer_query_count_is_constant(db, make_provider):
+    customer_id = _make_customer(db).id
+    now = crud.now_local_naive()
+    _book(db, customer_id, make_provider(1).id, now - timedelta(days=1))
+    with count_queries() as few:
+        assert len(crud.list_bookings_for_customer(db, customer_id)) == 1
+
+    for i in range(4):
+        provider_id = make_provider(1).id
+        _book(db, customer_id, provider_id, now - timedelta(days=2 + i))
+        _book(db, customer_id, provider_id, now + timedelta(days=1 + i))
+    with assert_max_queries(1) as many:
+        bookings = crud.list_bookings_for_customer(db, customer_id)
+
+    assert len(bookings) == 9
+    assert {b.provider_name for b in bookings} == {f"Provider {i}" for i in range(5)}
+    assert many.count == few.count
+
+    with assert_max_queries(1):
+        assert len(crud.list_bookings_for_customer(db, customer_id, when="upcoming")) == 4
+
+
+def _bill(db, provider_id, month, is_paid=False):
+    db.add(
+        models.Bill(
+            provider_id=provider_id,
+            month=month,
+            total_gyd=1000,
+            fee_gyd=100,
+            is_paid=is_paid,
+            due_date=datetime(month.year, month.month, 15, 23, 59) + timedelta(days=31),
+        )
+    )
+    db.commit()
+
+
+def test_provider_billing_rows_query_count_is_constant(db, make_provider):
+    crud.get_or_create_platform_settings(db)
+    customer_id = _make_customer(db).id
+    # Upcoming bookings this month make every provider owe a fee
+    soon = datetime.utcnow() + timedelta(minutes=5)
+    this_month = soon.date().replace(day=1)
+    last_month = (this_month - timedelta(days=1)).replace(day=1)
+
+    def make_billed_provider():
+        provider_id = make_provider(1).id
+        _bill(db, provider_id, last_month, is_paid=True)
+        _bill(db, provider_id, this_month)
+        crud.create_bill_credit(db, provider_id, 10)
+        _book(db, customer_id, provider_id, soon)
+        return provider_id
+
+    make_billed_provider()
+    with count_queries() as few:
+        assert len(crud.list_provider_billing_rows(db)) == 1
+
+    provider_ids = [make_billed_provider() for _ in range(4)]
+    make_provider(1)  # never billed
+    with assert_max_queries(5) as many:
+        rows = crud.list_provider_billing_rows(db)
+
+    assert len(rows) == 6
+    assert [row["is_paid"] for row in rows] == [False] * 5 + [True]
+    assert rows[-1]["last_due_date"] is None
+    assert many.count == few.count
+
+    with assert_max_queries(5):
+        row = crud.get_provider_billing_row(db, provider_ids[0])
+    assert row["amount_due_gyd"] == crud.get_provider_current_month_due_from_upcoming_bookings(
+        db, provider_ids[0]
+    )
@@ -1641,7 +1641,9 @@ function ClientHomeScreen({
             >
               {nearbyProviders.map((provider) => {
                 const avatar = resolveImageUrl(
-                  provider.avatar_url || provider.profile_photo_url
+                  provider.avatar_thumb_url ||
+                    provider.avatar_url ||
+                    provider.profile_photo_url
                 );
                 const servicesLabel = (provider.services || []).join(" · ");
                 const saved = isFavorite(provider);
@@ -1819,7 +1821,9 @@ function ClientHomeScreen({
             >
               {favoriteProviders.map((provider) => {
                 const avatar = resolveImageUrl(
-                  provider.avatar_url || provider.profile_photo_url
+                  provider.avatar_thumb_url ||
+                    provider.avatar_url ||
+                    provider.profile_photo_url
                 );
                 const servicesLabel = (provider.services || []).join(" · ");
                 const saved = isFavorite(provider);
@@ -2571,7 +2575,10 @@ function SearchScreen({
       setCatalogLoading(true);
       setCatalogError("");
 
-      const res = await axios.get(`${API}/providers/${providerId}/catalog`);
+      // The strip only shows thumbnails, so fetch the first page of those
+      const res = await axios.get(`${API}/providers/${providerId}/catalog`, {
+        params: { view: "thumbs", limit: 24 },
+      });
 
       setCatalogImages(Array.isArray(res.data) ? res.data : []);
     } catch (err) {
@@ -2881,7 +2888,9 @@ function SearchScreen({
                           filteredProviders.length > 0 &&
                           filteredProviders.map((p) => {
                             const avatar = resolveImageUrl(
-                              p.avatar_url || p.profile_photo_url
+                              p.avatar_thumb_url ||
+                                p.avatar_url ||
+                                p.profile_photo_url
                             );
                             const favorite = isFavorite(p);
                     return (
@@ -2998,7 +3007,7 @@ function SearchScreen({
                                 {catalogImages.map((img) => (
                                   <Image
                                     key={img.id}
-                                    source={{ uri: img.image_url }}
+                                    source={{ uri: img.thumb_url || img.image_url }}
                                     style={styles.searchCatalogImage}
                                   />
                                 ))}
@@ -3926,11 +3935,84 @@ const uploadCatalogImage = async (uri) => {
 };
 
 
+const uploadCatalogImages = async (uris) => {
+  try {
+    setCatalogUploading(true);
+
+    const tokenStr = await AsyncStorage.getItem("accessToken");
+    if (!tokenStr) {
+      alert("No access token found. Please log in again.");
+      return;
+    }
+
+    // One request for all photos; the server processes them in parallel
+    const formData = new FormData();
+    uris.forEach((uri, index) => {
+      const filename = uri.split("/").pop() || `catalog-${index}.jpg`;
+      const match = /\.(\w+)$/.exec(filename);
+      const ext = match ? match[1].toLowerCase() : "jpg";
+
+      let mimeType = "image/jpeg";
+      if (ext === "png") mimeType = "image/png";
+      else if (ext === "webp") mimeType = "image/webp";
+
+      formData.append("files", {
+        uri,
+        name: filename,
+        type: mimeType,
+      });
+    });
+
+    const res = await axios.post(
+      `${API}/providers/me/catalog/bulk`,
+      formData,
+      {
+        headers: {
+          "Content-Type": "multipart/form-data",
+          Authorization: `Bearer ${tokenStr}`,
+        },
+      }
+    );
+
+    const uploaded = res.data?.uploaded || [];
+    const failed = res.data?.failed || [];
+    if (uploaded.length) {
+      setCatalog((prev) => [...uploaded].reverse().concat(prev || []));
+    }
+
+    if (showFlash) {
+      if (failed.length) {
+        showFlash(
+          "error",
+          `${uploaded.length} added, ${failed.length} failed: ${failed[0].detail}`
+        );
+      } else {
+        showFlash("success", `${uploaded.length} photos added to your catalog`);
+      }
+    }
+  } catch (err) {
+    console.log(
+      "Error uploading catalog images",
+      err.response?.data || err.message
+    );
+    const detail =
+      err.response?.data?.detail ||
+      "Could not upload images. Please try again.";
+    if (showFlash) showFlash("error", detail);
+  } finally {
+    setCatalogUploading(false);
+  }
+};
+
+
 const pickCatalogImage = async () => {
   try {
     const result = await ImagePicker.launchImageLibraryAsync({
       mediaTypes: ImagePicker.MediaTypeOptions.Images,
+      // Cropping only applies to single picks; multiple go up in one request
       allowsEditing: true,
+      allowsMultipleSelection: true,
+      selectionLimit: 20,
       aspect: [4, 5], // portrait-ish
       quality: 1,
     });
@@ -3939,12 +4021,18 @@ const pickCatalogImage = async () => {
       return;
     }
 
-    const asset = result.assets && result.assets[0];
-    if (!asset || !asset.uri) {
+    const uris = (result.assets || [])
+      .map((asset) => asset && asset.uri)
+      .filter(Boolean);
+    if (!uris.length) {
       return;
     }
 
-    await uploadCatalogImage(asset.uri);
+    if (uris.length === 1) {
+      await uploadCatalogImage(uris[0]);
+    } else {
+      await uploadCatalogImages(uris);
+    }
   } catch (err) {
     console.log("Error picking catalog image", err);
     alert("Could not open your gallery. Please try again.");
@@ -4950,7 +5038,7 @@ const loadProviderSummary = async () => {
             {catalog.map((item) => (
               <View key={item.id} style={styles.catalogItem}>
                 <Image
-                  source={{ uri: item.image_url }}
+                  source={{ uri: item.medium_url || item.image_url }}
                   style={styles.catalogImage}
                 />
                 {item.caption ? (